@@ -11,6 +11,9 @@ class OrganizationAdmin(admin.ModelAdmin):
         'subscription_status_display', 
         'warehouse_count', 
         'user_count',
+        'order_count',
+        'revenue',
+        'last_activity',
         'monthly_fee',
         'is_active',
         'created_at'
@@ -37,6 +40,9 @@ class OrganizationAdmin(admin.ModelAdmin):
     
     readonly_fields = []
     
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_stats()
+    
     def subscription_status_display(self, obj):
         colors = {
             'trial': '#ff9800',
@@ -55,14 +61,29 @@ class OrganizationAdmin(admin.ModelAdmin):
     subscription_status_display.short_description = 'Status'
     
     def warehouse_count(self, obj):
-        count = obj.warehouse_count
-        return format_html('<strong>{}</strong> warehouses', count)
+        return format_html('<strong>{}</strong> warehouses', obj.warehouse_count)
     warehouse_count.short_description = 'Warehouses'
+    warehouse_count.admin_order_field = 'warehouse_count'
     
     def user_count(self, obj):
-        count = obj.user_count
-        return format_html('<strong>{}</strong> users', count)
+        return format_html('<strong>{}</strong> users', obj.user_count)
     user_count.short_description = 'Users'
+    user_count.admin_order_field = 'user_count'
+    
+    def order_count(self, obj):
+        return obj.order_count
+    order_count.short_description = 'Orders'
+    order_count.admin_order_field = 'order_count'
+    
+    def revenue(self, obj):
+        return obj.revenue
+    revenue.short_description = 'Revenue'
+    revenue.admin_order_field = 'revenue'
+    
+    def last_activity(self, obj):
+        return obj.last_activity
+    last_activity.short_description = 'Last order'
+    last_activity.admin_order_field = 'last_activity'
 
 
 @admin.register(User)
@@ -103,22 +124,11 @@ class UserAdmin(BaseUserAdmin):
     readonly_fields = ['last_login', 'date_joined']
     
     def get_queryset(self, request):
-        qs = super().get_queryset(request)
-        
-        if request.user.is_superuser:
-            return qs
-        
-        if hasattr(request.user, 'organization') and request.user.organization:
-            return qs.filter(organization=request.user.organization)
-        
-        return qs.none()
+        return super().get_queryset(request).for_tenant(request.user)
     
     def formfield_for_foreignkey(self, db_field, request, **kwargs):
-        if db_field.name == "assigned_warehouse" and not request.user.is_superuser:
-            if hasattr(request.user, 'organization') and request.user.organization:
-                from apps.inventory.models import Warehouse
-                kwargs["queryset"] = Warehouse.objects.filter(
-                    organization=request.user.organization
-                )
+        if db_field.name == "assigned_warehouse":
+            from apps.inventory.models import Warehouse
+            kwargs["queryset"] = Warehouse.objects.for_tenant(request.user)
         
         return super().formfield_for_foreignkey(db_field, request, **kwargs)
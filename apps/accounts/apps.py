@@ -5,3 +5,7 @@ class AccountsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.accounts'
     label = 'accounts'
+
+    def ready(self):
+        from .snapshots import connect_snapshot_signals
+        connect_snapshot_signals()
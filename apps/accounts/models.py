@@ -26,11 +26,49 @@
 #     def __str__(self):
 #         return self.username
 #apps/accounts/models.py
-from django.contrib.auth.models import AbstractUser
+from django.apps import apps
+from django.contrib.auth.models import AbstractUser, UserManager
 from django.db import models
+from django.db.models import Count, Max, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
 from apps.core.models import BaseModel
+from apps.core.tenancy import TenantQuerySet, TenantScope
 from django.utils import timezone
 
+REVENUE_ORDER_STATUSES = ('confirmed', 'shipped', 'delivered')
+
+
+def _per_organization(queryset, aggregate):
+    """Correlated subquery of one aggregate over queryset's rows for the outer organization"""
+    return Subquery(
+        queryset.filter(organization=OuterRef('pk'))
+        .order_by().values('organization').annotate(value=aggregate).values('value')
+    )
+
+
+class OrganizationQuerySet(TenantQuerySet):
+
+    def with_stats(self):
+        """
+        Annotate warehouse_count, user_count, order_count, revenue (confirmed
+        to delivered orders) and last_activity (latest order). Each is a
+        correlated subquery on an organization index, so a page of
+        organizations costs one query.
+        """
+        Warehouse = apps.get_model('inventory', 'Warehouse')
+        Order = apps.get_model('sales', 'Order')
+        return self.annotate(
+            warehouse_count=Coalesce(_per_organization(Warehouse.objects.all(), Count('*')), 0),
+            user_count=Coalesce(_per_organization(User.objects.all(), Count('*')), 0),
+            order_count=Coalesce(_per_organization(Order.objects.all(), Count('*')), 0),
+            revenue=Coalesce(
+                _per_organization(Order.objects.filter(status__in=REVENUE_ORDER_STATUSES), Sum('total')),
+                0, output_field=models.DecimalField(max_digits=14, decimal_places=2),
+            ),
+            last_activity=_per_organization(Order.objects.all(), Max('created_at')),
+        )
+
+
 class Organization(BaseModel):
     """Organization/Company - each client is one organization"""
     name = models.CharField(max_length=255, help_text="Client company name")
@@ -55,20 +93,19 @@ class Organization(BaseModel):
     trial_end_date = models.DateField(null=True, blank=True)
     notes = models.TextField(blank=True)
     
+    objects = OrganizationQuerySet.as_manager()
+    tenant_scope = TenantScope('id')
+    
     class Meta:
         db_table = 'organizations'
         ordering = ['name']
     
     def __str__(self):
         return self.name
-    
-    @property
-    def warehouse_count(self):
-        return self.warehouses.count()
-    
-    @property
-    def user_count(self):
-        return self.users.count()
+
+
+class TenantUserManager(UserManager.from_queryset(TenantQuerySet)):
+    pass
 
 
 class User(AbstractUser, BaseModel):
@@ -102,6 +139,8 @@ class User(AbstractUser, BaseModel):
 
     date_joined = models.DateTimeField(default=timezone.now)
     
+    objects = TenantUserManager()
+    
     class Meta:
         db_table = "users"
     
@@ -0,0 +1,149 @@
+"""
+Cached user and organization snapshots.
+
+A user snapshot holds the few columns authentication and scoping need
+(role, organization, assigned warehouse, active and superuser flags); an
+organization snapshot holds its plan for rate limiting. Snapshots are kept
+in two tiers: a per-process dict with a TTL of a few seconds, then the
+shared cache. Saving or deleting a row drops both tiers for it in this
+process and the shared tier everywhere, so other processes see the change
+once their local entry expires.
+
+Without a shared cache (the default LocMemCache is per process) the
+second tier only lives as long as the first, so a deactivated user stops
+authenticating in every worker within SNAPSHOT_LOCAL_TIMEOUT.
+
+queryset.update() bypasses the signals; call invalidate_user() or
+invalidate_organization() after it.
+"""
+
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db.models.signals import post_delete, post_save
+from django.utils.functional import SimpleLazyObject
+
+SNAPSHOT_FIELDS = (
+    'id', 'username', 'role', 'organization_id', 'assigned_warehouse_id',
+    'is_active', 'is_superuser', 'is_staff',
+)
+ORGANIZATION_SNAPSHOT_FIELDS = ('id', 'subscription_status', 'is_active')
+
+LOCAL_MAX_ENTRIES = 10000
+
+_local = {}
+
+
+def _key(kind, pk):
+    # Token claims carry ids as strings, signals as UUIDs
+    return f'{kind}-snapshot:{pk}'
+
+
+def _shared_timeout():
+    if isinstance(caches[DEFAULT_CACHE_ALIAS], LocMemCache):
+        return settings.SNAPSHOT_LOCAL_TIMEOUT
+    return settings.SNAPSHOT_TIMEOUT
+
+
+def _get_snapshot(key, queryset, fields):
+    now = time.monotonic()
+    entry = _local.get(key)
+    if entry is not None and entry[0] > now:
+        return entry[1]
+
+    snapshot = cache.get(key)
+    if snapshot is None:
+        snapshot = queryset.values(*fields).first()
+        if snapshot is None:
+            return None
+        cache.set(key, snapshot, _shared_timeout())
+
+    if len(_local) >= LOCAL_MAX_ENTRIES:
+        _local.clear()
+    _local[key] = (now + settings.SNAPSHOT_LOCAL_TIMEOUT, snapshot)
+    return snapshot
+
+
+def _invalidate_key(key):
+    _local.pop(key, None)
+    cache.delete(key)
+
+
+def get_user_snapshot(user_id):
+    """The user's snapshot, or None if no such user exists"""
+    return _get_snapshot(
+        _key('user', user_id), get_user_model().objects.filter(pk=user_id), SNAPSHOT_FIELDS
+    )
+
+
+def get_organization_snapshot(organization_id):
+    """The organization's snapshot, or None if no such organization exists"""
+    from .models import Organization
+    return _get_snapshot(
+        _key('organization', organization_id),
+        Organization.objects.filter(pk=organization_id),
+        ORGANIZATION_SNAPSHOT_FIELDS,
+    )
+
+
+def invalidate_user(user_id):
+    _invalidate_key(_key('user', user_id))
+
+
+def invalidate_organization(organization_id):
+    _invalidate_key(_key('organization', organization_id))
+
+
+class SnapshotUser(SimpleLazyObject):
+    """
+    request.user answered from a snapshot. Reading any other attribute, or
+    assigning it to a foreign key, loads the full row once.
+    """
+
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, snapshot):
+        user_id = snapshot['id']
+        super().__init__(
+            lambda: get_user_model().objects
+            .select_related('organization', 'assigned_warehouse')
+            .get(pk=user_id)
+        )
+        self.__dict__['_snapshot'] = snapshot
+
+    def __bool__(self):
+        return True
+
+    def __hash__(self):
+        return hash(self._snapshot['id'])
+
+    pk = property(lambda self: self._snapshot['id'])
+    id = property(lambda self: self._snapshot['id'])
+    username = property(lambda self: self._snapshot['username'])
+    role = property(lambda self: self._snapshot['role'])
+    organization_id = property(lambda self: self._snapshot['organization_id'])
+    assigned_warehouse_id = property(lambda self: self._snapshot['assigned_warehouse_id'])
+    is_active = property(lambda self: self._snapshot['is_active'])
+    is_superuser = property(lambda self: self._snapshot['is_superuser'])
+    is_staff = property(lambda self: self._snapshot['is_staff'])
+
+
+def _invalidate_user(sender, instance, **kwargs):
+    invalidate_user(instance.pk)
+
+
+def _invalidate_organization(sender, instance, **kwargs):
+    invalidate_organization(instance.pk)
+
+
+def connect_snapshot_signals():
+    from .models import Organization
+    User = get_user_model()
+    post_save.connect(_invalidate_user, sender=User, dispatch_uid='user_snapshot_save')
+    post_delete.connect(_invalidate_user, sender=User, dispatch_uid='user_snapshot_delete')
+    post_save.connect(_invalidate_organization, sender=Organization, dispatch_uid='organization_snapshot_save')
+    post_delete.connect(_invalidate_organization, sender=Organization, dispatch_uid='organization_snapshot_delete')
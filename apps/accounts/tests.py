@@ -1,3 +1,43 @@
+from decimal import Decimal
+
 from django.test import TestCase
+from apps.accounts.models import Organization, User
+from apps.inventory.models import Warehouse
+from apps.sales.models import Customer, Order
+
+
+class OrganizationStatsTests(TestCase):
+    """Test the annotated organization figures used by the admin and API"""
+
+    def setUp(self):
+        self.acme = Organization.objects.create(name='Acme', slug='acme')
+        self.idle = Organization.objects.create(name='Idle', slug='idle')
+        warehouse = Warehouse.objects.create(name='Main', location='Padova', organization=self.acme)
+        Warehouse.objects.create(name='Annex', location='Vicenza', organization=self.acme)
+        User.objects.create_user(username='manager', password='pass', email='manager@test.com', organization=self.acme)
+        customer = Customer.objects.create(name='Customer', organization=self.acme)
+        for status, total in (('delivered', '100.00'), ('confirmed', '50.00'), ('cancelled', '30.00')):
+            self.last_order = Order.objects.create(customer=customer, warehouse=warehouse, status=status, total=total)
+
+    def test_with_stats(self):
+        acme, idle = Organization.objects.with_stats().order_by('name')
+        self.assertEqual(
+            (acme.warehouse_count, acme.user_count, acme.order_count, acme.revenue),
+            (2, 1, 3, Decimal('150.00'))
+        )
+        self.assertEqual(acme.last_activity, self.last_order.created_at)
+        self.assertEqual((idle.warehouse_count, idle.user_count, idle.order_count, idle.revenue), (0, 0, 0, 0))
+        self.assertIsNone(idle.last_activity)
+
+    def test_changelist_queries_do_not_grow_with_rows(self):
+        admin = User.objects.create_superuser(username='root', password='pass', email='root@test.com')
+        self.client.force_login(admin)
+        self.client.get('/admin/accounts/organization/')
 
-# Create your tests here.
+        for i in range(5):
+            Organization.objects.create(name=f'Client {i}', slug=f'client-{i}')
+        with self.assertNumQueries(5):
+            # Session, user, count, filtered count, the annotated page
+            response = self.client.get('/admin/accounts/organization/?o=5')
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, '<strong>2</strong> warehouses', html=False)
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Prediction, SalesMetric
+from .models import ForecastBacktest, Prediction, SalesMetric
 
 
 @admin.register(Prediction)
@@ -13,3 +13,10 @@ class PredictionAdmin(admin.ModelAdmin):
 class SalesMetricAdmin(admin.ModelAdmin):
     list_display = ['date', 'metric_type', 'total_sales', 'total_orders']
     list_filter = ['metric_type', 'date']
+
+
+@admin.register(ForecastBacktest)
+class ForecastBacktestAdmin(admin.ModelAdmin):
+    list_display = ['organization', 'model_version', 'level', 'key', 'start_date', 'end_date', 'observations', 'mape', 'bias', 'coverage']
+    list_filter = ['organization', 'model_version', 'level', 'end_date']
+    search_fields = ['key']
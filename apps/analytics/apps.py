@@ -5,3 +5,7 @@ class AnalyticsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.analytics'
     label = 'analytics'
+
+    def ready(self):
+        from .signals import connect_rollup_signals
+        connect_rollup_signals()
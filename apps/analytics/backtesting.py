@@ -0,0 +1,165 @@
+# apps/analytics/backtesting.py
+"""
+Forecast backtesting.
+
+Stored predictions are compared with what actually sold, per organization
+and model version at product, category and model level. Predictions are read as plain value
+tuples into NumPy arrays and every metric is a grouped array reduction, so
+hundreds of thousands of prediction rows never become model instances.
+"""
+
+import numpy as np
+from django.db.models import Sum
+
+from apps.inventory.models import Product
+from .models import ForecastBacktest, Prediction, SalesRollup
+
+PREDICTION_CHUNK_SIZE = 10000
+
+# Keep IN (...) lists under the SQLite host-parameter limit
+LOOKUP_BATCH_SIZE = 5000
+
+
+def _codes(values, index):
+    """Small integer code for each value, extending index as new values appear"""
+    return np.fromiter((index.setdefault(v, len(index)) for v in values), dtype=np.int64, count=len(values))
+
+
+def _load_predictions(organization_id, start, end):
+    rows = list(
+        Prediction.objects.for_organization(organization_id).filter(date__gte=start, date__lte=end)
+        .values_list('model_version', 'product_id', 'date', 'predicted_quantity', 'confidence_score')
+        .iterator(chunk_size=PREDICTION_CHUNK_SIZE)
+    )
+    if not rows:
+        return None
+
+    versions, products, days, predicted, confidence = zip(*rows)
+    version_index, product_index = {}, {}
+    return {
+        'version': _codes(versions, version_index),
+        'product': _codes(products, product_index),
+        'offset': np.fromiter(((d - start).days for d in days), dtype=np.int64, count=len(days)),
+        'predicted': np.array(predicted, dtype=float),
+        'confidence': np.array([c if c is not None else 0.0 for c in confidence], dtype=float),
+        'versions': list(version_index),
+        'products': list(product_index),
+    }
+
+
+def _actuals(organization_id, predictions, start, end, n_days):
+    """Units sold for each prediction row, looked up by (product, day) key"""
+    product_index = {product_id: i for i, product_id in enumerate(predictions['products'])}
+    keys, units = [], []
+    product_ids = predictions['products']
+    for i in range(0, len(product_ids), LOOKUP_BATCH_SIZE):
+        sold = (
+            SalesRollup.objects.for_organization(organization_id)
+            .filter(day__gte=start, day__lte=end, product_id__in=product_ids[i:i + LOOKUP_BATCH_SIZE])
+            .values('product', 'day').annotate(units=Sum('quantity')).order_by()
+            .values_list('product', 'day', 'units')
+        )
+        for product_id, day, total in sold:
+            keys.append(product_index[product_id] * n_days + (day - start).days)
+            units.append(total)
+
+    wanted = predictions['product'] * n_days + predictions['offset']
+    actual = np.zeros(len(wanted))
+    if keys:
+        keys = np.array(keys, dtype=np.int64)
+        units = np.array(units, dtype=float)
+        order = np.argsort(keys)
+        keys, units = keys[order], units[order]
+        position = np.clip(np.searchsorted(keys, wanted), 0, len(keys) - 1)
+        found = keys[position] == wanted
+        actual[found] = units[position[found]]
+    return actual
+
+
+def _grouped_metrics(groups, predicted, actual, inside):
+    """MAPE, bias, coverage and observation count per group code"""
+    size = groups.max() + 1
+    observations = np.bincount(groups, minlength=size)
+
+    sold = actual > 0
+    ape = np.abs(predicted[sold] - actual[sold]) / actual[sold]
+    sold_days = np.bincount(groups[sold], minlength=size)
+    total_actual = np.bincount(groups, weights=actual, minlength=size)
+    total_predicted = np.bincount(groups, weights=predicted, minlength=size)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mape = np.bincount(groups[sold], weights=ape, minlength=size) / sold_days
+        bias = (total_predicted - total_actual) / total_actual
+        coverage = np.bincount(groups, weights=inside, minlength=size) / observations
+    return observations, mape, bias, coverage
+
+
+def _metric(value):
+    return None if not np.isfinite(value) else round(float(value), 4)
+
+
+def backtest(organization_id, start, end):
+    """
+    Score the organization's predictions dated in [start, end] against its
+    actual sales and upsert the results. Returns the number of metric rows written.
+
+    A day counts as covered when the actual falls within the prediction
+    plus or minus (1 - confidence_score) of it, with at least one unit either side.
+    """
+    predictions = _load_predictions(organization_id, start, end)
+    if predictions is None:
+        return 0
+
+    n_days = (end - start).days + 1
+    actual = _actuals(organization_id, predictions, start, end, n_days)
+    predicted = predictions['predicted']
+    band = np.maximum(1.0, (1 - predictions['confidence']) * predicted)
+    inside = (np.abs(actual - predicted) <= band).astype(float)
+
+    versions = predictions['versions']
+    products = predictions['products']
+    categories = dict(Product.objects.filter(pk__in=products).values_list('id', 'category'))
+    category_index = {}
+    product_category = _codes([categories.get(p) or '' for p in products], category_index)
+    category_names = list(category_index)
+
+    version = predictions['version']
+    levels = {
+        'model': (version, lambda code: (versions[code], '')),
+        'category': (
+            version * len(category_names) + product_category[predictions['product']],
+            lambda code: (versions[code // len(category_names)], category_names[code % len(category_names)]),
+        ),
+        'product': (
+            version * len(products) + predictions['product'],
+            lambda code: (versions[code // len(products)], str(products[code % len(products)])),
+        ),
+    }
+
+    results = []
+    for level, (composite, describe) in levels.items():
+        unique, groups = np.unique(composite, return_inverse=True)
+        observations, mape, bias, coverage = _grouped_metrics(groups, predicted, actual, inside)
+        for i, code in enumerate(unique.tolist()):
+            model_version, key = describe(code)
+            results.append(ForecastBacktest(
+                organization_id=organization_id,
+                model_version=model_version,
+                level=level,
+                key=key,
+                start_date=start,
+                end_date=end,
+                observations=int(observations[i]),
+                mape=_metric(mape[i]),
+                bias=_metric(bias[i]),
+                coverage=_metric(coverage[i]),
+            ))
+
+    ForecastBacktest.objects.bulk_create(
+        results,
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=['organization', 'model_version', 'level', 'key', 'start_date', 'end_date'],
+        update_fields=['observations', 'mape', 'bias', 'coverage', 'updated_at'],
+    )
+    return len(results)
@@ -0,0 +1,148 @@
+# apps/analytics/classification.py
+"""
+ABC/XYZ product classification.
+
+ABC ranks products by their share of revenue: A products make up the
+first 80% of revenue, B the next 15%, C the rest. XYZ ranks them by how
+steady weekly demand is, using the coefficient of variation of units sold:
+X up to 0.5, Y up to 1.0, Z above that or with no sales at all.
+
+Weekly sales come from the rollup cube in one grouped query, and both
+classes are computed with array reductions, so an organization with tens
+of thousands of products is classified in a single pass.
+"""
+
+from datetime import date, timedelta
+from decimal import Decimal
+
+import numpy as np
+from django.db.models import Sum
+from django.db.models.functions import TruncWeek
+
+from apps.inventory.models import Product
+from .models import ProductClassification, SalesRollup
+from .periods import period_start
+
+HISTORY_WEEKS = 52
+
+ABC_THRESHOLDS = (0.80, 0.95)
+XYZ_THRESHOLDS = (0.5, 1.0)
+
+WRITE_BATCH_SIZE = 5000
+
+
+def _codes(values, index):
+    return np.fromiter((index[v] for v in values), dtype=np.intp, count=len(values))
+
+
+def abc_classes(revenue, thresholds=ABC_THRESHOLDS):
+    """
+    (classes, share, cumulative_share) for a revenue vector. A product is
+    classed by the cumulative share of the products ranked above it, so the
+    product that crosses a threshold still belongs to the better class.
+    """
+    total = revenue.sum()
+    share = revenue / total if total > 0 else np.zeros_like(revenue)
+    order = np.argsort(-revenue, kind='stable')
+    cumulative = np.empty_like(share)
+    cumulative[order] = np.cumsum(share[order])
+    before = cumulative - share
+
+    classes = np.full(len(revenue), 'C')
+    classes[before < thresholds[1]] = 'B'
+    classes[before < thresholds[0]] = 'A'
+    classes[revenue <= 0] = 'C'
+    return classes, share, cumulative
+
+
+def xyz_classes(units, units_squared, weeks, thresholds=XYZ_THRESHOLDS):
+    """
+    (classes, cv) from per-product sums of weekly units and of their
+    squares over weeks periods; weeks without sales count as zero.
+    """
+    mean = units / weeks
+    variance = np.maximum(units_squared / weeks - mean ** 2, 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cv = np.where(mean > 0, np.sqrt(variance) / mean, np.nan)
+
+    classes = np.full(len(units), 'Z')
+    classes[cv <= thresholds[1]] = 'Y'
+    classes[cv <= thresholds[0]] = 'X'
+    return classes, cv
+
+
+def classify_organization(organization_id, as_of=None, weeks=HISTORY_WEEKS):
+    """
+    Classify every product of the organization on sales over the weeks
+    full weeks ending on as_of (default: the last complete week), and
+    upsert the results. Returns the number of products classified.
+    """
+    as_of = as_of or date.today() - timedelta(days=1)
+    end = period_start(as_of + timedelta(days=1), 'weekly') - timedelta(days=1)
+    start = end - timedelta(weeks=weeks) + timedelta(days=1)
+
+    products = list(
+        Product.objects.for_organization(organization_id)
+        .order_by().values_list('id', flat=True)
+    )
+    if not products:
+        return 0
+    index = {product_id: i for i, product_id in enumerate(products)}
+
+    rows = [
+        row for row in (
+            SalesRollup.objects
+            .filter(organization_id=organization_id, day__gte=start, day__lte=end)
+            .annotate(week=TruncWeek('day'))
+            .values('product', 'week')
+            .annotate(units=Sum('quantity'), revenue=Sum('revenue'))
+            .order_by()
+            .values_list('product', 'units', 'revenue')
+        )
+        if row[0] in index
+    ]
+
+    n = len(products)
+    if rows:
+        product_ids, units, revenue = zip(*rows)
+        codes = _codes(product_ids, index)
+        units = np.array(units, dtype=float)
+        revenue_total = np.bincount(codes, weights=np.array(revenue, dtype=float), minlength=n)
+        units_total = np.bincount(codes, weights=units, minlength=n)
+        units_squared = np.bincount(codes, weights=units ** 2, minlength=n)
+    else:
+        revenue_total = units_total = units_squared = np.zeros(n)
+
+    abc, share, cumulative = abc_classes(revenue_total)
+    xyz, cv = xyz_classes(units_total, units_squared, weeks)
+
+    abc, xyz = abc.tolist(), xyz.tolist()
+    share, cumulative = share.round(6).tolist(), cumulative.round(6).tolist()
+    revenue_total = revenue_total.round(2).tolist()
+    cv = [None if np.isnan(value) else round(value, 4) for value in cv.tolist()]
+
+    ProductClassification.objects.bulk_create(
+        [
+            ProductClassification(
+                organization_id=organization_id,
+                product_id=product_id,
+                abc_class=abc[i],
+                xyz_class=xyz[i],
+                revenue=Decimal(str(revenue_total[i])),
+                revenue_share=share[i],
+                cumulative_share=cumulative[i],
+                demand_cv=cv[i],
+                start_date=start,
+                end_date=end,
+            )
+            for i, product_id in enumerate(products)
+        ],
+        batch_size=WRITE_BATCH_SIZE,
+        update_conflicts=True,
+        unique_fields=['product'],
+        update_fields=[
+            'organization', 'abc_class', 'xyz_class', 'revenue', 'revenue_share',
+            'cumulative_share', 'demand_cv', 'start_date', 'end_date', 'updated_at',
+        ],
+    )
+    return n
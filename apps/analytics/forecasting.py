@@ -0,0 +1,171 @@
+# apps/analytics/forecasting.py
+"""
+Batch demand forecasting.
+
+Daily demand for every product of an organization is read from the sales
+rollup cube in one query into a products x days matrix, and a single
+exponential smoothing model with weekly seasonality is fitted to all rows
+at once (see smoothing.py).
+
+Each product keeps a watermark of the newest rollup change its forecast
+was fitted on, so nightly runs only refit products whose sales changed,
+plus those whose forecast horizon has nearly passed.
+"""
+
+import os
+from datetime import date, timedelta
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, Max, OuterRef, Sum
+
+from .models import ForecastWatermark, Prediction, SalesRollup
+from .smoothing import HORIZON_DAYS, forecast_parallel
+
+MODEL_VERSION = 'ets-weekly-v1'
+
+HISTORY_DAYS = 364
+
+PREDICTION_BATCH_SIZE = 5000
+
+
+def latest_sales_changes(organization_id, product_ids=None, changed_only=False,
+                         model_version=MODEL_VERSION, expires_on=None):
+    """
+    {product_id: newest rollup updated_at} for the organization's products.
+    With changed_only, only products without a forecast watermark or whose
+    rollups changed after it are returned, plus any whose forecast was
+    fitted on or before expires_on (keeping their current watermark); that
+    includes products whose rollups were deleted, see rollups._rebuild().
+    """
+    rows = SalesRollup.objects.filter(organization_id=organization_id)
+    if product_ids is not None:
+        rows = rows.filter(product_id__in=product_ids)
+
+    if changed_only:
+        watermarks = ForecastWatermark.objects.filter(organization_id=organization_id, model_version=model_version)
+        rows = rows.exclude(Exists(watermarks.filter(
+            product_id=OuterRef('product_id'), data_updated_at__gte=OuterRef('updated_at')
+        )))
+
+    latest = dict(
+        rows.values('product').annotate(latest=Max('updated_at')).order_by().values_list('product', 'latest')
+    )
+
+    if changed_only and expires_on is not None:
+        expired = watermarks.filter(as_of__lte=expires_on)
+        if product_ids is not None:
+            expired = expired.filter(product_id__in=product_ids)
+        for product_id, data_updated_at in expired.values_list('product_id', 'data_updated_at'):
+            latest.setdefault(product_id, data_updated_at)
+    return latest
+
+
+def demand_matrix(organization_id, start, end, product_ids=None):
+    """
+    Units sold per product per day in [start, end].
+    Returns (product_ids, matrix) with one column per day and one row per
+    requested product, or per product that sold anything if none were given.
+    """
+    rows = SalesRollup.objects.filter(
+        organization_id=organization_id, day__gte=start, day__lte=end
+    )
+    if product_ids is not None:
+        rows = rows.filter(product_id__in=product_ids)
+    rows = list(
+        rows.values('product', 'day').annotate(units=Sum('quantity')).order_by()
+        .values_list('product', 'day', 'units')
+    )
+
+    if product_ids is not None:
+        products = sorted(set(product_ids))
+    else:
+        products = sorted({product_id for product_id, _, _ in rows})
+    matrix = np.zeros((len(products), (end - start).days + 1))
+    if rows:
+        index = {product_id: i for i, product_id in enumerate(products)}
+        product_idx, days, units = zip(*rows)
+        matrix[
+            np.fromiter((index[p] for p in product_idx), dtype=np.intp, count=len(rows)),
+            np.fromiter(((d - start).days for d in days), dtype=np.intp, count=len(rows)),
+        ] = units
+    return products, matrix
+
+
+def save_predictions(organization_id, product_ids, forecasts, confidence, first_day,
+                     watermarks, model_version=MODEL_VERSION):
+    """
+    Replace each product's future predictions for this model version and
+    move its watermark forward, in one transaction so readers see either
+    the old or the new forecast for a product, never a mix.
+    """
+    horizon = forecasts.shape[1]
+    quantities = np.rint(forecasts).astype(int).tolist()
+    scores = confidence.round(4).tolist()
+
+    predictions = [
+        Prediction(
+            product_id=product_id,
+            date=first_day + timedelta(days=offset),
+            predicted_quantity=quantities[row][offset],
+            confidence_score=scores[row],
+            model_version=model_version,
+        )
+        for row, product_id in enumerate(product_ids)
+        for offset in range(horizon)
+    ]
+    marks = [
+        ForecastWatermark(
+            organization_id=organization_id,
+            product_id=product_id,
+            model_version=model_version,
+            data_updated_at=watermarks[product_id],
+            as_of=first_day - timedelta(days=1),
+        )
+        for product_id in product_ids
+    ]
+
+    with transaction.atomic():
+        for i in range(0, len(product_ids), PREDICTION_BATCH_SIZE):
+            Prediction.objects.filter(
+                product_id__in=product_ids[i:i + PREDICTION_BATCH_SIZE],
+                model_version=model_version,
+                date__gte=first_day,
+            ).delete()
+        Prediction.objects.bulk_create(predictions, batch_size=PREDICTION_BATCH_SIZE)
+        ForecastWatermark.objects.bulk_create(
+            marks,
+            batch_size=PREDICTION_BATCH_SIZE,
+            update_conflicts=True,
+            unique_fields=['organization', 'product', 'model_version'],
+            update_fields=['data_updated_at', 'as_of', 'updated_at'],
+        )
+    return len(predictions)
+
+
+def forecast_organization(organization_id, as_of=None, product_ids=None, changed_only=False,
+                          workers=None, history_days=HISTORY_DAYS, horizon=HORIZON_DAYS):
+    """
+    Fit and store forecasts for an organization's products from the
+    history_days ending on as_of (default: yesterday). With changed_only,
+    only products whose sales changed since their last fit, or whose
+    stored forecast is about to run out, are refit.
+    Returns the number of products forecast.
+    """
+    as_of = as_of or date.today() - timedelta(days=1)
+    start = as_of - timedelta(days=history_days - 1)
+
+    # A forecast fitted horizon - 1 days ago has only today left
+    expires_on = as_of - timedelta(days=horizon - 1)
+    latest = latest_sales_changes(organization_id, product_ids, changed_only, expires_on=expires_on)
+    if not latest:
+        return 0
+
+    if workers is None:
+        workers = getattr(settings, 'FORECAST_WORKERS', None) or os.cpu_count()
+
+    products, matrix = demand_matrix(organization_id, start, as_of, list(latest))
+    forecasts, confidence = forecast_parallel(matrix, horizon, workers)
+    save_predictions(organization_id, products, forecasts, confidence, as_of + timedelta(days=1), latest)
+    return len(products)
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.8
+
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_user_assigned_warehouse'),
+        ('analytics', '0001_initial'),
+        ('inventory', '0003_updated_at_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SalesRollup',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('day', models.DateField()),
+                ('quantity', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('cost', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('order_count', models.IntegerField(default=0)),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='accounts.organization')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='inventory.product')),
+                ('warehouse', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='inventory.warehouse')),
+            ],
+            options={
+                'db_table': 'sales_rollups',
+                'ordering': ['-day'],
+                'indexes': [models.Index(fields=['organization', 'day'], name='sales_rollu_organiz_d24ecc_idx'), models.Index(fields=['product', 'day'], name='sales_rollu_product_f0dbf2_idx')],
+                'unique_together': {('organization', 'warehouse', 'product', 'day')},
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.8
+
+import django.utils.timezone
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0002_salesrollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ForecastBacktest',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('model_version', models.CharField(max_length=50)),
+                ('level', models.CharField(choices=[('model', 'Model'), ('category', 'Category'), ('product', 'Product')], max_length=20)),
+                ('key', models.CharField(blank=True, help_text='Product id or category; empty for the model level', max_length=255)),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField()),
+                ('observations', models.IntegerField(default=0)),
+                ('mape', models.FloatField(blank=True, help_text='Mean absolute percentage error over days with sales', null=True)),
+                ('bias', models.FloatField(blank=True, help_text='(predicted - actual) / actual, summed over the window', null=True)),
+                ('coverage', models.FloatField(blank=True, help_text='Share of days whose actual fell inside the confidence band', null=True)),
+            ],
+            options={
+                'db_table': 'forecast_backtests',
+                'ordering': ['model_version', 'level', 'key'],
+                'unique_together': {('model_version', 'level', 'key', 'start_date', 'end_date')},
+            },
+        ),
+    ]
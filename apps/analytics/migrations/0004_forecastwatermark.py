@@ -0,0 +1,39 @@
+# Generated by Django 5.2.8
+
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_user_assigned_warehouse'),
+        ('analytics', '0003_forecastbacktest'),
+        ('inventory', '0003_updated_at_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ForecastWatermark',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('model_version', models.CharField(max_length=50)),
+                ('data_updated_at', models.DateTimeField()),
+                ('as_of', models.DateField(help_text='Last day of history used')),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='accounts.organization')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='inventory.product')),
+            ],
+            options={
+                'db_table': 'forecast_watermarks',
+                'unique_together': {('organization', 'product', 'model_version')},
+            },
+        ),
+        migrations.AddIndex(
+            model_name='salesrollup',
+            index=models.Index(fields=['organization', 'updated_at'], name='sales_rollu_organiz_b237a8_idx'),
+        ),
+    ]
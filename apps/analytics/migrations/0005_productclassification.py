@@ -0,0 +1,40 @@
+# Generated by Django 5.2.8
+
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_user_assigned_warehouse'),
+        ('analytics', '0004_forecastwatermark'),
+        ('inventory', '0004_stockalert'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductClassification',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('abc_class', models.CharField(choices=[('A', 'A'), ('B', 'B'), ('C', 'C')], max_length=1)),
+                ('xyz_class', models.CharField(choices=[('X', 'X'), ('Y', 'Y'), ('Z', 'Z')], max_length=1)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('revenue_share', models.FloatField(default=0)),
+                ('cumulative_share', models.FloatField(default=0, help_text='Share of revenue from this and all higher-revenue products')),
+                ('demand_cv', models.FloatField(blank=True, help_text='Coefficient of variation of weekly units sold', null=True)),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField()),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='accounts.organization')),
+                ('product', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='classification', to='inventory.product')),
+            ],
+            options={
+                'db_table': 'product_classifications',
+                'indexes': [models.Index(fields=['organization', 'abc_class', 'xyz_class'], name='product_cla_organiz_c2d97c_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.8
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def delete_backtests(apps, schema_editor):
+    # Existing rows pool every organization's predictions and cannot be
+    # split; the nightly backtest writes them again per organization
+    apps.get_model('analytics', 'ForecastBacktest').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_time_ordered_ids'),
+        ('analytics', '0006_time_ordered_ids'),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_backtests, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='forecastbacktest',
+            unique_together=set(),
+        ),
+        migrations.AddField(
+            model_name='forecastbacktest',
+            name='organization',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='accounts.organization'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='forecastbacktest',
+            unique_together={('organization', 'model_version', 'level', 'key', 'start_date', 'end_date')},
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from apps.core.models import BaseModel
+from apps.core.tenancy import TenantQuerySet, TenantScope
 
 
 class Prediction(BaseModel):
@@ -10,6 +11,9 @@ class Prediction(BaseModel):
     confidence_score = models.FloatField(null=True, blank=True)
     model_version = models.CharField(max_length=50)
 
+    objects = TenantQuerySet.as_manager()
+    tenant_scope = TenantScope('product__organization_id')
+
     class Meta:
         db_table = "predictions"
         ordering = ["-date"]
@@ -29,3 +33,105 @@ class SalesMetric(BaseModel):
         db_table = "sales_metrics"
         unique_together = ["date", "metric_type"]
         ordering = ["-date"]
+
+
+class SalesRollup(BaseModel):
+    """
+    Sales fact table at (organization, warehouse, product, day) grain.
+    Only confirmed, shipped and delivered orders are counted.
+    """
+    organization = models.ForeignKey("accounts.Organization", on_delete=models.CASCADE, related_name="+")
+    warehouse = models.ForeignKey("inventory.Warehouse", on_delete=models.CASCADE, related_name="+")
+    product = models.ForeignKey("inventory.Product", on_delete=models.CASCADE, related_name="+")
+    day = models.DateField()
+    quantity = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    cost = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    order_count = models.IntegerField(default=0)
+
+    objects = TenantQuerySet.as_manager()
+
+    class Meta:
+        db_table = "sales_rollups"
+        ordering = ["-day"]
+        unique_together = ["organization", "warehouse", "product", "day"]
+        indexes = [
+            models.Index(fields=['organization', 'day']),
+            models.Index(fields=['product', 'day']),
+            models.Index(fields=['organization', 'updated_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} @ {self.warehouse_id} on {self.day}"
+
+
+class ForecastBacktest(BaseModel):
+    """Forecast accuracy of a model version over a date window"""
+    LEVEL_CHOICES = [
+        ('model', 'Model'),
+        ('category', 'Category'),
+        ('product', 'Product'),
+    ]
+
+    organization = models.ForeignKey("accounts.Organization", on_delete=models.CASCADE, related_name="+")
+    model_version = models.CharField(max_length=50)
+    level = models.CharField(max_length=20, choices=LEVEL_CHOICES)
+    key = models.CharField(max_length=255, blank=True, help_text="Product id or category; empty for the model level")
+    start_date = models.DateField()
+    end_date = models.DateField()
+    observations = models.IntegerField(default=0)
+    mape = models.FloatField(null=True, blank=True, help_text="Mean absolute percentage error over days with sales")
+    bias = models.FloatField(null=True, blank=True, help_text="(predicted - actual) / actual, summed over the window")
+    coverage = models.FloatField(null=True, blank=True, help_text="Share of days whose actual fell inside the confidence band")
+
+    objects = TenantQuerySet.as_manager()
+
+    class Meta:
+        db_table = "forecast_backtests"
+        ordering = ["model_version", "level", "key"]
+        unique_together = ["organization", "model_version", "level", "key", "start_date", "end_date"]
+
+    def __str__(self):
+        return f"{self.model_version} {self.level} {self.key} ({self.start_date} to {self.end_date})"
+
+
+class ForecastWatermark(BaseModel):
+    """Latest sales rollup change a product's stored forecast was fitted on"""
+    organization = models.ForeignKey("accounts.Organization", on_delete=models.CASCADE, related_name="+")
+    product = models.ForeignKey("inventory.Product", on_delete=models.CASCADE, related_name="+")
+    model_version = models.CharField(max_length=50)
+    data_updated_at = models.DateTimeField()
+    as_of = models.DateField(help_text="Last day of history used")
+
+    class Meta:
+        db_table = "forecast_watermarks"
+        unique_together = ["organization", "product", "model_version"]
+
+    def __str__(self):
+        return f"{self.product_id} {self.model_version} @ {self.data_updated_at}"
+
+
+class ProductClassification(BaseModel):
+    """ABC (revenue contribution) and XYZ (demand variability) class of a product"""
+    ABC_CHOICES = [('A', 'A'), ('B', 'B'), ('C', 'C')]
+    XYZ_CHOICES = [('X', 'X'), ('Y', 'Y'), ('Z', 'Z')]
+
+    organization = models.ForeignKey("accounts.Organization", on_delete=models.CASCADE, related_name="+")
+    product = models.OneToOneField("inventory.Product", on_delete=models.CASCADE, related_name="classification")
+    abc_class = models.CharField(max_length=1, choices=ABC_CHOICES)
+    xyz_class = models.CharField(max_length=1, choices=XYZ_CHOICES)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    revenue_share = models.FloatField(default=0)
+    cumulative_share = models.FloatField(default=0, help_text="Share of revenue from this and all higher-revenue products")
+    demand_cv = models.FloatField(null=True, blank=True, help_text="Coefficient of variation of weekly units sold")
+    start_date = models.DateField()
+    end_date = models.DateField()
+
+    class Meta:
+        db_table = "product_classifications"
+        indexes = [
+            models.Index(fields=['organization', 'abc_class', 'xyz_class']),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} {self.abc_class}{self.xyz_class}"
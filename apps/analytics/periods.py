@@ -0,0 +1,97 @@
+# apps/analytics/periods.py
+"""
+Calendar periods for SalesMetric rollups.
+
+Weekly rows are keyed by the Monday that starts the ISO week, monthly rows
+by the first of the month. Both are built from daily rows, never from
+order items. Time-series buckets use the same keys, plus quarters and years.
+"""
+
+from datetime import date, timedelta
+
+# Coarsest first, with the approximate period length in days
+METRIC_GRAINS = (
+    ('monthly', 30),
+    ('weekly', 7),
+    ('daily', 1),
+)
+
+PERIOD_TYPES = ('weekly', 'monthly')
+
+# Time-series buckets, finest first
+BUCKETS = ('daily', 'weekly', 'monthly', 'quarterly', 'yearly')
+
+
+def _add_months(start, months):
+    month = start.month - 1 + months
+    return date(start.year + month // 12, month % 12 + 1, 1)
+
+
+def period_start(day, metric_type):
+    """First day of the period containing day"""
+    if metric_type == 'weekly':
+        return day - timedelta(days=day.weekday())
+    if metric_type == 'monthly':
+        return day.replace(day=1)
+    if metric_type == 'quarterly':
+        return date(day.year, (day.month - 1) // 3 * 3 + 1, 1)
+    if metric_type == 'yearly':
+        return date(day.year, 1, 1)
+    return day
+
+
+def period_end(start, metric_type):
+    """Last day of the period starting on start"""
+    if metric_type == 'weekly':
+        return start + timedelta(days=6)
+    if metric_type == 'monthly':
+        return _add_months(start, 1) - timedelta(days=1)
+    if metric_type == 'quarterly':
+        return _add_months(start, 3) - timedelta(days=1)
+    if metric_type == 'yearly':
+        return date(start.year, 12, 31)
+    return start
+
+
+def count_periods(start, end, metric_type):
+    """Number of periods overlapping [start, end], without enumerating them"""
+    first, last = period_start(start, metric_type), period_start(end, metric_type)
+    months = (last.year - first.year) * 12 + last.month - first.month
+    if metric_type == 'weekly':
+        return (last - first).days // 7 + 1
+    if metric_type == 'monthly':
+        return months + 1
+    if metric_type == 'quarterly':
+        return months // 3 + 1
+    if metric_type == 'yearly':
+        return last.year - first.year + 1
+    return (end - start).days + 1
+
+
+def periods_between(start, end, metric_type):
+    """Start dates of every period overlapping [start, end]"""
+    periods = [period_start(start, metric_type)]
+    # Counted rather than stepped past end, which may be date.max
+    for _ in range(count_periods(start, end, metric_type) - 1):
+        periods.append(period_end(periods[-1], metric_type) + timedelta(days=1))
+    return periods
+
+
+def choose_grain(start, end, min_points=12):
+    """
+    Coarsest grain that still gives at least min_points periods over
+    [start, end], falling back to daily.
+    """
+    span = (end - start).days + 1
+    for metric_type, length in METRIC_GRAINS:
+        if span / length >= min_points:
+            return metric_type
+    return 'daily'
+
+
+def choose_bucket(start, end, max_points):
+    """Finest bucket that keeps [start, end] within max_points periods"""
+    for bucket in BUCKETS[:-1]:
+        if count_periods(start, end, bucket) <= max_points:
+            return bucket
+    return BUCKETS[-1]
@@ -0,0 +1,125 @@
+# apps/analytics/reorder.py
+"""
+Demand-driven reorder points.
+
+For every stock row, daily demand over the recent history is summarised
+as a mean and standard deviation (one grouped query over the rollup cube,
+summing units and squared units), and
+
+    safety stock  = z * sigma * sqrt(lead time)
+    reorder point = mean * lead time + safety stock
+
+where z is the normal quantile of the target service level. The maths runs
+on whole arrays; only rows whose recommendation changed are written back,
+and rows that sold nothing in the window get no recommendation.
+"""
+
+from datetime import date, timedelta
+from statistics import NormalDist
+
+import numpy as np
+from django.conf import settings
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from apps.inventory.models import Stock
+from .models import SalesRollup
+
+HISTORY_DAYS = 90
+
+STOCK_CHUNK_SIZE = 10000
+UPDATE_BATCH_SIZE = 1000
+
+
+def reorder_points(mean, std, lead_time, service_level):
+    """(safety_stock, reorder_point) arrays, rounded up to whole units"""
+    z = NormalDist().inv_cdf(service_level)
+    safety = np.ceil(np.maximum(z * std * np.sqrt(lead_time), 0) - 1e-9)
+    reorder = np.ceil(mean * lead_time + safety - 1e-9)
+    return safety.astype(np.int64), reorder.astype(np.int64)
+
+
+def _demand(start, end, organization_id=None):
+    """{(warehouse_id, product_id): (units, squared units)} over [start, end]"""
+    rows = SalesRollup.objects.filter(day__gte=start, day__lte=end)
+    if organization_id:
+        rows = rows.filter(organization_id=organization_id)
+    return {
+        (warehouse_id, product_id): (units, squares)
+        for warehouse_id, product_id, units, squares in (
+            rows.values('warehouse', 'product')
+            .annotate(units=Sum('quantity'), squares=Sum(F('quantity') * F('quantity')))
+            .order_by()
+            .values_list('warehouse', 'product', 'units', 'squares')
+        )
+    }
+
+
+def recompute_reorder_points(organization_id=None, as_of=None, apply=False,
+                             history_days=HISTORY_DAYS, lead_time_days=None, service_level=None):
+    """
+    Recompute safety stock and the recommended reorder point of every stock
+    row (of one organization, or all) from demand over the history_days
+    ending on as_of (default: yesterday). With apply, reorder_level is set
+    to the recommendation for rows that sold anything in that window; rows
+    without demand history keep their hand-set level.
+
+    Returns (evaluated, updated) row counts.
+    """
+    as_of = as_of or date.today() - timedelta(days=1)
+    start = as_of - timedelta(days=history_days - 1)
+    if lead_time_days is None:
+        lead_time_days = settings.REORDER_LEAD_TIME_DAYS
+    if service_level is None:
+        service_level = settings.REORDER_SERVICE_LEVEL
+
+    demand = _demand(start, as_of, organization_id)
+
+    stock = Stock.objects.all()
+    if organization_id:
+        stock = stock.filter(warehouse__organization_id=organization_id)
+    rows = list(
+        stock.order_by().values_list(
+            'id', 'warehouse_id', 'product_id', 'lead_time_days',
+            'reorder_level', 'safety_stock', 'recommended_reorder_level',
+        ).iterator(chunk_size=STOCK_CHUNK_SIZE)
+    )
+    if not rows:
+        return 0, 0
+
+    ids, warehouses, products, lead_times, levels, safeties, recommended = zip(*rows)
+    n = len(rows)
+    sums = np.array([demand.get(key, (0, 0)) for key in zip(warehouses, products)], dtype=float).reshape(n, 2)
+    has_demand = sums[:, 0] > 0
+
+    mean = sums[:, 0] / history_days
+    std = np.sqrt(np.maximum(sums[:, 1] / history_days - mean ** 2, 0))
+    lead_time = np.array([lt or lead_time_days for lt in lead_times], dtype=float)
+    safety, reorder = reorder_points(mean, std, lead_time, service_level)
+
+    # Rows without demand get no recommendation; None is stored as -1 to compare
+    safety = np.where(has_demand, safety, -1)
+    reorder = np.where(has_demand, reorder, -1)
+    changed = (
+        (safety != np.array([s if s is not None else -1 for s in safeties]))
+        | (reorder != np.array([r if r is not None else -1 for r in recommended]))
+    )
+    applied = has_demand & (reorder != np.array(levels)) if apply else np.zeros(n, dtype=bool)
+
+    # Recommendations are advisory and leave updated_at alone, so change-feed
+    # clients only re-sync rows whose reorder_level was actually applied
+    now = timezone.now()
+    safety = [value if value >= 0 else None for value in safety.tolist()]
+    reorder = [value if value >= 0 else None for value in reorder.tolist()]
+    advised, updates = [], []
+    for i in np.flatnonzero(changed | applied).tolist():
+        row = Stock(id=ids[i], safety_stock=safety[i], recommended_reorder_level=reorder[i])
+        if applied[i]:
+            row.reorder_level, row.updated_at = reorder[i], now
+            updates.append(row)
+        else:
+            advised.append(row)
+    fields = ['safety_stock', 'recommended_reorder_level']
+    Stock.objects.bulk_update(advised, fields, batch_size=UPDATE_BATCH_SIZE)
+    Stock.objects.bulk_update(updates, fields + ['reorder_level', 'updated_at'], batch_size=UPDATE_BATCH_SIZE)
+    return n, len(advised) + len(updates)
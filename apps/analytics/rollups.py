@@ -0,0 +1,169 @@
+# apps/analytics/rollups.py
+"""
+Maintenance of the SalesRollup fact table.
+
+A cell is (warehouse_id, product_id, day); its organization comes from the
+warehouse. Cells are always recomputed from OrderItem rather than adjusted
+by deltas, so rebuilding a cell twice (or one that did not change) is safe.
+Signals rebuild the cells touched by a committed write; the nightly
+reconciliation rebuilds whole date ranges.
+"""
+
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from apps.sales.models import OrderItem
+from .models import ForecastWatermark, SalesRollup
+
+# Order statuses that count as a sale
+COUNTED_STATUSES = ('confirmed', 'shipped', 'delivered')
+
+ROLLUP_DIMENSIONS = ('organization', 'warehouse', 'product', 'day')
+ROLLUP_MEASURES = ('quantity', 'revenue', 'cost', 'order_count')
+
+CENTS = Decimal('0.01')
+
+# Keep IN (...) lists under the SQLite host-parameter limit
+DELETE_BATCH_SIZE = 500
+
+
+def _money(value):
+    """Round an aggregated amount the way the DecimalField stores it"""
+    return Decimal(value or 0).quantize(CENTS)
+
+
+def _day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def cell_day(created_at):
+    """Day bucket for a timestamp, matching TruncDate in the current timezone"""
+    return timezone.localdate(created_at)
+
+
+def _aggregate(start, end, warehouse_ids=None, product_ids=None):
+    """Group counted order items in [start, end] by rollup key"""
+    items = OrderItem.objects.filter(
+        created_at__gte=_day_start(start),
+        created_at__lt=_day_start(end + timedelta(days=1)),
+        order__status__in=COUNTED_STATUSES,
+        order__warehouse__organization__isnull=False,
+    )
+    if warehouse_ids is not None:
+        items = items.filter(order__warehouse_id__in=warehouse_ids)
+    if product_ids is not None:
+        items = items.filter(product_id__in=product_ids)
+
+    line_cost = ExpressionWrapper(
+        F('quantity') * F('product__cost_price'),
+        output_field=DecimalField(max_digits=14, decimal_places=2),
+    )
+    return (
+        items
+        .annotate(day=TruncDate('created_at'))
+        .values('order__warehouse__organization', 'order__warehouse', 'product', 'day')
+        .annotate(
+            total_quantity=Sum('quantity'),
+            total_revenue=Sum('subtotal'),
+            total_cost=Sum(line_cost),
+            total_orders=Count('order', distinct=True),
+        )
+        .order_by()
+    )
+
+
+def _rebuild(start, end, warehouse_ids=None, product_ids=None, cells=None):
+    """
+    Recompute rollups in [start, end], optionally limited to a set of cells.
+    Only cells whose measures changed are written, so updated_at keeps
+    marking real sales changes. Rows whose cell no longer has any sales
+    are deleted, and since a deleted row leaves no updated_at behind, the
+    forecasts of its product are expired instead so a changed-only refit
+    still sees the drop.
+    """
+    existing = SalesRollup.objects.filter(day__gte=start, day__lte=end)
+    if warehouse_ids is not None:
+        existing = existing.filter(warehouse_id__in=warehouse_ids)
+    if product_ids is not None:
+        existing = existing.filter(product_id__in=product_ids)
+    current = {
+        (organization_id, warehouse_id, product_id, day): (pk, measures)
+        for pk, organization_id, warehouse_id, product_id, day, *measures in existing.values_list(
+            'pk', *ROLLUP_DIMENSIONS, *ROLLUP_MEASURES
+        )
+        if cells is None or (warehouse_id, product_id, day) in cells
+    }
+
+    live = set()
+    rollups = []
+    for row in _aggregate(start, end, warehouse_ids, product_ids):
+        if cells is not None and (row['order__warehouse'], row['product'], row['day']) not in cells:
+            continue
+        rollup = SalesRollup(
+            organization_id=row['order__warehouse__organization'],
+            warehouse_id=row['order__warehouse'],
+            product_id=row['product'],
+            day=row['day'],
+            quantity=row['total_quantity'] or 0,
+            revenue=_money(row['total_revenue']),
+            cost=_money(row['total_cost']),
+            order_count=row['total_orders'] or 0,
+        )
+        key = (rollup.organization_id, rollup.warehouse_id, rollup.product_id, rollup.day)
+        live.add(key)
+        if key not in current or current[key][1] != [getattr(rollup, m) for m in ROLLUP_MEASURES]:
+            rollups.append(rollup)
+
+    if rollups:
+        SalesRollup.objects.bulk_create(
+            rollups,
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=['organization', 'warehouse', 'product', 'day'],
+            update_fields=['quantity', 'revenue', 'cost', 'order_count', 'updated_at'],
+        )
+
+    stale = [key for key in current if key not in live]
+    stale_pks = [current[key][0] for key in stale]
+    for i in range(0, len(stale_pks), DELETE_BATCH_SIZE):
+        SalesRollup.objects.filter(pk__in=stale_pks[i:i + DELETE_BATCH_SIZE]).delete()
+    if stale:
+        _expire_forecasts({(organization_id, product_id) for organization_id, _, product_id, _ in stale})
+
+    return len(rollups), len(stale)
+
+
+def _expire_forecasts(products):
+    """Mark the forecasts of (organization_id, product_id) pairs for refitting"""
+    by_organization = {}
+    for organization_id, product_id in products:
+        by_organization.setdefault(organization_id, []).append(product_id)
+    for organization_id, product_ids in by_organization.items():
+        for i in range(0, len(product_ids), DELETE_BATCH_SIZE):
+            ForecastWatermark.objects.filter(
+                organization_id=organization_id, product_id__in=product_ids[i:i + DELETE_BATCH_SIZE]
+            ).update(as_of=date.min)
+
+
+def rebuild_cells(cells):
+    """Recompute the given (warehouse_id, product_id, day) cells"""
+    cells = {cell for cell in cells if cell[0] is not None}
+    if not cells:
+        return 0, 0
+
+    days = [day for _, _, day in cells]
+    return _rebuild(
+        min(days), max(days),
+        warehouse_ids={warehouse_id for warehouse_id, _, _ in cells},
+        product_ids={product_id for _, product_id, _ in cells},
+        cells=cells,
+    )
+
+
+def rebuild_range(start, end):
+    """Recompute every rollup for days in [start, end]"""
+    return _rebuild(start, end)
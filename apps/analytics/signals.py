@@ -0,0 +1,117 @@
+import logging
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_save, pre_delete, pre_save
+
+logger = logging.getLogger(__name__)
+
+
+def _counted(status):
+    from .rollups import COUNTED_STATUSES
+    return status in COUNTED_STATUSES
+
+
+def _flush(cells):
+    from .rollups import rebuild_cells
+    try:
+        rebuild_cells(cells)
+    except Exception:
+        # The nightly reconciliation repairs anything missed here
+        logger.exception("Failed to update %d sales rollup cells", len(cells))
+
+
+def _schedule(cells):
+    """Rebuild cells once the current transaction commits"""
+    if cells:
+        transaction.on_commit(partial(_flush, frozenset(cells)))
+
+
+def _order_cells(order_id, warehouse_ids):
+    from apps.sales.models import OrderItem
+    from .rollups import cell_day
+
+    items = OrderItem.objects.filter(order_id=order_id).values_list('product_id', 'created_at')
+    return {
+        (warehouse_id, product_id, cell_day(created_at))
+        for product_id, created_at in items
+        for warehouse_id in warehouse_ids
+        if warehouse_id is not None
+    }
+
+
+def remember_order_state(sender, instance, **kwargs):
+    """Keep the stored status and warehouse so post_save can see what changed"""
+    if instance._state.adding:
+        instance._rollup_previous = None
+        return
+    instance._rollup_previous = (
+        sender.objects.filter(pk=instance.pk).values_list('status', 'warehouse_id').first()
+    )
+
+
+def order_saved(sender, instance, created, **kwargs):
+    previous = getattr(instance, '_rollup_previous', None)
+    if created or previous is None:
+        # A new order has no items yet
+        return
+
+    old_status, old_warehouse_id = previous
+    if (old_status, old_warehouse_id) == (instance.status, instance.warehouse_id):
+        return
+    if not (_counted(old_status) or _counted(instance.status)):
+        return
+
+    _schedule(_order_cells(instance.pk, {old_warehouse_id, instance.warehouse_id}))
+
+
+def order_deleted(sender, instance, **kwargs):
+    if _counted(instance.status):
+        _schedule(_order_cells(instance.pk, {instance.warehouse_id}))
+
+
+def remember_item_state(sender, instance, **kwargs):
+    if instance._state.adding:
+        instance._rollup_previous = None
+        return
+    instance._rollup_previous = (
+        sender.objects.filter(pk=instance.pk).values_list('product_id', 'created_at').first()
+    )
+
+
+def item_saved(sender, instance, **kwargs):
+    from .rollups import cell_day
+
+    order = instance.order
+    if not _counted(order.status):
+        # Uncounted orders contribute nothing; confirming the order rebuilds its cells
+        return
+
+    cells = {(order.warehouse_id, instance.product_id, cell_day(instance.created_at))}
+    previous = getattr(instance, '_rollup_previous', None)
+    if previous:
+        product_id, created_at = previous
+        cells.add((order.warehouse_id, product_id, cell_day(created_at)))
+    _schedule(cells)
+
+
+def item_deleted(sender, instance, origin=None, **kwargs):
+    from apps.sales.models import Order
+    from .rollups import cell_day
+
+    # Deleting an order rebuilds all of its cells in order_deleted
+    if isinstance(origin, Order) or getattr(origin, 'model', None) is Order:
+        return
+
+    order = instance.order
+    if _counted(order.status):
+        _schedule({(order.warehouse_id, instance.product_id, cell_day(instance.created_at))})
+
+
+def connect_rollup_signals():
+    pre_save.connect(remember_order_state, sender='sales.Order', dispatch_uid='rollup_order_pre_save')
+    post_save.connect(order_saved, sender='sales.Order', dispatch_uid='rollup_order_saved')
+    pre_delete.connect(order_deleted, sender='sales.Order', dispatch_uid='rollup_order_deleted')
+    pre_save.connect(remember_item_state, sender='sales.OrderItem', dispatch_uid='rollup_item_pre_save')
+    post_save.connect(item_saved, sender='sales.OrderItem', dispatch_uid='rollup_item_saved')
+    pre_delete.connect(item_deleted, sender='sales.OrderItem', dispatch_uid='rollup_item_deleted')
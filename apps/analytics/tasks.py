@@ -1,48 +1,251 @@
 from celery import shared_task
 from apps.sales.models import OrderItem
-from apps.analytics.models import Prediction, SalesMetric
+from apps.analytics.models import Prediction, SalesMetric, SalesRollup
+from apps.analytics.backtesting import backtest
+from apps.analytics.classification import classify_organization
+from apps.analytics.forecasting import MODEL_VERSION, forecast_organization
+from apps.analytics.periods import PERIOD_TYPES, period_end, period_start
+from apps.analytics.reorder import recompute_reorder_points
+from apps.analytics.rollups import rebuild_range
+from apps.core.routing import replica_reads
 from django.db.models import Sum, Count
-from datetime import date
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from datetime import date, datetime, time, timedelta
+
+
+def _day_start(day):
+    """Aware midnight for a date, so ranges can hit the created_at index"""
+    return timezone.make_aware(datetime.combine(day, time.min))
 
 
 @shared_task
 def generate_sales_prediction(product_id):
+    """Forecast a single product (prefer generate_sales_predictions for batches)"""
+    organization_ids = (
+        SalesRollup.objects.filter(product_id=product_id)
+        .values_list('organization_id', flat=True).distinct()
+    )
+    forecast = sum(
+        forecast_organization(organization_id, product_ids=[product_id])
+        for organization_id in organization_ids
+    )
+    return f"Forecast {forecast} product(s) for {product_id}"
+
+
+@shared_task
+def generate_sales_predictions(organization_id=None, full=False):
     """
-    Generate ML-based sales prediction for a product
-    TODO: Integrate ML model (Prophet/LSTM)
+    Forecast products of an organization (default: all active
+    organizations) in one vectorized batch per organization.
+    
+    Only products whose sales changed since their last fit are refit
+    unless full is set. Large batches are sharded across processes
+    (FORECAST_WORKERS) when the caller is allowed to start them.
     """
-    # Placeholder - will add ML logic later
-    pass
+    from apps.accounts.models import Organization
+    
+    if organization_id:
+        organization_ids = [organization_id]
+    else:
+        organization_ids = Organization.objects.filter(is_active=True).values_list('id', flat=True)
+    
+    total = 0
+    for org_id in organization_ids:
+        with replica_reads():
+            total += forecast_organization(org_id, changed_only=not full)
+    return f"Forecast {total} products with {MODEL_VERSION}"
+
+
+@shared_task
+def classify_products(organization_id=None):
+    """
+    Recompute ABC/XYZ classes for the products of an organization
+    (default: all active organizations) from the last year of weekly sales.
+    """
+    from apps.accounts.models import Organization
+    
+    if organization_id:
+        organization_ids = [organization_id]
+    else:
+        organization_ids = Organization.objects.filter(is_active=True).values_list('id', flat=True)
+    
+    total = 0
+    for org_id in organization_ids:
+        with replica_reads():
+            total += classify_organization(org_id)
+    return f"Classified {total} products"
+
+
+@shared_task
+def optimize_reorder_levels(organization_id=None, apply=None):
+    """
+    Recommend safety stock and reorder points for every stock row from
+    recent demand. Applies them to reorder_level when apply is set
+    (default: REORDER_AUTO_APPLY).
+    """
+    from django.conf import settings
+    
+    if apply is None:
+        apply = settings.REORDER_AUTO_APPLY
+    with replica_reads():
+        evaluated, updated = recompute_reorder_points(organization_id, apply=apply)
+    return f"Reorder points for {evaluated} stock rows ({updated} changed{', applied' if apply else ''})"
 
 
 @shared_task
 def calculate_daily_metrics():
     """Calculate daily sales metrics"""
     today = date.today()
+    backfill_daily_metrics(today.isoformat(), today.isoformat())
+    return f"Metrics calculated for {today}"
+
+
+@shared_task
+def backfill_daily_metrics(start_date, end_date):
+    """
+    Recompute daily metrics for every day in [start_date, end_date].
+    Reads the primary: stale values written here overwrite the good ones.
     
-    # Aggregate today's sales
-    orders = OrderItem.objects.filter(created_at__date=today)
-    total_sales = orders.aggregate(total=Sum('subtotal'))['total'] or 0
-    total_orders = orders.values('order').distinct().count()
-    
-    SalesMetric.objects.update_or_create(
-        date=today,
-        metric_type='daily',
-        defaults={
-            'total_sales': total_sales,
-            'total_orders': total_orders
-        }
+    One TruncDate-grouped query over a half-open created_at range,
+    then one upsert of all days (days without sales are written as zero
+    so a recompute clears stale values). Weekly and monthly rows are
+    rebuilt for the periods whose daily values changed. Dates are ISO strings.
+    """
+    start = date.fromisoformat(str(start_date))
+    end = date.fromisoformat(str(end_date))
+    
+    daily = (
+        OrderItem.objects
+        .filter(created_at__gte=_day_start(start), created_at__lt=_day_start(end + timedelta(days=1)))
+        .annotate(day=TruncDate('created_at'))
+        .values('day')
+        .annotate(total_sales=Sum('subtotal'), total_orders=Count('order', distinct=True))
+        .order_by()
     )
+    totals = {row['day']: row for row in daily}
+    previous = {
+        row[0]: row[1:]
+        for row in SalesMetric.objects.filter(
+            metric_type='daily', date__gte=start, date__lte=end
+        ).values_list('date', 'total_sales', 'total_orders')
+    }
     
-    return f"Metrics calculated for {today}"
+    metrics = []
+    changed = set()
+    day = start
+    while day <= end:
+        row = totals.get(day, {})
+        metric = SalesMetric(
+            date=day,
+            metric_type='daily',
+            total_sales=row.get('total_sales') or 0,
+            total_orders=row.get('total_orders') or 0,
+        )
+        if previous.get(day) != (metric.total_sales, metric.total_orders):
+            changed.add(day)
+        metrics.append(metric)
+        day += timedelta(days=1)
+    
+    _upsert_metrics(metrics)
+    periods = rollup_period_metrics(changed)
+    
+    return f"Metrics calculated for {start} to {end} ({len(metrics)} days, {periods} periods)"
+
+
+def _upsert_metrics(metrics):
+    SalesMetric.objects.bulk_create(
+        metrics,
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=['date', 'metric_type'],
+        update_fields=['total_sales', 'total_orders', 'updated_at'],
+    )
+
+
+def rollup_period_metrics(days):
+    """
+    Rebuild the weekly and monthly rows covering the given days from the
+    daily rows: one read of the affected daily rows and one upsert.
+    Returns the number of periods written.
+    """
+    periods = {
+        (metric_type, period_start(day, metric_type))
+        for day in days
+        for metric_type in PERIOD_TYPES
+    }
+    if not periods:
+        return 0
+    
+    first = min(period for _, period in periods)
+    last = max(period_end(period, metric_type) for metric_type, period in periods)
+    
+    sums = {key: [0, 0] for key in periods}
+    daily = SalesMetric.objects.filter(
+        metric_type='daily', date__gte=first, date__lte=last
+    ).values_list('date', 'total_sales', 'total_orders')
+    for day, total_sales, total_orders in daily:
+        for metric_type in PERIOD_TYPES:
+            key = (metric_type, period_start(day, metric_type))
+            if key in sums:
+                sums[key][0] += total_sales
+                sums[key][1] += total_orders
+    
+    _upsert_metrics([
+        SalesMetric(date=period, metric_type=metric_type, total_sales=total_sales, total_orders=total_orders)
+        for (metric_type, period), (total_sales, total_orders) in sums.items()
+    ])
+    return len(sums)
 
 
 @shared_task
-def check_low_stock_alerts():
-    """Check for low stock and send alerts"""
-    from apps.inventory.models import Stock
+def backtest_predictions(start_date=None, end_date=None, organization_id=None):
+    """
+    Score stored predictions against actual sales per product, category
+    and model version, for an organization (default: all active
+    organizations). Defaults to the 28 days ending yesterday.
+    """
+    from apps.accounts.models import Organization
     
-    low_stocks = Stock.objects.filter(quantity__lte=models.F('reorder_level'))
+    end = date.fromisoformat(str(end_date)) if end_date else date.today() - timedelta(days=1)
+    start = date.fromisoformat(str(start_date)) if start_date else end - timedelta(days=27)
+    
+    if organization_id:
+        organization_ids = [organization_id]
+    else:
+        organization_ids = Organization.objects.filter(is_active=True).values_list('id', flat=True)
+    
+    written = 0
+    for org_id in organization_ids:
+        with replica_reads():
+            written += backtest(org_id, start, end)
+    return f"Backtested predictions for {start} to {end} ({written} metric rows)"
+
+
+@shared_task
+def rebuild_sales_rollups(start_date=None, end_date=None):
+    """
+    Nightly reconciliation of the sales rollup cube. Reads the primary: a
+    lagging replica would make cells the signals just wrote look stale.
+    
+    Signals keep rollups current as orders change; this recomputes whole
+    days to repair anything they missed (bulk writes, failed callbacks).
+    Defaults to the last 35 days. Dates are ISO strings.
+    """
+    end = date.fromisoformat(str(end_date)) if end_date else date.today()
+    start = date.fromisoformat(str(start_date)) if start_date else end - timedelta(days=35)
+    
+    written, deleted = rebuild_range(start, end)
+    return f"Rollups rebuilt for {start} to {end} ({written} written, {deleted} deleted)"
+
+
+@shared_task
+def check_low_stock_alerts():
+    """
+    Open and resolve low-stock alerts for stock changed since the last
+    run and send one digest per organization and warehouse.
+    """
+    from apps.inventory.alerts import evaluate_stock_alerts
     
-    # TODO: Send email/SMS alerts
-    return f"Found {low_stocks.count()} low stock items"
+    opened, resolved, digests = evaluate_stock_alerts()
+    return f"{opened} low stock alerts opened, {resolved} resolved, {digests} digests"
@@ -1,3 +1,568 @@
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from unittest.mock import patch
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+from apps.accounts.models import Organization, User
+from apps.inventory.models import Product, Stock, Warehouse
+from apps.sales.models import Customer, Order, OrderItem
+import numpy as np
+from apps.analytics.models import ForecastBacktest, Prediction, ProductClassification, SalesMetric, SalesRollup
+from apps.analytics.backtesting import backtest
+from apps.analytics.classification import classify_organization
+from apps.analytics.periods import BUCKETS, count_periods, periods_between
+from apps.analytics.reorder import recompute_reorder_points
+from apps.analytics.rollups import rebuild_range
+from apps.analytics.forecasting import MODEL_VERSION, forecast_organization
+from apps.analytics.smoothing import forecast, forecast_parallel
+from apps.analytics.tasks import backfill_daily_metrics, rebuild_sales_rollups
 
-# Create your tests here.
+
+class AnalyticsTestCase(TestCase):
+    """Shared fixtures for analytics task tests"""
+    
+    def setUp(self):
+        self.organization = Organization.objects.create(name='Acme', slug='acme')
+        self.warehouse = Warehouse.objects.create(
+            name='Main', location='Padova', organization=self.organization
+        )
+        self.customer = Customer.objects.create(name='Customer', organization=self.organization)
+        self.product = Product.objects.create(
+            name='Wine', sku='WINE-001', category='Wine',
+            cost_price='10.00', selling_price='20.00'
+        )
+    
+    def create_sale(self, day, quantity=1, price='20.00', product=None, status='confirmed'):
+        """Order with one item, both stamped at noon on the given day"""
+        created_at = timezone.make_aware(datetime.combine(day, time(12)))
+        order = Order.objects.create(
+            customer=self.customer, warehouse=self.warehouse, status=status, created_at=created_at
+        )
+        OrderItem.objects.create(
+            order=order, product=product or self.product,
+            quantity=quantity, price=price, subtotal=0, created_at=created_at
+        )
+        return order
+
+
+class BackfillDailyMetricsTests(AnalyticsTestCase):
+    """Test range backfill of daily metrics"""
+    
+    def test_backfill_range(self):
+        start = date(2025, 1, 1)
+        self.create_sale(start, quantity=2)
+        self.create_sale(start)
+        self.create_sale(start + timedelta(days=2), quantity=5)
+        SalesMetric.objects.create(date=start + timedelta(days=1), metric_type='daily', total_sales=99, total_orders=9)
+        
+        # Aggregate, previous daily rows, daily upsert, then weekly/monthly read and upsert
+        with self.assertNumQueries(5):
+            backfill_daily_metrics(start.isoformat(), (start + timedelta(days=3)).isoformat())
+        
+        metrics = {m.date: m for m in SalesMetric.objects.filter(metric_type='daily')}
+        self.assertEqual(len(metrics), 4)
+        self.assertEqual(metrics[start].total_sales, Decimal('60.00'))
+        self.assertEqual(metrics[start].total_orders, 2)
+        # Stale values are cleared on recompute
+        self.assertEqual(metrics[start + timedelta(days=1)].total_orders, 0)
+        self.assertEqual(metrics[start + timedelta(days=2)].total_sales, Decimal('100.00'))
+
+    def test_periods_built_from_daily_rows(self):
+        # 2025-01-05 is a Sunday, 2025-01-06 starts the next ISO week
+        self.create_sale(date(2025, 1, 2), quantity=2)
+        self.create_sale(date(2025, 1, 5))
+        self.create_sale(date(2025, 1, 6), quantity=3)
+        backfill_daily_metrics('2025-01-01', '2025-01-10')
+        
+        weekly = {m.date: m.total_sales for m in SalesMetric.objects.filter(metric_type='weekly')}
+        self.assertEqual(weekly, {date(2024, 12, 30): Decimal('60.00'), date(2025, 1, 6): Decimal('60.00')})
+        monthly = SalesMetric.objects.get(metric_type='monthly')
+        self.assertEqual(monthly.date, date(2025, 1, 1))
+        self.assertEqual(monthly.total_sales, Decimal('120.00'))
+        self.assertEqual(monthly.total_orders, 3)
+        
+        # Unchanged days leave the periods alone
+        with self.assertNumQueries(3):
+            backfill_daily_metrics('2025-01-01', '2025-01-10')
+        
+        self.create_sale(date(2025, 1, 7))
+        backfill_daily_metrics('2025-01-01', '2025-01-10')
+        self.assertEqual(
+            SalesMetric.objects.get(metric_type='weekly', date=date(2025, 1, 6)).total_sales,
+            Decimal('80.00')
+        )
+        self.assertEqual(SalesMetric.objects.get(metric_type='monthly').total_orders, 4)
+    
+    def test_api_picks_coarsest_grain(self):
+        for day, metric_type in ((date(2024, 1, 1), 'monthly'), (date(2024, 1, 1), 'weekly'), (date(2024, 1, 1), 'daily')):
+            SalesMetric.objects.create(date=day, metric_type=metric_type)
+        manager = User.objects.create_user(
+            username='manager', password='pass', email='manager@test.com',
+            role='manager', organization=self.organization
+        )
+        client = APIClient()
+        client.force_authenticate(user=manager)
+        
+        for start, expected in (('2022-02-01', 'monthly'), ('2023-10-01', 'weekly'), ('2023-12-15', 'daily')):
+            response = client.get('/api/metrics/', {'start': start, 'end': '2024-01-31'})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual([m['metric_type'] for m in response.data['results']], [expected])
+
+
+class SalesRollupTests(AnalyticsTestCase):
+    """Test incremental and reconciled maintenance of the rollup cube"""
+    
+    def setUp(self):
+        super().setUp()
+        Stock.objects.create(product=self.product, warehouse=self.warehouse, quantity=100)
+        self.day = date(2025, 3, 1)
+    
+    def test_signals_follow_order_lifecycle(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            order = self.create_sale(self.day, quantity=3, status='pending')
+        self.assertFalse(SalesRollup.objects.exists())
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            order.status = 'confirmed'
+            order.save()
+        rollup = SalesRollup.objects.get()
+        self.assertEqual(rollup.organization, self.organization)
+        self.assertEqual(rollup.day, self.day)
+        self.assertEqual(rollup.quantity, 3)
+        self.assertEqual(rollup.revenue, Decimal('60.00'))
+        self.assertEqual(rollup.cost, Decimal('30.00'))
+        self.assertEqual(rollup.order_count, 1)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_sale(self.day, quantity=1)
+        rollup.refresh_from_db()
+        self.assertEqual(rollup.quantity, 4)
+        self.assertEqual(rollup.order_count, 2)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            order.status = 'cancelled'
+            order.save()
+        rollup.refresh_from_db()
+        self.assertEqual(rollup.quantity, 1)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            Order.objects.all().delete()
+        self.assertFalse(SalesRollup.objects.exists())
+    
+    def test_reconciliation_repairs_drift(self):
+        self.create_sale(self.day, quantity=2)
+        self.create_sale(self.day + timedelta(days=1), quantity=5)
+        stale_product = Product.objects.create(
+            name='Gone', sku='GONE-001', cost_price='1.00', selling_price='2.00'
+        )
+        SalesRollup.objects.create(
+            organization=self.organization, warehouse=self.warehouse,
+            product=stale_product, day=self.day, quantity=9
+        )
+        
+        rebuild_sales_rollups(self.day.isoformat(), (self.day + timedelta(days=1)).isoformat())
+        
+        rollups = {r.day: r.quantity for r in SalesRollup.objects.filter(product=self.product)}
+        self.assertEqual(rollups, {self.day: 2, self.day + timedelta(days=1): 5})
+        self.assertFalse(SalesRollup.objects.filter(product=stale_product).exists())
+    
+    def test_unchanged_rollups_keep_updated_at(self):
+        self.create_sale(self.day, quantity=2)
+        self.assertEqual(rebuild_range(self.day, self.day), (1, 0))
+        rollup = SalesRollup.objects.get()
+
+        self.assertEqual(rebuild_range(self.day, self.day), (0, 0))
+        self.assertEqual(SalesRollup.objects.get().updated_at, rollup.updated_at)
+
+        self.create_sale(self.day, quantity=1)
+        self.assertEqual(rebuild_range(self.day, self.day), (1, 0))
+        self.assertGreater(SalesRollup.objects.get().updated_at, rollup.updated_at)
+    
+    def test_slice_api(self):
+        other = Product.objects.create(
+            name='Beer', sku='BEER-001', cost_price='1.00', selling_price='2.00'
+        )
+        self.create_sale(self.day, quantity=2)
+        self.create_sale(self.day, quantity=4, price='2.00', product=other)
+        self.create_sale(self.day + timedelta(days=1), quantity=1)
+        rebuild_sales_rollups(self.day.isoformat(), (self.day + timedelta(days=1)).isoformat())
+        
+        foreign = Organization.objects.create(name='Other', slug='other')
+        foreign_warehouse = Warehouse.objects.create(name='Far', location='Rome', organization=foreign)
+        SalesRollup.objects.create(
+            organization=foreign, warehouse=foreign_warehouse,
+            product=self.product, day=self.day, quantity=50
+        )
+        
+        manager = User.objects.create_user(
+            username='manager', password='pass', email='manager@test.com',
+            role='manager', organization=self.organization
+        )
+        client = APIClient()
+        client.force_authenticate(user=manager)
+        
+        response = client.get('/api/rollups/slice/', {'dimensions': 'product'})
+        self.assertEqual(response.status_code, 200)
+        by_sku = {row['product__sku']: row for row in response.data['results']}
+        self.assertEqual(by_sku['WINE-001']['quantity'], 3)
+        self.assertEqual(by_sku['BEER-001']['revenue'], Decimal('8.00'))
+        
+        response = client.get('/api/rollups/slice/', {'end': self.day.isoformat()})
+        self.assertEqual(response.data['results'], [{
+            'quantity': 6, 'revenue': Decimal('48.00'), 'cost': Decimal('24.00'), 'order_count': 2
+        }])
+        
+        response = client.get('/api/rollups/slice/', {'dimensions': 'customer'})
+        self.assertEqual(response.status_code, 400)
+
+
+class TimeSeriesTests(AnalyticsTestCase):
+    """Test the bounded time-series endpoint over the rollup cube"""
+    
+    def setUp(self):
+        super().setUp()
+        beer = Product.objects.create(
+            name='Beer', sku='BEER-001', category='Beer', cost_price='1.00', selling_price='2.00'
+        )
+        day = date(2023, 1, 1)
+        while day <= date(2024, 12, 31):
+            for product in (self.product, beer):
+                SalesRollup.objects.create(
+                    organization=self.organization, warehouse=self.warehouse,
+                    product=product, day=day, quantity=1, revenue=2
+                )
+            day += timedelta(days=3)
+        
+        manager = User.objects.create_user(
+            username='manager', password='pass', email='manager@test.com',
+            role='manager', organization=self.organization
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=manager)
+    
+    def test_points_pick_bucket(self):
+        response = self.client.get('/api/rollups/timeseries/', {
+            'start': '2023-01-01', 'end': '2024-12-31', 'points': 30, 'category': 'Wine'
+        })
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['bucket'], 'monthly')
+        points = response.data['points']
+        self.assertEqual(len(points), 24)
+        self.assertEqual(points[0]['period'], date(2023, 1, 1))
+        self.assertEqual(points[0]['quantity'], 11)
+        self.assertEqual(sum(p['quantity'] for p in points), 244)
+    
+    def test_explicit_bucket_fills_gaps(self):
+        response = self.client.get('/api/rollups/timeseries/', {
+            'start': '2025-01-01', 'end': '2025-01-20', 'bucket': 'weekly'
+        })
+        
+        self.assertEqual([p['period'] for p in response.data['points']], [
+            date(2024, 12, 30), date(2025, 1, 6), date(2025, 1, 13), date(2025, 1, 20)
+        ])
+        self.assertEqual({p['quantity'] for p in response.data['points']}, {0})
+        
+        response = self.client.get('/api/rollups/timeseries/', {'bucket': 'hourly'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_huge_ranges_rejected_before_enumeration(self):
+        for bucket in BUCKETS:
+            self.assertEqual(
+                count_periods(date(2023, 2, 14), date(2025, 11, 3), bucket),
+                len(periods_between(date(2023, 2, 14), date(2025, 11, 3), bucket))
+            )
+
+        with patch('apps.api.views.periods_between') as enumerate_periods:
+            response = self.client.get('/api/rollups/timeseries/', {
+                'start': '0001-01-01', 'end': '9999-12-31', 'bucket': 'daily'
+            })
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('3652059 daily buckets', response.data['error'])
+        enumerate_periods.assert_not_called()
+
+        response = self.client.get('/api/rollups/timeseries/', {'start': '9990-06-01', 'end': '9999-12-31'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['bucket'], 'monthly')
+        self.assertEqual(len(response.data['points']), 115)
+
+
+class ForecastingTests(AnalyticsTestCase):
+    """Test the vectorized batch forecaster"""
+    
+    def test_learns_weekly_pattern_for_all_rows(self):
+        week = np.array([10, 2, 2, 2, 2, 2, 0], dtype=float)
+        matrix = np.vstack([np.tile(week, 8), np.tile(week * 3, 8), np.zeros(56)])
+        
+        forecasts, confidence = forecast(matrix, horizon=7)
+        
+        np.testing.assert_allclose(forecasts[0], week, atol=0.01)
+        np.testing.assert_allclose(forecasts[1], week * 3, atol=0.01)
+        np.testing.assert_allclose(forecasts[2], 0)
+        self.assertGreater(confidence[0], 0.99)
+        self.assertEqual(confidence[2], 0)
+    
+    def test_forecast_organization_replaces_predictions(self):
+        as_of = date(2025, 3, 31)
+        other = Product.objects.create(
+            name='Beer', sku='BEER-001', cost_price='1.00', selling_price='2.00'
+        )
+        for offset in range(28):
+            for product, units in ((self.product, 4), (other, 1)):
+                SalesRollup.objects.create(
+                    organization=self.organization, warehouse=self.warehouse, product=product,
+                    day=as_of - timedelta(days=offset), quantity=units
+                )
+        
+        # Latest changes, rollup read, then delete, insert and watermarks in a savepoint
+        with self.assertNumQueries(7):
+            self.assertEqual(forecast_organization(self.organization.id, as_of=as_of, horizon=7), 2)
+        forecast_organization(self.organization.id, as_of=as_of, horizon=7)
+        
+        predictions = Prediction.objects.filter(product=self.product)
+        self.assertEqual(predictions.count(), 7)
+        self.assertEqual({p.model_version for p in predictions}, {MODEL_VERSION})
+        self.assertEqual(min(p.date for p in predictions), as_of + timedelta(days=1))
+        self.assertEqual({p.predicted_quantity for p in predictions}, {4})
+
+    def test_prediction_api_is_tenant_scoped(self):
+        foreign = Organization.objects.create(name='Other', slug='other')
+        beer = Product.objects.create(
+            name='Beer', sku='BEER-001', cost_price='1.00', selling_price='2.00', organization=foreign
+        )
+        Product.objects.filter(pk=self.product.pk).update(organization=self.organization)
+        for product in (self.product, beer):
+            Prediction.objects.create(product=product, date=date(2025, 4, 1), predicted_quantity=3, model_version='v1')
+
+        manager = User.objects.create_user(
+            username='manager', password='pass', email='manager@test.com',
+            role='manager', organization=self.organization
+        )
+        client = APIClient()
+        client.force_authenticate(user=manager)
+        response = client.get('/api/predictions/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([p['product'] for p in response.data['results']], [self.product.id])
+
+
+class BacktestTests(AnalyticsTestCase):
+    """Test scoring of stored predictions against actual sales"""
+    
+    def test_metrics_per_product_category_and_model(self):
+        day = date(2025, 4, 1)
+        beer = Product.objects.create(
+            name='Beer', sku='BEER-001', category='Beer', cost_price='1.00', selling_price='2.00',
+            organization=self.organization
+        )
+        foreign = Organization.objects.create(name='Other', slug='other')
+        cider = Product.objects.create(
+            name='Cider', sku='CIDER-001', category='Wine', cost_price='1.00', selling_price='2.00',
+            organization=foreign
+        )
+        Product.objects.filter(pk=self.product.pk).update(organization=self.organization)
+        Prediction.objects.create(product=cider, date=day, predicted_quantity=50, model_version='v1')
+        for product, offset, units in ((self.product, 0, 10), (beer, 0, 4), (beer, 1, 4)):
+            SalesRollup.objects.create(
+                organization=self.organization, warehouse=self.warehouse,
+                product=product, day=day + timedelta(days=offset), quantity=units
+            )
+        for version, product, offset, predicted, confidence in (
+            ('v1', self.product, 0, 8, 0.8),
+            ('v1', self.product, 1, 0, 0.8),
+            ('v1', beer, 0, 4, 0.5),
+            ('v1', beer, 1, 6, 0.5),
+            ('v2', self.product, 0, 10, 1.0),
+        ):
+            Prediction.objects.create(
+                product=product, date=day + timedelta(days=offset), predicted_quantity=predicted,
+                confidence_score=confidence, model_version=version
+            )
+        
+        # Predictions, actuals, categories, upsert
+        with self.assertNumQueries(4):
+            self.assertEqual(backtest(self.organization.id, day, day + timedelta(days=1)), 8)
+        
+        results = {(r.model_version, r.level, r.key): r for r in ForecastBacktest.objects.all()}
+        self.assertEqual({r.organization_id for r in results.values()}, {self.organization.id})
+        model = results[('v1', 'model', '')]
+        self.assertEqual(model.observations, 4)
+        self.assertAlmostEqual(model.mape, 0.2333)
+        self.assertEqual(model.bias, 0)
+        self.assertEqual(model.coverage, 0.75)
+        
+        wine = results[('v1', 'category', 'Wine')]
+        self.assertEqual((wine.mape, wine.bias, wine.coverage), (0.2, -0.2, 0.5))
+        product = results[('v1', 'product', str(beer.id))]
+        self.assertEqual((product.mape, product.bias, product.coverage), (0.25, 0.25, 1.0))
+        self.assertEqual(results[('v2', 'model', '')].mape, 0)
+        
+        backtest(foreign.id, day, day + timedelta(days=1))
+        manager = User.objects.create_user(
+            username='manager', password='pass', email='manager@test.com',
+            role='manager', organization=self.organization
+        )
+        client = APIClient()
+        client.force_authenticate(user=manager)
+        response = client.get('/api/backtests/', {'level': 'product'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual({r['key'] for r in response.data['results']}, {str(self.product.id), str(beer.id)})
+    
+    def test_refits_only_changed_products(self):
+        as_of = date(2025, 3, 31)
+        other = Product.objects.create(
+            name='Beer', sku='BEER-001', cost_price='1.00', selling_price='2.00'
+        )
+        for product in (self.product, other):
+            SalesRollup.objects.create(
+                organization=self.organization, warehouse=self.warehouse,
+                product=product, day=as_of, quantity=7
+            )
+        self.assertEqual(forecast_organization(self.organization.id, as_of=as_of, changed_only=True), 2)
+        self.assertEqual(forecast_organization(self.organization.id, as_of=as_of, changed_only=True), 0)
+        
+        rollup = SalesRollup.objects.get(product=other)
+        rollup.quantity = 70
+        rollup.save()
+        
+        untouched = set(Prediction.objects.filter(product=self.product).values_list('id', flat=True))
+        self.assertEqual(forecast_organization(self.organization.id, as_of=as_of, changed_only=True), 1)
+        self.assertEqual(set(Prediction.objects.filter(product=self.product).values_list('id', flat=True)), untouched)
+        self.assertEqual(Prediction.objects.filter(product=other).count(), 14)
+
+    def test_refits_unwatermarked_and_expired_products(self):
+        as_of = date(2025, 3, 31)
+        other = Product.objects.create(
+            name='Beer', sku='BEER-001', cost_price='1.00', selling_price='2.00'
+        )
+        for product in (self.product, other):
+            SalesRollup.objects.create(
+                organization=self.organization, warehouse=self.warehouse,
+                product=product, day=as_of, quantity=7
+            )
+        # Only the newer rollup's product gets a watermark
+        forecast_organization(self.organization.id, as_of=as_of, product_ids=[other.id])
+        self.assertEqual(forecast_organization(self.organization.id, as_of=as_of, changed_only=True), 1)
+        self.assertTrue(Prediction.objects.filter(product=self.product).exists())
+
+        self.assertEqual(forecast_organization(self.organization.id, as_of=as_of + timedelta(days=12), changed_only=True), 0)
+        later = as_of + timedelta(days=13)
+        self.assertEqual(forecast_organization(self.organization.id, as_of=later, changed_only=True), 2)
+        self.assertEqual(Prediction.objects.filter(product=other, date__gt=later).count(), 14)
+
+    def test_refits_products_whose_rollups_were_deleted(self):
+        as_of = date(2025, 3, 31)
+        order = self.create_sale(as_of, quantity=7)
+        rebuild_sales_rollups(as_of.isoformat(), as_of.isoformat())
+        forecast_organization(self.organization.id, as_of=as_of)
+        self.assertEqual(forecast_organization(self.organization.id, as_of=as_of, changed_only=True), 0)
+
+        order.delete()
+        rebuild_sales_rollups(as_of.isoformat(), as_of.isoformat())
+        self.assertFalse(SalesRollup.objects.exists())
+        self.assertEqual(forecast_organization(self.organization.id, as_of=as_of, changed_only=True), 1)
+        self.assertFalse(Prediction.objects.filter(product=self.product, predicted_quantity__gt=0).exists())
+        self.assertEqual(forecast_organization(self.organization.id, as_of=as_of, changed_only=True), 0)
+
+    def test_parallel_matches_single_process(self):
+        matrix = np.random.default_rng(0).poisson(3, (40, 56)).astype(float)
+        
+        expected = forecast(matrix)
+        result = forecast_parallel(matrix, workers=2, min_rows=1)
+        
+        np.testing.assert_allclose(result[0], expected[0])
+        np.testing.assert_allclose(result[1], expected[1])
+
+
+class ClassificationTests(AnalyticsTestCase):
+    """Test batch ABC/XYZ classification"""
+    
+    def test_classify_and_filter_products(self):
+        manager = User.objects.create_user(
+            username='manager', password='pass', email='manager@test.com',
+            role='manager', organization=self.organization
+        )
+        products = [
+            Product.objects.create(
+                name=f'Product {i}', sku=f'SKU-{i}', cost_price='1.00', selling_price='10.00',
+                created_by=manager
+            )
+            for i in range(5)
+        ]
+        weekly_units = ([10, 10, 10, 10], [5, 5, 5, 5], [0, 0, 0, 6], [1, 0, 1, 0], [0, 0, 0, 0])
+        monday = date(2025, 3, 3)
+        for product, units in zip(products, weekly_units):
+            for week, quantity in enumerate(units):
+                if quantity:
+                    SalesRollup.objects.create(
+                        organization=self.organization, warehouse=self.warehouse, product=product,
+                        day=monday + timedelta(weeks=week, days=2), quantity=quantity, revenue=quantity * 10
+                    )
+        
+        # Products, weekly sales, upsert
+        with self.assertNumQueries(3):
+            self.assertEqual(classify_organization(self.organization.id, as_of=date(2025, 4, 1), weeks=4), 5)
+        classify_organization(self.organization.id, as_of=date(2025, 4, 1), weeks=4)
+        
+        classes = {
+            c.product_id: c.abc_class + c.xyz_class
+            for c in ProductClassification.objects.all()
+        }
+        self.assertEqual([classes[p.id] for p in products], ['AX', 'AX', 'BZ', 'CY', 'CZ'])
+        first = ProductClassification.objects.get(product=products[0])
+        self.assertEqual((first.start_date, first.end_date), (monday, date(2025, 3, 30)))
+        self.assertEqual(first.revenue, Decimal('400.00'))
+        self.assertIsNone(ProductClassification.objects.get(product=products[4]).demand_cv)
+        
+        client = APIClient()
+        client.force_authenticate(user=manager)
+        response = client.get('/api/products/', {
+            'classification__abc_class': 'A', 'ordering': '-classification__revenue'
+        })
+        self.assertEqual([p['sku'] for p in response.data['results']], ['SKU-0', 'SKU-1'])
+        self.assertEqual(response.data['results'][0]['abc_class'], 'A')
+
+
+class ReorderPointTests(AnalyticsTestCase):
+    """Test demand-driven reorder point recommendations"""
+    
+    def test_recommend_and_apply(self):
+        as_of = date(2025, 3, 31)
+        beer = Product.objects.create(name='Beer', sku='BEER-001', cost_price='1.00', selling_price='2.00')
+        water = Product.objects.create(name='Water', sku='WATER-001', cost_price='1.00', selling_price='2.00')
+        wine_stock = Stock.objects.create(product=self.product, warehouse=self.warehouse, quantity=50)
+        beer_stock = Stock.objects.create(product=beer, warehouse=self.warehouse, quantity=50, lead_time_days=4)
+        water_stock = Stock.objects.create(product=water, warehouse=self.warehouse, quantity=50, reorder_level=3)
+        for offset in range(90):
+            day = as_of - timedelta(days=offset)
+            SalesRollup.objects.create(
+                organization=self.organization, warehouse=self.warehouse, product=self.product, day=day, quantity=2
+            )
+            if offset % 2:
+                SalesRollup.objects.create(
+                    organization=self.organization, warehouse=self.warehouse, product=beer, day=day, quantity=4
+                )
+        
+        # Demand, stock rows, one batched update; rows without demand get no recommendation
+        stamped = wine_stock.updated_at
+        with self.assertNumQueries(3):
+            self.assertEqual(recompute_reorder_points(as_of=as_of, lead_time_days=7, service_level=0.95), (3, 2))
+        
+        wine_stock.refresh_from_db()
+        # Advisory fields do not bump updated_at for change-feed clients
+        self.assertEqual(wine_stock.updated_at, stamped)
+        beer_stock.refresh_from_db()
+        self.assertEqual((wine_stock.safety_stock, wine_stock.recommended_reorder_level), (0, 14))
+        # mean 2, sigma 2 over a 4 day lead time: 8 + ceil(1.645 * 2 * 2)
+        self.assertEqual((beer_stock.safety_stock, beer_stock.recommended_reorder_level), (7, 15))
+        self.assertEqual(wine_stock.reorder_level, 10)
+        
+        # Unchanged recommendations are not rewritten; applying skips rows without demand
+        self.assertEqual(recompute_reorder_points(as_of=as_of, lead_time_days=7)[1], 0)
+        self.assertEqual(recompute_reorder_points(as_of=as_of, lead_time_days=7, apply=True)[1], 2)
+        levels = dict(Stock.objects.values_list('product_id', 'reorder_level'))
+        self.assertEqual(levels, {self.product.id: 14, beer.id: 15, water.id: 3})
+        water_stock.refresh_from_db()
+        self.assertIsNone(water_stock.recommended_reorder_level)
+        wine_stock.refresh_from_db()
+        self.assertGreater(wine_stock.updated_at, stamped)
@@ -0,0 +1,69 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework.authentication import SessionAuthentication
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from apps.accounts.snapshots import SnapshotUser, get_user_snapshot
+from apps.core.principal import Principal
+from apps.core.routing import identify_user
+
+
+class PrincipalMixin:
+    """Attach an immutable Principal to the request once the user is known"""
+
+    def authenticate(self, request):
+        result = super().authenticate(request)
+        if result is not None:
+            request.principal = Principal.from_user(result[0])
+            identify_user(request.principal.user_id)
+        return result
+
+
+class PrincipalJWTAuthentication(PrincipalMixin, JWTAuthentication):
+    """
+    JWT authentication that resolves the user from a cached snapshot, so
+    most requests never read the users table. The full row, with its
+    organization and warehouse, is loaded only when a view needs it.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        if api_settings.CHECK_REVOKE_TOKEN or api_settings.USER_ID_FIELD not in ('id', 'pk'):
+            # The revoke claim needs the password hash, which is not cached
+            return self._load_user(validated_token, user_id)
+
+        snapshot = get_user_snapshot(user_id)
+        if snapshot is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        if not snapshot['is_active']:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        return SnapshotUser(snapshot)
+
+    def _load_user(self, validated_token, user_id):
+        try:
+            user = (
+                self.user_model.objects
+                .select_related('organization', 'assigned_warehouse')
+                .get(**{api_settings.USER_ID_FIELD: user_id})
+            )
+        except self.user_model.DoesNotExist:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+        return user
+
+
+class PrincipalSessionAuthentication(PrincipalMixin, SessionAuthentication):
+    pass
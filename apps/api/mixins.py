@@ -1,6 +1,39 @@
-from rest_framework import status
+import base64
+import uuid
+from datetime import datetime, timedelta
+
+from rest_framework import permissions, serializers, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
-from django.db import transaction
+from rest_framework.settings import api_settings
+from rest_framework.validators import BaseUniqueForValidator, UniqueTogetherValidator, UniqueValidator
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import models, transaction
+from django.db.models import Q
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from apps.core.principal import get_principal
+from apps.core.routing import read_database, replica_reads, use_replica_for_request
+from apps.core.tenancy import TenantQuerySet, fill_organization
+from .renderers import NDJSONRenderer
+
+
+class TenantScopedMixin:
+    """Limit the queryset to the request user's organization (see apps.core.tenancy)"""
+    
+    def get_queryset(self):
+        return super().get_queryset().for_tenant(get_principal(self.request))
+
+
+class ReplicaReadMixin:
+    """Serve safe requests from a read replica (see apps.core.routing)"""
+    
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if request.method in permissions.SAFE_METHODS:
+            use_replica_for_request()
 
 
 class AuditMixin:
@@ -19,20 +52,221 @@ class AuditMixin:
             serializer.save()
 
 
+class PreloadedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    Primary key field that resolves against objects loaded up front by the
+    bulk endpoint instead of running one query per item.
+    """
+    
+    def to_internal_value(self, data):
+        preloaded = self.context.get('preloaded', {}).get(self.field_name)
+        if preloaded is None:
+            return super().to_internal_value(data)
+        
+        try:
+            key = str(self.get_queryset().model._meta.pk.to_python(data))
+        except (DjangoValidationError, TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        
+        if key not in preloaded:
+            self.fail('does_not_exist', pk_value=data)
+        return preloaded[key]
+
+
 class BulkCreateMixin:
-    """Support bulk creation of objects"""
+    """
+    Bulk create/update through POST <resource>/bulk/ with a JSON array.
+    
+    Items are matched to existing rows on ``bulk_match_fields`` with one
+    query per batch, then written with bulk_create / bulk_update.
+    Each item gets its own result; invalid items do not block valid ones.
+    """
+    bulk_max_items = 5000
+    bulk_batch_size = 500
+    bulk_match_fields = ('id',)
+    # Set per action; bulk writes draw on the organization's 'bulk' bucket
+    throttle_scope = None
     
-    def bulk_create(self, request, *args, **kwargs):
-        serializer = self.get_serializer(data=request.data, many=True)
-        serializer.is_valid(raise_exception=True)
+    @action(detail=False, methods=['post'], throttle_scope='bulk')
+    def bulk(self, request, *args, **kwargs):
+        items = request.data
+        if not isinstance(items, list):
+            return Response(
+                {'error': 'Expected a JSON array of objects'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(items) > self.bulk_max_items:
+            return Response(
+                {'error': f'At most {self.bulk_max_items} items per request'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
         
-        with transaction.atomic():
-            self.perform_bulk_create(serializer)
+        results = [None] * len(items)
+        for start in range(0, len(items), self.bulk_batch_size):
+            batch = items[start:start + self.bulk_batch_size]
+            self._bulk_write_batch(batch, start, results)
+        
+        counts = {'created': 0, 'updated': 0, 'error': 0}
+        for result in results:
+            counts[result['status']] += 1
+        
+        if counts['error'] == 0:
+            response_status = status.HTTP_200_OK
+        elif counts['error'] == len(items):
+            response_status = status.HTTP_400_BAD_REQUEST
+        else:
+            response_status = status.HTTP_207_MULTI_STATUS
+        
+        return Response({
+            'created': counts['created'],
+            'updated': counts['updated'],
+            'errors': counts['error'],
+            'results': results,
+        }, status=response_status)
+    
+    def get_bulk_create_kwargs(self):
+        """Extra attributes for newly created rows (mirrors perform_create)"""
+        return {'created_by': self.request.user}
+    
+    def _bulk_serializer(self, batch):
+        """One child serializer per batch, with per-item DB checks replaced by batch lookups"""
+        child = self.get_serializer(context={**self.get_serializer_context(), 'bulk': True, 'preloaded': {}})
+        # Fields are built lazily, so this swaps the class used for FK fields
+        child.serializer_related_field = PreloadedPrimaryKeyRelatedField
         
-        return Response(serializer.data, status=status.HTTP_201_CREATED)
+        # Uniqueness is checked once per batch below
+        child.validators = [
+            v for v in child.validators if not isinstance(v, (BaseUniqueForValidator, UniqueTogetherValidator))
+        ]
+        for field in child.fields.values():
+            field.validators = [v for v in field.validators if not isinstance(v, UniqueValidator)]
+        
+        for name, field in child.fields.items():
+            if not isinstance(field, PreloadedPrimaryKeyRelatedField) or field.read_only:
+                continue
+            queryset = field.get_queryset()
+            if isinstance(queryset, TenantQuerySet):
+                # Other tenants' rows fail as "Invalid pk", like in the tenant-scoped views
+                queryset = queryset.for_tenant(get_principal(self.request))
+            pk_field = queryset.model._meta.pk
+            keys = set()
+            for item in batch:
+                if not isinstance(item, dict) or item.get(name) in (None, ''):
+                    continue
+                try:
+                    keys.add(pk_field.to_python(item[name]))
+                except (DjangoValidationError, TypeError, ValueError):
+                    continue
+            child.context['preloaded'][name] = {
+                str(pk): obj for pk, obj in queryset.in_bulk(list(keys)).items()
+            }
+        
+        return child
     
-    def perform_bulk_create(self, serializer):
-        serializer.save()
+    def _match_key(self, attrs, item):
+        model = self.get_serializer_class().Meta.model
+        key = []
+        for name in self.bulk_match_fields:
+            value = attrs.get(name, item.get(name))
+            if value in (None, ''):
+                return None
+            if isinstance(value, models.Model):
+                value = value.pk
+            field = model._meta.get_field(name)
+            if field.is_relation:
+                field = field.target_field
+            try:
+                value = field.to_python(value)
+            except (DjangoValidationError, TypeError, ValueError):
+                return None
+            key.append(str(value))
+        return tuple(key)
+    
+    def _bulk_write_batch(self, batch, offset, results):
+        child = self._bulk_serializer(batch)
+        model = child.Meta.model
+        
+        validated = []
+        seen = {}
+        for i, item in enumerate(batch, start=offset):
+            try:
+                attrs = child.run_validation(item)
+            except ValidationError as exc:
+                results[i] = {'index': i, 'status': 'error', 'errors': exc.detail}
+                continue
+            key = self._match_key(attrs, item)
+            if key is not None and key in seen:
+                results[i] = {
+                    'index': i, 'status': 'error',
+                    'errors': {'non_field_errors': [f'Duplicate of item {seen[key]} in this request.']}
+                }
+                continue
+            if key is not None:
+                seen[key] = i
+            validated.append((i, key, attrs))
+        
+        # One query finds every existing row this batch could collide with
+        existing = {}
+        keys = [key for _, key, _ in validated if key is not None]
+        if keys:
+            lookup = {
+                f'{model._meta.get_field(name).attname}__in': {key[pos] for key in keys}
+                for pos, name in enumerate(self.bulk_match_fields)
+            }
+            for obj in model._default_manager.filter(**lookup):
+                obj_key = tuple(
+                    str(getattr(obj, model._meta.get_field(name).attname)) for name in self.bulk_match_fields
+                )
+                existing[obj_key] = obj
+        
+        # Matches outside the caller's tenant scope are conflicts, not updates
+        visible = set()
+        if existing:
+            visible = set(
+                self.get_queryset().filter(pk__in=[obj.pk for obj in existing.values()])
+                .values_list('pk', flat=True)
+            )
+        
+        now = timezone.now()
+        to_create, to_update, update_fields = [], [], {'updated_at'}
+        create_kwargs = self.get_bulk_create_kwargs()
+        for i, key, attrs in validated:
+            obj = existing.get(key)
+            if obj is None and 'id' in self.bulk_match_fields and key is not None:
+                results[i] = {'index': i, 'status': 'error', 'errors': {'id': ['Object does not exist.']}}
+                continue
+            if obj is None:
+                obj = model(**attrs, **create_kwargs)
+                fill_organization(obj)
+                to_create.append((i, obj))
+                continue
+            if obj.pk not in visible:
+                results[i] = {
+                    'index': i, 'status': 'error',
+                    'errors': {'non_field_errors': ['Object already exists.']}
+                }
+                continue
+            for name, value in attrs.items():
+                setattr(obj, name, value)
+            if hasattr(obj, 'updated_by'):
+                obj.updated_by = self.request.user
+                update_fields.add('updated_by')
+            obj.updated_at = now
+            update_fields.update(attrs)
+            to_update.append((i, obj))
+        
+        with transaction.atomic():
+            if to_create:
+                model._default_manager.bulk_create([obj for _, obj in to_create], batch_size=self.bulk_batch_size)
+            if to_update:
+                model._default_manager.bulk_update(
+                    [obj for _, obj in to_update], sorted(update_fields), batch_size=self.bulk_batch_size
+                )
+        
+        for i, obj in to_create:
+            results[i] = {'index': i, 'status': 'created', 'id': str(obj.pk)}
+        for i, obj in to_update:
+            results[i] = {'index': i, 'status': 'updated', 'id': str(obj.pk)}
 
 
 class SoftDeleteMixin:
@@ -94,3 +328,150 @@ class CacheResponseMixin:
         cache.set(cache_key, response.data, self.cache_timeout)
         
         return response
+
+
+class StreamingListMixin:
+    """
+    Stream the whole filtered list as NDJSON with ?format=ndjson.
+    
+    Rows come from values() over a server-side cursor, so memory stays
+    flat and there is no count query or pagination. ``stream_fields``
+    lists the columns; a (name, lookup) pair exposes a related column.
+    Exports read from a replica unless the client wrote recently.
+    """
+    renderer_classes = list(api_settings.DEFAULT_RENDERER_CLASSES) + [NDJSONRenderer]
+    stream_fields = None
+    stream_chunk_size = 2000
+    
+    def list(self, request, *args, **kwargs):
+        if getattr(request.accepted_renderer, 'format', None) == NDJSONRenderer.format:
+            return self.stream_list(request)
+        return super().list(request, *args, **kwargs)
+    
+    def get_stream_fields(self):
+        if self.stream_fields is not None:
+            return self.stream_fields
+        return [field.name for field in self.get_queryset().model._meta.concrete_fields]
+    
+    def values_queryset(self, queryset, extra=()):
+        """Apply stream_fields to a queryset as values() rows"""
+        names, lookups = [], {}
+        for field in self.get_stream_fields():
+            if isinstance(field, tuple):
+                alias, lookup = field
+                lookups[alias] = models.F(lookup)
+            else:
+                names.append(field)
+        names += [name for name in extra if name not in names]
+        return queryset.values(*names, **lookups)
+    
+    def stream_list(self, request):
+        # The rows are read after the view returns, outside the request's routing state
+        with replica_reads():
+            database = read_database()
+        queryset = self.values_queryset(self.filter_queryset(self.get_queryset())).using(database)
+        rows = (
+            NDJSONRenderer.render_row(row)
+            for row in queryset.iterator(chunk_size=self.stream_chunk_size)
+        )
+        return StreamingHttpResponse(rows, content_type=NDJSONRenderer.media_type)
+
+
+class ChangeFeedMixin:
+    """
+    Delta sync through GET <resource>/changes/?since=<watermark>.
+    
+    Rows are read in (updated_at, id) order from the index on those
+    columns. Hard deletes come from tombstones and soft deletes
+    (is_active=False) are reported as deletes too. Pass back ``next``
+    as ``since`` until ``has_more`` is false. Needs StreamingListMixin
+    for the row shape.
+    """
+    change_feed_limit = 500
+    change_feed_max_limit = 5000
+    # Hold back the newest rows so a slow transaction committing an older
+    # updated_at cannot slip in behind a watermark a client already has
+    change_feed_lag = timedelta(seconds=2)
+    
+    @staticmethod
+    def encode_watermark(timestamp, pk):
+        raw = f'{timestamp.isoformat()}|{pk}'.encode()
+        return base64.urlsafe_b64encode(raw).decode()
+    
+    @staticmethod
+    def decode_watermark(token):
+        raw = base64.urlsafe_b64decode(token.encode()).decode()
+        timestamp, pk = raw.split('|')
+        return datetime.fromisoformat(timestamp), uuid.UUID(pk)
+    
+    def get_change_feed_queryset(self):
+        """Tenant-scoped queryset that still includes soft-deleted rows"""
+        # get_queryset() applies tenant scoping on top of self.queryset
+        self.queryset = self.queryset.model._default_manager.all()
+        return self.get_queryset()
+    
+    def get_tombstone_queryset(self, model):
+        from apps.core.models import Tombstone
+        
+        tombstones = Tombstone.objects.filter(model=model._meta.label_lower)
+        principal = get_principal(self.request)
+        if principal.is_superuser:
+            return tombstones
+        if principal.organization_id:
+            return tombstones.filter(organization_id=principal.organization_id)
+        return tombstones.none()
+    
+    @action(detail=False, methods=['get'])
+    def changes(self, request, *args, **kwargs):
+        since = request.query_params.get('since')
+        try:
+            since = self.decode_watermark(since) if since else None
+            limit = int(request.query_params.get('limit', self.change_feed_limit))
+        except (ValueError, TypeError, UnicodeDecodeError):
+            return Response({'error': 'Invalid since or limit'}, status=status.HTTP_400_BAD_REQUEST)
+        limit = max(1, min(limit, self.change_feed_max_limit))
+        upper = timezone.now() - self.change_feed_lag
+        
+        queryset = self.filter_queryset(self.get_change_feed_queryset())
+        model = queryset.model
+        has_is_active = any(f.name == 'is_active' for f in model._meta.concrete_fields)
+        tombstones = self.get_tombstone_queryset(model)
+        
+        queryset = queryset.filter(updated_at__lte=upper)
+        tombstones = tombstones.filter(deleted_at__lte=upper)
+        if since:
+            timestamp, pk = since
+            queryset = queryset.filter(Q(updated_at__gt=timestamp) | Q(updated_at=timestamp, pk__gt=pk))
+            tombstones = tombstones.filter(
+                Q(deleted_at__gt=timestamp) | Q(deleted_at=timestamp, object_id__gt=pk)
+            )
+        
+        extra = ['id', 'updated_at'] + (['is_active'] if has_is_active else [])
+        rows = self.values_queryset(queryset.order_by('updated_at', 'pk'), extra)[:limit + 1]
+        deleted = tombstones.order_by('deleted_at', 'object_id').values_list('deleted_at', 'object_id')[:limit + 1]
+        
+        # Merge both streams into one (timestamp, id) ordering
+        events = [((row['updated_at'], row['id']), row) for row in rows]
+        events += [((at, pk), None) for at, pk in deleted]
+        events.sort(key=lambda event: event[0])
+        has_more = len(events) > limit
+        events = events[:limit]
+        
+        upserts, deletes = [], []
+        for (timestamp, pk), row in events:
+            if row is None or (has_is_active and not row['is_active']):
+                deletes.append({'id': pk, 'deleted_at': timestamp})
+            else:
+                upserts.append(row)
+        
+        if events:
+            next_watermark = self.encode_watermark(*events[-1][0])
+        else:
+            next_watermark = request.query_params.get('since')
+        
+        return Response({
+            'upserts': upserts,
+            'deletes': deletes,
+            'next': next_watermark,
+            'has_more': has_more,
+        })
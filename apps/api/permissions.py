@@ -1,5 +1,9 @@
+from django.core.exceptions import ImproperlyConfigured
 from rest_framework import permissions
 
+from apps.core.principal import get_principal
+from apps.core.tenancy import organization_id_of
+
 
 class IsOwnerOrReadOnly(permissions.BasePermission):
     """
@@ -8,9 +12,9 @@ class IsOwnerOrReadOnly(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
         if request.method in permissions.SAFE_METHODS:
             return True
-        
+
         # Write permissions only to owner
-        return obj.created_by == request.user
+        return obj.created_by_id == get_principal(request).user_id
 
 
 class IsAdminOrReadOnly(permissions.BasePermission):
@@ -20,8 +24,8 @@ class IsAdminOrReadOnly(permissions.BasePermission):
     def has_permission(self, request, view):
         if request.method in permissions.SAFE_METHODS:
             return True
-        
-        return request.user and request.user.is_staff
+
+        return get_principal(request).is_staff
 
 
 class IsManagerOrAdmin(permissions.BasePermission):
@@ -29,10 +33,8 @@ class IsManagerOrAdmin(permissions.BasePermission):
     Only managers and admins can access
     """
     def has_permission(self, request, view):
-        return request.user and (
-            request.user.is_staff or 
-            request.user.role in ['manager', 'admin']
-        )
+        principal = get_principal(request)
+        return principal.is_staff or principal.has_role('manager', 'admin')
 
 
 class CanManageInventory(permissions.BasePermission):
@@ -42,8 +44,8 @@ class CanManageInventory(permissions.BasePermission):
     def has_permission(self, request, view):
         if request.method in permissions.SAFE_METHODS:
             return True
-        
-        return request.user and request.user.role in ['manager', 'admin', 'inventory_manager']
+
+        return get_principal(request).has_role('manager', 'admin', 'inventory_manager')
 
 
 class CanManageSales(permissions.BasePermission):
@@ -53,8 +55,8 @@ class CanManageSales(permissions.BasePermission):
     def has_permission(self, request, view):
         if request.method in permissions.SAFE_METHODS:
             return True
-        
-        return request.user and request.user.role in ['manager', 'admin', 'sales_manager', 'staff']
+
+        return get_principal(request).has_role('manager', 'admin', 'sales_manager', 'staff')
 
 
 class CanViewAnalytics(permissions.BasePermission):
@@ -62,35 +64,28 @@ class CanViewAnalytics(permissions.BasePermission):
     Permission for viewing analytics
     """
     def has_permission(self, request, view):
-        return request.user and request.user.role in ['manager', 'admin']
+        return get_principal(request).has_role('manager', 'admin')
 
 
 class IsOrganizationMember(permissions.BasePermission):
     """
     Only allow users to access their organization's data
     """
-    
+
     def has_permission(self, request, view):
         # Must be authenticated
-        return request.user and request.user.is_authenticated
-    
+        return get_principal(request).is_authenticated
+
     def has_object_permission(self, request, view, obj):
+        principal = get_principal(request)
         # Superusers see everything
-        if request.user.is_superuser:
+        if principal.is_superuser:
             return True
-        
-        user_org = getattr(request.user, 'organization', None)
-        if not user_org:
+        if not principal.organization_id:
+            return False
+
+        # Compare ids along the model's tenant scope
+        try:
+            return organization_id_of(obj) == principal.organization_id
+        except ImproperlyConfigured:
             return False
-        
-        # Check organization match based on object type
-        if hasattr(obj, 'organization'):
-            return obj.organization == user_org
-        
-        if hasattr(obj, 'warehouse'):
-            return obj.warehouse.organization == user_org
-        
-        if hasattr(obj, 'created_by'):
-            return obj.created_by.organization == user_org
-        
-        return False
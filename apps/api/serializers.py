@@ -1,8 +1,8 @@
 from rest_framework import serializers
-from apps.accounts.models import User
-from apps.inventory.models import Warehouse, Product, Stock
+from apps.accounts.models import Organization, User
+from apps.inventory.models import Warehouse, Product, Stock, StockAlert
 from apps.sales.models import Customer, Order, OrderItem
-from apps.analytics.models import Prediction, SalesMetric
+from apps.analytics.models import ForecastBacktest, Prediction, SalesMetric, SalesRollup
 from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError as DjangoValidationError
 from decimal import Decimal
@@ -48,6 +48,23 @@ class UserSerializer(serializers.ModelSerializer):
         return f"{obj.first_name} {obj.last_name}".strip()
 
 
+class OrganizationSerializer(serializers.ModelSerializer):
+    """Organization with the usage figures annotated by with_stats()"""
+    warehouse_count = serializers.IntegerField(read_only=True)
+    user_count = serializers.IntegerField(read_only=True)
+    order_count = serializers.IntegerField(read_only=True)
+    revenue = serializers.DecimalField(max_digits=14, decimal_places=2, read_only=True)
+    last_activity = serializers.DateTimeField(read_only=True)
+
+    class Meta:
+        model = Organization
+        fields = [
+            'id', 'name', 'slug', 'is_active', 'subscription_status', 'monthly_fee', 'trial_end_date',
+            'warehouse_count', 'user_count', 'order_count', 'revenue', 'last_activity', 'created_at'
+        ]
+        read_only_fields = fields
+
+
 class PasswordChangeSerializer(serializers.Serializer):
     """Secure password change"""
     old_password = serializers.CharField(required=True, write_only=True)
@@ -92,13 +109,15 @@ class ProductSerializer(serializers.ModelSerializer):
     created_by_name = serializers.CharField(source='created_by.username', read_only=True)
     total_stock = serializers.SerializerMethodField()
     profit_margin = serializers.SerializerMethodField()
+    abc_class = serializers.CharField(source='classification.abc_class', read_only=True, default=None)
+    xyz_class = serializers.CharField(source='classification.xyz_class', read_only=True, default=None)
 
     class Meta:
         model = Product
         fields = [
             'id', 'name', 'sku', 'category', 'cost_price', 'selling_price', 
             'description', 'is_active', 'created_at', 'updated_at', 
-            'created_by_name', 'total_stock', 'profit_margin'
+            'created_by_name', 'total_stock', 'profit_margin', 'abc_class', 'xyz_class'
         ]
         read_only_fields = ['id', 'created_at', 'updated_at']
 
@@ -151,9 +170,10 @@ class StockSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'product', 'product_name', 'product_sku', 'warehouse', 
             'warehouse_name', 'quantity', 'reorder_level', 'is_low',
+            'lead_time_days', 'safety_stock', 'recommended_reorder_level',
             'created_at', 'updated_at'
         ]
-        read_only_fields = ['id', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'safety_stock', 'recommended_reorder_level', 'created_at', 'updated_at']
 
     def get_is_low(self, obj):
         return obj.quantity <= obj.reorder_level
@@ -173,7 +193,8 @@ class StockSerializer(serializers.ModelSerializer):
         warehouse = attrs.get('warehouse')
 
         # Check for duplicate stock entry (same product + warehouse)
-        if not self.instance:  # Only on create
+        # Bulk writes check this once per batch instead
+        if not self.instance and not self.context.get('bulk'):  # Only on create
             if Stock.objects.filter(product=product, warehouse=warehouse).exists():
                 raise serializers.ValidationError({
                     "non_field_errors": "Stock entry already exists for this product in this warehouse."
@@ -182,6 +203,35 @@ class StockSerializer(serializers.ModelSerializer):
         return attrs
 
 
+class StockAlertSerializer(serializers.ModelSerializer):
+    """Low-stock alert state"""
+    product_sku = serializers.CharField(source='stock.product.sku', read_only=True)
+    warehouse_name = serializers.CharField(source='warehouse.name', read_only=True)
+
+    class Meta:
+        model = StockAlert
+        fields = [
+            'id', 'stock', 'product_sku', 'warehouse', 'warehouse_name', 'status',
+            'quantity', 'reorder_level', 'opened_at', 'acknowledged_at',
+            'acknowledged_by', 'resolved_at'
+        ]
+        read_only_fields = fields
+
+
+class StockAdjustmentSerializer(serializers.Serializer):
+    """One entry of a batch stock adjustment"""
+    stock_id = serializers.UUIDField(required=False)
+    sku = serializers.CharField(required=False)
+    warehouse = serializers.UUIDField(required=False)
+    delta = serializers.IntegerField()
+    reason = serializers.CharField(required=False, allow_blank=True, max_length=255)
+
+    def validate(self, attrs):
+        if not attrs.get('stock_id') and not (attrs.get('sku') and attrs.get('warehouse')):
+            raise serializers.ValidationError("Provide either stock_id or both sku and warehouse.")
+        return attrs
+
+
 # ============ SALES SERIALIZERS ============
 
 class CustomerSerializer(serializers.ModelSerializer):
@@ -320,3 +370,28 @@ class SalesMetricSerializer(serializers.ModelSerializer):
         model = SalesMetric
         fields = ['id', 'date', 'total_sales', 'total_orders', 'metric_type', 'created_at']
         read_only_fields = ['id', 'created_at']
+
+
+class ForecastBacktestSerializer(serializers.ModelSerializer):
+    """Forecast accuracy per model version"""
+    class Meta:
+        model = ForecastBacktest
+        fields = [
+            'id', 'model_version', 'level', 'key', 'start_date', 'end_date',
+            'observations', 'mape', 'bias', 'coverage', 'updated_at'
+        ]
+        read_only_fields = fields
+
+
+class SalesRollupSerializer(serializers.ModelSerializer):
+    """Sales rollup cells"""
+    warehouse_name = serializers.CharField(source='warehouse.name', read_only=True)
+    product_sku = serializers.CharField(source='product.sku', read_only=True)
+
+    class Meta:
+        model = SalesRollup
+        fields = [
+            'id', 'organization', 'warehouse', 'warehouse_name', 'product', 'product_sku',
+            'day', 'quantity', 'revenue', 'cost', 'order_count', 'updated_at'
+        ]
+        read_only_fields = fields
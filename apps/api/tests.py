@@ -1,9 +1,14 @@
+import json
 from django.test import TestCase
 from rest_framework.test import APITestCase, APIClient
 from rest_framework import status
 from django.contrib.auth import get_user_model
 from apps.inventory.models import Product, Warehouse, Stock
 from apps.sales.models import Customer, Order
+from apps.accounts.models import Organization
+from apps.core.models import Tombstone
+from django.utils import timezone
+from datetime import timedelta
 
 User = get_user_model()
 
@@ -206,5 +211,499 @@ class PermissionTests(APITestCase):
         self.assertNotEqual(response.status_code, status.HTTP_403_FORBIDDEN)
 
 
+
+class BulkAPITests(APITestCase):
+    """Test bulk create/update endpoints"""
+    
+    def setUp(self):
+        self.organization = Organization.objects.create(name='Acme', slug='acme')
+        self.user = User.objects.create_user(
+            username='bulkuser',
+            password='testpass123',
+            email='bulk@test.com',
+            role='manager',
+            organization=self.organization
+        )
+        self.client.force_authenticate(user=self.user)
+        
+        self.warehouse = Warehouse.objects.create(
+            name='Main Warehouse',
+            location='Test Location',
+            organization=self.organization,
+            created_by=self.user
+        )
+    
+    def _product(self, sku, **overrides):
+        data = {
+            'name': f'Product {sku}',
+            'sku': sku,
+            'category': 'Test',
+            'cost_price': '10.00',
+            'selling_price': '20.00'
+        }
+        data.update(overrides)
+        return data
+    
+    def test_bulk_create_and_update_products(self):
+        """Existing SKUs are updated, new ones created, bad items reported"""
+        Product.objects.create(created_by=self.user, **self._product('SKU-001'))
+        
+        payload = [
+            self._product('SKU-001', name='Renamed'),
+            self._product('SKU-002'),
+            self._product('SKU-003', selling_price='5.00'),
+            self._product('SKU-002'),
+        ]
+        response = self.client.post('/api/products/bulk/', payload, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual(response.data['created'], 1)
+        self.assertEqual(response.data['updated'], 1)
+        self.assertEqual(
+            [r['status'] for r in response.data['results']],
+            ['updated', 'created', 'error', 'error']
+        )
+        self.assertEqual(Product.objects.get(sku='SKU-001').name, 'Renamed')
+        self.assertFalse(Product.objects.filter(sku='SKU-003').exists())
+    
+    def test_bulk_stock_query_count_is_constant(self):
+        """Stock upserts do not query per item"""
+        products = Product.objects.bulk_create([
+            Product(created_by=self.user, organization=self.organization, **self._product(f'SKU-{i:03}'))
+            for i in range(50)
+        ])
+        payload = [
+            {'product': str(p.id), 'warehouse': str(self.warehouse.id), 'quantity': 5, 'reorder_level': 1}
+            for p in products
+        ]
+        
+        response = self.client.post('/api/stocks/bulk/', payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(Stock.objects.count(), 50)
+        
+        payload[0]['quantity'] = 99
+        with self.assertNumQueries(7):
+            response = self.client.post('/api/stocks/bulk/', payload, format='json')
+        self.assertEqual(response.data['updated'], 50)
+        self.assertEqual(Stock.objects.get(product=products[0]).quantity, 99)
+    
+    def test_bulk_rejects_other_tenants_references(self):
+        product = Product.objects.create(created_by=self.user, **self._product('SKU-001'))
+        other = Organization.objects.create(name='Other', slug='other')
+        foreign = Warehouse.objects.create(name='Foreign', location='Lyon', organization=other)
+        
+        response = self.client.post('/api/stocks/bulk/', [
+            {'product': str(product.id), 'warehouse': str(foreign.id), 'quantity': 5},
+        ], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('Invalid pk', str(response.data['results'][0]['errors']['warehouse'][0]))
+        self.assertFalse(Stock.objects.exists())
+    
+    def test_bulk_customers_get_organization(self):
+        response = self.client.post('/api/customers/bulk/', [
+            {'name': 'Customer One'},
+            {'name': 'Customer Two', 'email': 'TWO@Example.com'},
+        ], format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            Customer.objects.filter(organization=self.organization).count(), 2
+        )
+    
+    def test_bulk_rejects_non_list(self):
+        response = self.client.post('/api/products/bulk/', self._product('SKU-001'), format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class StockAdjustmentAPITests(APITestCase):
+    """Test batch stock adjustments"""
+    
+    def setUp(self):
+        self.organization = Organization.objects.create(name='Acme', slug='acme')
+        self.user = User.objects.create_user(
+            username='scanner',
+            password='testpass123',
+            email='scanner@test.com',
+            role='manager',
+            organization=self.organization
+        )
+        self.client.force_authenticate(user=self.user)
+        
+        self.warehouse = Warehouse.objects.create(
+            name='Main Warehouse',
+            location='Test Location',
+            organization=self.organization
+        )
+        self.product = Product.objects.create(
+            name='Test Product',
+            sku='TEST-001',
+            category='Test',
+            cost_price='10.00',
+            selling_price='20.00',
+            created_by=self.user
+        )
+        self.stock = Stock.objects.create(
+            product=self.product,
+            warehouse=self.warehouse,
+            quantity=10
+        )
+    
+    def test_batch_adjust(self):
+        """Entries apply in order; ones that would go negative are rejected"""
+        response = self.client.post('/api/stocks/adjust/', [
+            {'stock_id': str(self.stock.id), 'delta': 5, 'reason': 'receipt'},
+            {'sku': 'TEST-001', 'warehouse': str(self.warehouse.id), 'delta': -12},
+            {'stock_id': str(self.stock.id), 'delta': -10},
+            {'sku': 'NOPE', 'warehouse': str(self.warehouse.id), 'delta': 1},
+        ], format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [r['status'] for r in response.data['results']],
+            ['applied', 'applied', 'rejected', 'rejected']
+        )
+        self.assertEqual(response.data['results'][2]['error'], 'Insufficient stock')
+        self.assertEqual(response.data['results'][0]['quantity'], 3)
+        self.stock.refresh_from_db()
+        self.assertEqual(self.stock.quantity, 3)
+        self.assertEqual(self.stock.updated_by, self.user)
+    
+    def test_other_tenant_stock_is_rejected(self):
+        other = Organization.objects.create(name='Other', slug='other')
+        other_stock = Stock.objects.create(
+            product=self.product,
+            warehouse=Warehouse.objects.create(name='Other', location='X', organization=other),
+            quantity=10
+        )
+        
+        response = self.client.post('/api/stocks/adjust/', [
+            {'stock_id': str(other_stock.id), 'delta': -1},
+        ], format='json')
+        
+        self.assertEqual(response.data['rejected'], 1)
+        other_stock.refresh_from_db()
+        self.assertEqual(other_stock.quantity, 10)
+    
+    def test_invalid_entry(self):
+        response = self.client.post('/api/stocks/adjust/', [{'delta': 1}], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class StreamingListTests(APITestCase):
+    """Test NDJSON streaming list endpoints"""
+    
+    def setUp(self):
+        self.organization = Organization.objects.create(name='Acme', slug='acme')
+        self.user = User.objects.create_user(
+            username='exporter',
+            password='testpass123',
+            email='exporter@test.com',
+            role='manager',
+            organization=self.organization
+        )
+        self.client.force_authenticate(user=self.user)
+        
+        for i in range(3):
+            Product.objects.create(
+                name=f'Product {i}',
+                sku=f'SKU-00{i}',
+                category='Test',
+                cost_price='10.00',
+                selling_price='20.00',
+                created_by=self.user
+            )
+        other = User.objects.create_user(username='other', password='x', email='other@test.com')
+        Product.objects.create(
+            name='Hidden', sku='HIDDEN', category='Test',
+            cost_price='1.00', selling_price='2.00', created_by=other
+        )
+    
+    def test_streams_all_scoped_rows(self):
+        response = self.client.get('/api/products/?format=ndjson&ordering=sku')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual([row['sku'] for row in rows], ['SKU-000', 'SKU-001', 'SKU-002'])
+        self.assertEqual(rows[0]['selling_price'], '20.00')
+    
+    def test_json_list_still_paginated(self):
+        response = self.client.get('/api/products/')
+        self.assertEqual(response.data['count'], 3)
+
+
+class ChangeFeedTests(APITestCase):
+    """Test the changes-since delta feed"""
+    
+    def setUp(self):
+        self.organization = Organization.objects.create(name='Acme', slug='acme')
+        self.user = User.objects.create_user(
+            username='syncer',
+            password='testpass123',
+            email='syncer@test.com',
+            role='manager',
+            organization=self.organization
+        )
+        self.client.force_authenticate(user=self.user)
+        
+        self.products = [
+            Product.objects.create(
+                name=f'Product {i}',
+                sku=f'SKU-00{i}',
+                category='Test',
+                cost_price='10.00',
+                selling_price='20.00',
+                created_by=self.user
+            )
+            for i in range(3)
+        ]
+        # Move everything outside the feed's safety lag
+        Product.objects.update(updated_at=timezone.now() - timedelta(minutes=5))
+    
+    def _changes(self, since=None, limit=None):
+        params = {}
+        if since:
+            params['since'] = since
+        if limit:
+            params['limit'] = limit
+        return self.client.get('/api/products/changes/', params)
+    
+    def test_pages_through_all_rows(self):
+        first = self._changes(limit=2)
+        self.assertEqual(len(first.data['upserts']), 2)
+        self.assertTrue(first.data['has_more'])
+        
+        second = self._changes(since=first.data['next'], limit=2)
+        self.assertEqual(len(second.data['upserts']), 1)
+        self.assertFalse(second.data['has_more'])
+        
+        ids = {row['id'] for row in first.data['upserts'] + second.data['upserts']}
+        self.assertEqual(ids, {p.id for p in self.products})
+    
+    def test_reports_updates_and_deletes_since_watermark(self):
+        watermark = self._changes().data['next']
+        
+        earlier = timezone.now() - timedelta(minutes=1)
+        Product.objects.filter(pk=self.products[0].pk).update(name='Renamed', updated_at=earlier)
+        Product.objects.filter(pk=self.products[1].pk).update(is_active=False, updated_at=earlier)
+        deleted_id = self.products[2].id
+        self.products[2].delete()
+        Tombstone.objects.update(deleted_at=earlier)
+        
+        response = self._changes(since=watermark)
+        
+        self.assertEqual([row['name'] for row in response.data['upserts']], ['Renamed'])
+        self.assertEqual(
+            {d['id'] for d in response.data['deletes']},
+            {self.products[1].id, deleted_id}
+        )
+        self.assertEqual(self._changes(since=response.data['next']).data['upserts'], [])
+    
+    def test_invalid_watermark(self):
+        response = self._changes(since='not-a-token')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
 # To run tests:
 # python manage.py test apps.api.tests
+
+
+class PrincipalTests(APITestCase):
+    """Test the per-request principal used by scoping and permissions"""
+    
+    def setUp(self):
+        self.organization = Organization.objects.create(name='Acme', slug='acme')
+        self.warehouse = Warehouse.objects.create(
+            name='Main', location='Padova', organization=self.organization
+        )
+        self.user = User.objects.create_user(
+            username='manager', password='testpass123', email='manager@test.com',
+            role='manager', organization=self.organization, assigned_warehouse=self.warehouse
+        )
+    
+    def test_jwt_request_loads_user_once(self):
+        from rest_framework_simplejwt.tokens import AccessToken
+        
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+        
+        # User and organization snapshots, the scoped warehouse, its stock count
+        with self.assertNumQueries(4):
+            response = self.client.get(f'/api/warehouses/{self.warehouse.id}/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        
+        # The snapshots are cached; users and organizations are not read again
+        with self.assertNumQueries(2):
+            response = self.client.get(f'/api/warehouses/{self.warehouse.id}/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+    
+    def test_user_snapshot_invalidated_on_save(self):
+        from rest_framework_simplejwt.tokens import AccessToken
+        
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+        self.assertEqual(self.client.get('/api/metrics/').status_code, status.HTTP_200_OK)
+        
+        self.user.role = 'staff'
+        self.user.save()
+        self.assertEqual(self.client.get('/api/metrics/').status_code, status.HTTP_403_FORBIDDEN)
+        
+        self.user.is_active = False
+        self.user.save(update_fields=['is_active'])
+        self.assertEqual(self.client.get('/api/warehouses/').status_code, status.HTTP_401_UNAUTHORIZED)
+    
+    def test_process_local_cache_keeps_snapshots_short(self):
+        from apps.accounts.snapshots import get_user_snapshot
+
+        # Another worker deactivating the user only clears its own LocMemCache
+        with self.settings(SNAPSHOT_LOCAL_TIMEOUT=0):
+            self.assertTrue(get_user_snapshot(self.user.pk)['is_active'])
+            User.objects.filter(pk=self.user.pk).update(is_active=False)
+            self.assertFalse(get_user_snapshot(self.user.pk)['is_active'])
+
+    def test_snapshot_user_loads_row_on_demand(self):
+        from apps.accounts.snapshots import SnapshotUser, get_user_snapshot
+        
+        user = SnapshotUser(get_user_snapshot(self.user.pk))
+        with self.assertNumQueries(0):
+            self.assertEqual(user.organization_id, self.organization.id)
+            self.assertEqual(user.role, 'manager')
+        with self.assertNumQueries(1):
+            self.assertEqual(user.email, 'manager@test.com')
+            self.assertEqual(user.assigned_warehouse, self.warehouse)
+        product = Product.objects.create(
+            name='Wine', sku='WINE-001', cost_price='10.00', selling_price='20.00', created_by=user
+        )
+        self.assertEqual(product.created_by_id, self.user.pk)
+    
+    def test_permissions_compare_ids(self):
+        from rest_framework.test import APIRequestFactory
+        from apps.api.permissions import CanViewAnalytics, IsOrganizationMember
+        from apps.core.principal import get_principal
+        
+        product = Product.objects.create(
+            name='Wine', sku='WINE-001', cost_price='10.00', selling_price='20.00', created_by=self.user
+        )
+        stock = Stock.objects.get(pk=Stock.objects.create(product=product, warehouse=self.warehouse).pk)
+        request = APIRequestFactory().get('/')
+        request.user = User.objects.get(pk=self.user.pk)
+        
+        with self.assertNumQueries(0):
+            principal = get_principal(request)
+            self.assertEqual(principal.organization_id, self.organization.id)
+            self.assertEqual(principal.assigned_warehouse_id, self.warehouse.id)
+            self.assertTrue(CanViewAnalytics().has_permission(request, None))
+            self.assertTrue(IsOrganizationMember().has_object_permission(request, None, stock))
+        
+        with self.assertRaises(Exception):
+            principal.role = 'admin'
+
+
+class OrganizationThrottleTests(APITestCase):
+    """Test per-organization token buckets"""
+    
+    rates = {
+        'trial': {'read': '2/min', 'write': '1/min', 'bulk': '1/min'},
+        'active': {'read': '5/min', 'write': '5/min', 'bulk': '1/min'},
+    }
+    
+    def setUp(self):
+        from apps.api.throttling import get_bucket_store
+        get_bucket_store().clear()
+        
+        self.organization = Organization.objects.create(name='Acme', slug='acme')
+        other = Organization.objects.create(name='Other', slug='other')
+        self.user = User.objects.create_user(
+            username='integration', password='testpass123', email='integration@test.com',
+            organization=self.organization
+        )
+        self.colleague = User.objects.create_user(
+            username='colleague', password='testpass123', email='colleague@test.com',
+            organization=self.organization
+        )
+        self.outsider = User.objects.create_user(
+            username='outsider', password='testpass123', email='outsider@test.com', organization=other
+        )
+    
+    def get(self, user):
+        self.client.force_authenticate(user=user)
+        return self.client.get('/api/warehouses/')
+    
+    def test_bucket_shared_by_organization(self):
+        with self.settings(ORGANIZATION_THROTTLE_RATES=self.rates):
+            self.assertEqual(self.get(self.user).status_code, status.HTTP_200_OK)
+            self.assertEqual(self.get(self.colleague).status_code, status.HTTP_200_OK)
+            
+            response = self.get(self.user)
+            self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+            self.assertIn('Retry-After', response)
+            
+            # Other organizations and other endpoint classes have their own buckets
+            self.assertEqual(self.get(self.outsider).status_code, status.HTTP_200_OK)
+            response = self.client.post('/api/warehouses/', {'name': 'Annex', 'location': 'Vicenza'})
+            self.assertNotEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+    
+    def test_limits_follow_subscription(self):
+        with self.settings(ORGANIZATION_THROTTLE_RATES=self.rates):
+            for _ in range(2):
+                self.get(self.user)
+            self.assertEqual(self.get(self.user).status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+            
+            self.organization.subscription_status = 'active'
+            self.organization.save()
+            
+            # Start again from a full bucket of the new size
+            from apps.api.throttling import get_bucket_store
+            get_bucket_store().clear()
+            for _ in range(5):
+                self.assertEqual(self.get(self.user).status_code, status.HTTP_200_OK)
+            self.assertEqual(self.get(self.user).status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+    
+    def test_local_bucket_refills(self):
+        from apps.api.throttling import LocalBucketStore
+        
+        store = LocalBucketStore()
+        self.assertEqual(store.take('key', 1, 1000.0), (True, 0.0))
+        allowed, wait = store.take('key', 1, 1000.0)
+        if not allowed:
+            self.assertGreater(wait, 0)
+            self.assertLessEqual(wait, 0.001)
+        import time
+        time.sleep(0.002)
+        self.assertTrue(store.take('key', 1, 1000.0)[0])
+    
+    def test_local_store_evicts_least_recently_used(self):
+        from apps.api.throttling import LocalBucketStore
+        
+        store = LocalBucketStore()
+        store.max_buckets = 3
+        for key in ('b', 'a', 'a', 'c', 'd'):
+            store.take(key, 2, 0.001)
+        # Only 'b' was evicted; 'a' keeps its drained bucket
+        self.assertFalse(store.take('a', 2, 0.001)[0])
+        self.assertTrue(store.take('b', 2, 0.001)[0])
+
+
+class OrganizationAPITests(APITestCase):
+    """Test the annotated organization listing"""
+    
+    def setUp(self):
+        self.organization = Organization.objects.create(name='Acme', slug='acme')
+        Organization.objects.create(name='Other', slug='other')
+        Warehouse.objects.create(name='Main', location='Padova', organization=self.organization)
+        self.manager = User.objects.create_user(
+            username='manager', password='testpass123', email='manager@test.com',
+            role='manager', organization=self.organization
+        )
+    
+    def test_members_see_their_organization(self):
+        self.client.force_authenticate(user=self.manager)
+        response = self.client.get('/api/organizations/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        [organization] = response.data['results']
+        self.assertEqual(organization['name'], 'Acme')
+        self.assertEqual((organization['warehouse_count'], organization['user_count']), (1, 1))
+        self.assertEqual(organization['order_count'], 0)
+    
+    def test_superuser_orders_by_figures(self):
+        admin = User.objects.create_superuser(username='root', password='testpass123', email='root@test.com')
+        self.client.force_authenticate(user=admin)
+        response = self.client.get('/api/organizations/?ordering=-warehouse_count')
+        self.assertEqual([o['name'] for o in response.data['results']], ['Acme', 'Other'])
@@ -0,0 +1,140 @@
+"""
+Per-organization rate limiting.
+
+Each organization gets one token bucket per endpoint class ('read',
+'write', or a view's throttle_scope such as 'bulk'), sized from
+ORGANIZATION_THROTTLE_RATES for its subscription status. A '600/min' rate
+means a burst of 600 requests, refilled at 10 per second.
+
+A request costs one read of the cached organization snapshot and one
+atomic bucket update: a Lua script in Redis, or a locked dict in-process
+when no Redis URL is configured (tests, local development).
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.throttling import UserRateThrottle
+
+from apps.accounts.snapshots import get_organization_snapshot
+from apps.core.principal import get_principal
+
+
+class LocalBucketStore:
+    """
+    In-process token buckets; atomic within one process only. Past
+    max_buckets the least recently used bucket is dropped, which is the one
+    most likely to have refilled already.
+    """
+
+    max_buckets = 100000
+
+    def __init__(self):
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key, capacity, refill_rate):
+        """(allowed, seconds until the next token) after taking one token"""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * refill_rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            if len(self._buckets) >= self.max_buckets:
+                self._buckets.popitem(last=False)
+            self._buckets[key] = (tokens, now)
+        return allowed, 0.0 if allowed else (1 - tokens) / refill_rate
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class RedisBucketStore:
+    """Token buckets in Redis, refilled and taken in one script call"""
+
+    script = """
+local capacity = tonumber(ARGV[1])
+local refill_rate = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or capacity
+local updated = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * refill_rate)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / refill_rate) + 1)
+return {allowed, tostring(tokens)}
+"""
+
+    def __init__(self, url):
+        import redis
+        self._take = redis.Redis.from_url(url).register_script(self.script)
+
+    def take(self, key, capacity, refill_rate):
+        allowed, tokens = self._take(keys=[key], args=[capacity, refill_rate])
+        if allowed:
+            return True, 0.0
+        return False, (1 - float(tokens)) / refill_rate
+
+
+_store = None
+
+
+def get_bucket_store():
+    global _store
+    if _store is None:
+        url = settings.THROTTLE_REDIS_URL
+        _store = RedisBucketStore(url) if url else LocalBucketStore()
+    return _store
+
+
+class OrganizationRateThrottle(UserRateThrottle):
+    """
+    Throttle organization members by their organization's bucket for the
+    endpoint class. Users without an organization fall back to the
+    per-user 'user' rate.
+    """
+
+    def allow_request(self, request, view):
+        principal = get_principal(request)
+        if not principal.organization_id:
+            return super().allow_request(request, view)
+
+        organization = get_organization_snapshot(principal.organization_id)
+        if organization is None:
+            return super().allow_request(request, view)
+
+        endpoint_class = self.get_endpoint_class(request, view)
+        rates = settings.ORGANIZATION_THROTTLE_RATES.get(organization['subscription_status'], {})
+        rate = rates.get(endpoint_class) or rates.get('write')
+        if rate is None:
+            return True
+
+        num_requests, duration = self.parse_rate(rate)
+        allowed, self._wait = get_bucket_store().take(
+            f'throttle:{principal.organization_id}:{endpoint_class}',
+            num_requests, num_requests / duration,
+        )
+        return allowed
+
+    def get_endpoint_class(self, request, view):
+        scope = getattr(view, 'throttle_scope', None)
+        if scope:
+            return scope
+        return 'read' if request.method in SAFE_METHODS else 'write'
+
+    def wait(self):
+        if hasattr(self, '_wait'):
+            return self._wait
+        return super().wait()
@@ -3,8 +3,9 @@ from rest_framework.routers import DefaultRouter
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
 from .views import (
-    UserViewSet, WarehouseViewSet, ProductViewSet, StockViewSet,
-    CustomerViewSet, OrderViewSet, PredictionViewSet, SalesMetricViewSet
+    UserViewSet, OrganizationViewSet, WarehouseViewSet, ProductViewSet, StockViewSet, StockAlertViewSet,
+    CustomerViewSet, OrderViewSet, OrderItemViewSet, PredictionViewSet, SalesMetricViewSet,
+    SalesRollupViewSet, ForecastBacktestViewSet, DatabaseHealthViewSet
 )
 
 # Swagger imports
@@ -13,13 +14,19 @@ from .swagger import schema_view
 # Create router and register viewsets
 router = DefaultRouter()
 router.register(r'users', UserViewSet, basename='user')
+router.register(r'organizations', OrganizationViewSet, basename='organization')
 router.register(r'warehouses', WarehouseViewSet, basename='warehouse')
 router.register(r'products', ProductViewSet, basename='product')
 router.register(r'stocks', StockViewSet, basename='stock')
+router.register(r'stock-alerts', StockAlertViewSet, basename='stock-alert')
 router.register(r'customers', CustomerViewSet, basename='customer')
 router.register(r'orders', OrderViewSet, basename='order')
+router.register(r'order-items', OrderItemViewSet, basename='order-item')
 router.register(r'predictions', PredictionViewSet, basename='prediction')
+router.register(r'backtests', ForecastBacktestViewSet, basename='backtest')
 router.register(r'metrics', SalesMetricViewSet, basename='metric')
+router.register(r'rollups', SalesRollupViewSet, basename='rollup')
+router.register(r'health/database', DatabaseHealthViewSet, basename='database-health')
 
 urlpatterns = [
     # Swagger Documentation
@@ -1,54 +1,47 @@
 from rest_framework import viewsets, status, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.permissions import IsAuthenticated, IsAdminUser, AllowAny
 from django_filters.rest_framework import DjangoFilterBackend
+from django.db import transaction
 from django.db.models import Q, Sum, Count, F
+from django.db.models.functions import TruncMonth, TruncQuarter, TruncWeek, TruncYear
+from django.utils.dateparse import parse_date
 from django.utils import timezone
 from datetime import timedelta
+import logging
+import uuid
 
-from apps.accounts.models import User
-from apps.inventory.models import Warehouse, Product, Stock
+from apps.accounts.models import Organization, User
+from apps.core.principal import get_principal
+from apps.inventory.models import Warehouse, Product, Stock, StockAlert
+from apps.inventory.alerts import acknowledge_alerts
 from apps.sales.models import Customer, Order, OrderItem
-from apps.analytics.models import Prediction, SalesMetric
+from apps.analytics.models import ForecastBacktest, Prediction, SalesMetric, SalesRollup
+from apps.analytics.periods import (
+    BUCKETS, choose_bucket, choose_grain, count_periods, period_start, periods_between,
+)
+from apps.analytics.rollups import ROLLUP_DIMENSIONS, ROLLUP_MEASURES
 
 from .serializers import (
-    UserSerializer, UserRegistrationSerializer, PasswordChangeSerializer,
-    WarehouseSerializer, ProductSerializer, StockSerializer,
+    UserSerializer, UserRegistrationSerializer, PasswordChangeSerializer, OrganizationSerializer,
+    WarehouseSerializer, ProductSerializer, StockSerializer, StockAdjustmentSerializer,
+    StockAlertSerializer,
     CustomerSerializer, OrderSerializer, OrderListSerializer, OrderItemSerializer,
-    PredictionSerializer, SalesMetricSerializer
+    PredictionSerializer, SalesMetricSerializer, SalesRollupSerializer, ForecastBacktestSerializer
 )
+from .mixins import BulkCreateMixin, ChangeFeedMixin, ReplicaReadMixin, StreamingListMixin, TenantScopedMixin
 from .permissions import (
     IsAdminOrReadOnly, IsManagerOrAdmin, CanManageInventory, 
     CanManageSales, CanViewAnalytics
 )
 
+logger = logging.getLogger(__name__)
 
-# ============ ACCOUNTS VIEWSETS ============
 
-class WarehouseViewSet(viewsets.ModelViewSet):
-    """Warehouse CRUD"""
-    queryset = Warehouse.objects.all()
-    serializer_class = WarehouseSerializer
-    permission_classes = [IsAuthenticated, CanManageInventory]  # Keep existing
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
-    search_fields = ['name', 'location']
-    ordering_fields = ['name', 'created_at']
-    ordering = ['name']
-    
-    # ADD THIS METHOD ↓
-    def get_queryset(self):
-        qs = super().get_queryset()
-        if self.request.user.is_superuser:
-            return qs
-        if hasattr(self.request.user, 'organization') and self.request.user.organization:
-            return qs.filter(organization=self.request.user.organization)
-        return qs.none()
-    
-    def perform_create(self, serializer):
-        serializer.save(created_by=self.request.user)
+# ============ ACCOUNTS VIEWSETS ============
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(TenantScopedMixin, viewsets.ModelViewSet):
     """User management with registration"""
     queryset = User.objects.filter(is_active=True)
     permission_classes = [IsAuthenticated]
@@ -86,7 +79,19 @@ class UserViewSet(viewsets.ModelViewSet):
 
 # ============ INVENTORY VIEWSETS ============
 
-class WarehouseViewSet(viewsets.ModelViewSet):
+class OrganizationViewSet(TenantScopedMixin, viewsets.ReadOnlyModelViewSet):
+    """Organizations with warehouse, user and order figures (superusers see all)"""
+    queryset = Organization.objects.with_stats()
+    serializer_class = OrganizationSerializer
+    permission_classes = [IsAuthenticated, IsManagerOrAdmin]
+    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filterset_fields = ['subscription_status', 'is_active']
+    search_fields = ['name', 'slug', 'contact_email']
+    ordering_fields = ['name', 'created_at', 'warehouse_count', 'user_count', 'order_count', 'revenue', 'last_activity']
+    ordering = ['name']
+
+
+class WarehouseViewSet(TenantScopedMixin, viewsets.ModelViewSet):
     """Warehouse CRUD"""
     queryset = Warehouse.objects.all()
     serializer_class = WarehouseSerializer
@@ -111,25 +116,25 @@ class WarehouseViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
-class ProductViewSet(viewsets.ModelViewSet):
+class ProductViewSet(TenantScopedMixin, BulkCreateMixin, ChangeFeedMixin, StreamingListMixin, viewsets.ModelViewSet):
     """Product CRUD with search and filters"""
-    queryset = Product.objects.filter(is_active=True)
+    queryset = Product.objects.filter(is_active=True).select_related('classification')
     serializer_class = ProductSerializer
     permission_classes = [IsAuthenticated, CanManageInventory]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
-    filterset_fields = ['category', 'is_active']
+    filterset_fields = ['category', 'is_active', 'classification__abc_class', 'classification__xyz_class']
     search_fields = ['name', 'sku', 'description']
-    ordering_fields = ['name', 'sku', 'selling_price', 'created_at']
+    ordering_fields = [
+        'name', 'sku', 'selling_price', 'created_at',
+        'classification__revenue', 'classification__demand_cv',
+    ]
     ordering = ['name']
-    
-    # ADD THIS METHOD ↓
-    def get_queryset(self):
-        qs = super().get_queryset()
-        if self.request.user.is_superuser:
-            return qs
-        if hasattr(self.request.user, 'organization') and self.request.user.organization:
-            return qs.filter(created_by__organization=self.request.user.organization)
-        return qs.none()
+    bulk_match_fields = ('sku',)
+    stream_fields = [
+        'id', 'name', 'sku', 'category', 'cost_price', 'selling_price',
+        'description', 'is_active', 'created_at', 'updated_at',
+        ('abc_class', 'classification__abc_class'), ('xyz_class', 'classification__xyz_class'),
+    ]
     
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
@@ -144,7 +149,7 @@ class ProductViewSet(viewsets.ModelViewSet):
             quantity__lte=F('reorder_level')
         ).values_list('product_id', flat=True)
         
-        products = self.queryset.filter(id__in=low_stock_ids)
+        products = self.get_queryset().filter(id__in=low_stock_ids)
         serializer = self.get_serializer(products, many=True)
         return Response(serializer.data)
 
@@ -162,7 +167,7 @@ class ProductViewSet(viewsets.ModelViewSet):
         return Response(summary)
 
 
-class StockViewSet(viewsets.ModelViewSet):
+class StockViewSet(TenantScopedMixin, BulkCreateMixin, ChangeFeedMixin, StreamingListMixin, viewsets.ModelViewSet):
     """Stock management"""
     queryset = Stock.objects.all().select_related('product', 'warehouse')
     serializer_class = StockSerializer
@@ -171,15 +176,13 @@ class StockViewSet(viewsets.ModelViewSet):
     filterset_fields = ['warehouse', 'product']
     ordering_fields = ['quantity', 'created_at']
     ordering = ['product__name']
-    
-    # ADD THIS METHOD ↓
-    def get_queryset(self):
-        qs = super().get_queryset()
-        if self.request.user.is_superuser:
-            return qs
-        if hasattr(self.request.user, 'organization') and self.request.user.organization:
-            return qs.filter(warehouse__organization=self.request.user.organization)
-        return qs.none()
+    bulk_match_fields = ('product', 'warehouse')
+    adjust_max_items = 5000
+    stream_fields = [
+        'id', 'product', ('product_sku', 'product__sku'), 'warehouse',
+        'quantity', 'reorder_level', 'lead_time_days', 'safety_stock',
+        'recommended_reorder_level', 'created_at', 'updated_at'
+    ]
     
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
@@ -201,25 +204,111 @@ class StockViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        new_quantity = stock.quantity + adjustment
-        
-        if new_quantity < 0:
+        # Conditional UPDATE so concurrent adjustments cannot lose writes
+        if not Stock.objects.filter(pk=stock.pk).adjust(adjustment, request.user):
             return Response(
                 {'error': 'Insufficient stock'}, 
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        stock.quantity = new_quantity
-        stock.updated_by = request.user
-        stock.save()
-        
+        stock.refresh_from_db()
         serializer = self.get_serializer(stock)
         return Response(serializer.data)
 
+    @action(detail=False, methods=['post'], throttle_scope='bulk')
+    def adjust(self, request):
+        """
+        Apply a batch of adjustments, each as its own conditional UPDATE.
+        Entries that would take stock below zero, or that match no stock
+        visible to the user, are rejected and reported.
+        """
+        if isinstance(request.data, list) and len(request.data) > self.adjust_max_items:
+            return Response(
+                {'error': f'At most {self.adjust_max_items} adjustments per request'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        serializer = StockAdjustmentSerializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        entries = serializer.validated_data
+        
+        # Resolve every entry to a visible stock id with one query
+        scoped = self.get_queryset().order_by()
+        stock_ids = {e['stock_id'] for e in entries if e.get('stock_id')}
+        skus = {e['sku'] for e in entries if not e.get('stock_id')}
+        warehouses = {e['warehouse'] for e in entries if not e.get('stock_id')}
+        
+        visible_ids = set()
+        by_natural_key = {}
+        for pk, sku, warehouse_id in scoped.filter(
+            Q(pk__in=stock_ids) | Q(product__sku__in=skus, warehouse_id__in=warehouses)
+        ).values_list('pk', 'product__sku', 'warehouse_id'):
+            visible_ids.add(pk)
+            by_natural_key[(sku, warehouse_id)] = pk
+        
+        results = []
+        applied_ids = set()
+        with transaction.atomic():
+            for index, entry in enumerate(entries):
+                if entry.get('stock_id'):
+                    stock_id = entry['stock_id'] if entry['stock_id'] in visible_ids else None
+                else:
+                    stock_id = by_natural_key.get((entry['sku'], entry['warehouse']))
+                
+                result = {
+                    'index': index,
+                    'stock_id': str(stock_id) if stock_id else None,
+                    'delta': entry['delta'],
+                    'reason': entry.get('reason', ''),
+                }
+                if stock_id is None:
+                    result.update(status='rejected', error='Stock not found')
+                elif not Stock.objects.filter(pk=stock_id).adjust(entry['delta'], request.user):
+                    result.update(status='rejected', error='Insufficient stock')
+                else:
+                    result['status'] = 'applied'
+                    applied_ids.add(stock_id)
+                    logger.info(
+                        f"Stock {str(stock_id)[:8]} adjusted by {entry['delta']} "
+                        f"({result['reason'] or 'no reason'}) by {request.user.username}"
+                    )
+                results.append(result)
+        
+        quantities = dict(Stock.objects.filter(pk__in=applied_ids).values_list('pk', 'quantity'))
+        for result in results:
+            if result['status'] == 'applied':
+                result['quantity'] = quantities[uuid.UUID(result['stock_id'])]
+        
+        rejected = [r for r in results if r['status'] == 'rejected']
+        return Response({
+            'applied': len(results) - len(rejected),
+            'rejected': len(rejected),
+            'results': results,
+        })
+
+
+class StockAlertViewSet(TenantScopedMixin, viewsets.ReadOnlyModelViewSet):
+    """Low-stock alerts (opened and resolved by the hourly alert task)"""
+    queryset = StockAlert.objects.all().select_related('stock__product', 'warehouse')
+    serializer_class = StockAlertSerializer
+    permission_classes = [IsAuthenticated, CanManageInventory]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    filterset_fields = ['status', 'warehouse']
+    ordering_fields = ['opened_at', 'quantity']
+    ordering = ['-opened_at']
+    
+    @action(detail=True, methods=['post'])
+    def acknowledge(self, request, pk=None):
+        """Acknowledge an open alert"""
+        alert = self.get_object()
+        acknowledge_alerts(StockAlert.objects.filter(pk=alert.pk), request.user)
+        alert.refresh_from_db()
+        return Response(self.get_serializer(alert).data)
+
 
 # ============ SALES VIEWSETS ============
 
-class CustomerViewSet(viewsets.ModelViewSet):
+class CustomerViewSet(TenantScopedMixin, BulkCreateMixin, ChangeFeedMixin, StreamingListMixin, viewsets.ModelViewSet):
     """Customer management"""
     queryset = Customer.objects.filter(is_active=True)
     serializer_class = CustomerSerializer
@@ -228,22 +317,21 @@ class CustomerViewSet(viewsets.ModelViewSet):
     search_fields = ['name', 'email', 'phone']
     ordering_fields = ['name', 'created_at']
     ordering = ['name']
-    
-    # ADD THIS METHOD ↓
-    def get_queryset(self):
-        qs = super().get_queryset()
-        if self.request.user.is_superuser:
-            return qs
-        if hasattr(self.request.user, 'organization') and self.request.user.organization:
-            return qs.filter(created_by__organization=self.request.user.organization)
-        return qs.none()
+    stream_fields = [
+        'id', 'name', 'email', 'phone', 'address', 'is_active', 'created_at', 'updated_at'
+    ]
     
     def perform_create(self, serializer):
-        serializer.save(created_by=self.request.user)
+        serializer.save(created_by=self.request.user, organization_id=get_principal(self.request).organization_id)
         
     def perform_update(self, serializer):
         serializer.save(updated_by=self.request.user)
 
+    def get_bulk_create_kwargs(self):
+        kwargs = super().get_bulk_create_kwargs()
+        kwargs['organization_id'] = get_principal(self.request).organization_id
+        return kwargs
+
     @action(detail=True, methods=['get'])
     def orders(self, request, pk=None):
         """Get all orders for this customer"""
@@ -253,7 +341,7 @@ class CustomerViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
-class OrderViewSet(viewsets.ModelViewSet):
+class OrderViewSet(TenantScopedMixin, ChangeFeedMixin, StreamingListMixin, viewsets.ModelViewSet):
     """Order management with status workflow"""
     queryset = Order.objects.all().select_related('customer')
     permission_classes = [IsAuthenticated, CanManageSales]
@@ -261,15 +349,10 @@ class OrderViewSet(viewsets.ModelViewSet):
     filterset_fields = ['status', 'customer']
     ordering_fields = ['created_at', 'total']
     ordering = ['-created_at']
-    
-    # ADD THIS METHOD ↓
-    def get_queryset(self):
-        qs = super().get_queryset()
-        if self.request.user.is_superuser:
-            return qs
-        if hasattr(self.request.user, 'organization') and self.request.user.organization:
-            return qs.filter(warehouse__organization=self.request.user.organization)
-        return qs.none()
+    stream_fields = [
+        'id', 'customer', ('customer_name', 'customer__name'), 'warehouse',
+        'status', 'total', 'notes', 'created_at', 'updated_at'
+    ]
     
     def get_serializer_class(self):
         if self.action == 'list':
@@ -325,23 +408,39 @@ class OrderViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def stats(self, request):
         """Get order statistics"""
+        orders = self.get_queryset()
         stats = {
-            'total': self.queryset.count(),
-            'pending': self.queryset.filter(status='pending').count(),
-            'confirmed': self.queryset.filter(status='confirmed').count(),
-            'shipped': self.queryset.filter(status='shipped').count(),
-            'delivered': self.queryset.filter(status='delivered').count(),
-            'cancelled': self.queryset.filter(status='cancelled').count(),
-            'total_revenue': self.queryset.filter(
+            'total': orders.count(),
+            'pending': orders.filter(status='pending').count(),
+            'confirmed': orders.filter(status='confirmed').count(),
+            'shipped': orders.filter(status='shipped').count(),
+            'delivered': orders.filter(status='delivered').count(),
+            'cancelled': orders.filter(status='cancelled').count(),
+            'total_revenue': orders.filter(
                 status__in=['confirmed', 'shipped', 'delivered']
             ).aggregate(total=Sum('total'))['total'] or 0
         }
         return Response(stats)
 
 
+class OrderItemViewSet(TenantScopedMixin, ChangeFeedMixin, StreamingListMixin, viewsets.ReadOnlyModelViewSet):
+    """Order line items (read-only, written through orders)"""
+    queryset = OrderItem.objects.all().select_related('product')
+    serializer_class = OrderItemSerializer
+    permission_classes = [IsAuthenticated, CanManageSales]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    filterset_fields = ['order', 'product']
+    ordering_fields = ['created_at', 'subtotal']
+    ordering = ['-created_at']
+    stream_fields = [
+        'id', 'order', 'product', ('product_sku', 'product__sku'),
+        'quantity', 'price', 'subtotal', 'created_at', 'updated_at'
+    ]
+    
+
 # ============ ANALYTICS VIEWSETS ============
 
-class PredictionViewSet(viewsets.ReadOnlyModelViewSet):
+class PredictionViewSet(TenantScopedMixin, ReplicaReadMixin, viewsets.ReadOnlyModelViewSet):
     """View predictions (read-only, generated by ML tasks)"""
     queryset = Prediction.objects.all().select_related('product')
     serializer_class = PredictionSerializer
@@ -352,7 +451,18 @@ class PredictionViewSet(viewsets.ReadOnlyModelViewSet):
     ordering = ['-date']
 
 
-class SalesMetricViewSet(viewsets.ReadOnlyModelViewSet):
+class ForecastBacktestViewSet(TenantScopedMixin, ReplicaReadMixin, viewsets.ReadOnlyModelViewSet):
+    """Compare forecast accuracy across model versions"""
+    queryset = ForecastBacktest.objects.all()
+    serializer_class = ForecastBacktestSerializer
+    permission_classes = [IsAuthenticated, CanViewAnalytics]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    filterset_fields = ['model_version', 'level', 'key', 'start_date', 'end_date']
+    ordering_fields = ['end_date', 'mape', 'bias', 'coverage']
+    ordering = ['-end_date', 'model_version']
+
+
+class SalesMetricViewSet(ReplicaReadMixin, viewsets.ReadOnlyModelViewSet):
     """View sales metrics"""
     queryset = SalesMetric.objects.all()
     serializer_class = SalesMetricSerializer
@@ -361,6 +471,42 @@ class SalesMetricViewSet(viewsets.ReadOnlyModelViewSet):
     filterset_fields = ['metric_type', 'date']
     ordering_fields = ['date']
     ordering = ['-date']
+    
+    # Fewest points a chart should get when the grain is picked automatically
+    metric_min_points = 12
+
+    def get_queryset(self):
+        """
+        ?start=&end= limits the range. Without an explicit metric_type the
+        coarsest grain that still gives metric_min_points rows is used, and
+        periods that overlap the range are returned whole.
+        """
+        qs = super().get_queryset()
+        if self.action != 'list':
+            return qs
+        
+        params = self.request.query_params
+        try:
+            start = parse_date(params['start']) if params.get('start') else None
+            end = parse_date(params['end']) if params.get('end') else None
+        except ValueError:
+            start = end = None
+        if start is None and end is None:
+            return qs
+        
+        metric_type = params.get('metric_type')
+        if not metric_type:
+            if start:
+                metric_type = choose_grain(start, end or timezone.now().date(), self.metric_min_points)
+            else:
+                metric_type = 'daily'
+            qs = qs.filter(metric_type=metric_type)
+        
+        if start:
+            qs = qs.filter(date__gte=period_start(start, metric_type))
+        if end:
+            qs = qs.filter(date__lte=end)
+        return qs
 
     @action(detail=False, methods=['get'])
     def last_30_days(self, request):
@@ -372,3 +518,179 @@ class SalesMetricViewSet(viewsets.ReadOnlyModelViewSet):
         )
         serializer = self.get_serializer(metrics, many=True)
         return Response(serializer.data)
+
+
+class SalesRollupViewSet(TenantScopedMixin, ReplicaReadMixin, viewsets.ReadOnlyModelViewSet):
+    """Sales rollup cube at (organization, warehouse, product, day) grain"""
+    queryset = SalesRollup.objects.all().select_related('warehouse', 'product')
+    serializer_class = SalesRollupSerializer
+    permission_classes = [IsAuthenticated, CanViewAnalytics]
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    filterset_fields = ['warehouse', 'product', 'day']
+    ordering_fields = ['day', 'quantity', 'revenue']
+    ordering = ['-day']
+
+    # Label columns returned alongside each sliced dimension
+    slice_labels = {
+        'organization': ['organization__name'],
+        'warehouse': ['warehouse__name'],
+        'product': ['product__sku', 'product__name'],
+        'day': [],
+    }
+
+    # Time series: default and largest number of points returned
+    timeseries_points = 200
+    timeseries_max_points = 1000
+    timeseries_days = 90
+
+    timeseries_truncs = {
+        'weekly': TruncWeek,
+        'monthly': TruncMonth,
+        'quarterly': TruncQuarter,
+        'yearly': TruncYear,
+    }
+
+    def _date_params(self, request):
+        """Parse ?start= and ?end=; returns (start, end, error message)"""
+        dates = {}
+        for param in ('start', 'end'):
+            value = request.query_params.get(param)
+            if not value:
+                continue
+            try:
+                dates[param] = parse_date(value)
+            except ValueError:
+                dates[param] = None
+            if dates[param] is None:
+                return None, None, f'{param} must be a date (YYYY-MM-DD)'
+        return dates.get('start'), dates.get('end'), None
+
+    @action(detail=False, methods=['get'])
+    def timeseries(self, request):
+        """
+        Sales measures over time, aggregated in SQL into calendar buckets.
+        GET /api/rollups/timeseries/?start=2023-01-01&end=2025-12-31&points=200
+        GET /api/rollups/timeseries/?bucket=weekly&warehouse=<uuid>&category=Wine
+        With points (default 200) the finest bucket that fits is used, so the
+        payload stays bounded whatever the range. Empty buckets are zero.
+        """
+        start, end, error = self._date_params(request)
+        if error:
+            return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+        end = end or timezone.now().date()
+        start = start or end - timedelta(days=self.timeseries_days - 1)
+        if start > end:
+            return Response({'error': 'start must not be after end'}, status=status.HTTP_400_BAD_REQUEST)
+
+        bucket = request.query_params.get('bucket')
+        if bucket:
+            if bucket not in BUCKETS:
+                return Response(
+                    {'error': f"bucket must be one of {', '.join(BUCKETS)}"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+        else:
+            try:
+                points = int(request.query_params.get('points', self.timeseries_points))
+            except ValueError:
+                return Response({'error': 'points must be a number'}, status=status.HTTP_400_BAD_REQUEST)
+            bucket = choose_bucket(start, end, max(1, min(points, self.timeseries_max_points)))
+
+        count = count_periods(start, end, bucket)
+        if count > self.timeseries_max_points:
+            return Response(
+                {'error': f'Range has {count} {bucket} buckets; the limit is {self.timeseries_max_points}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        periods = periods_between(start, end, bucket)
+
+        queryset = self.filter_queryset(self.get_queryset()).filter(day__gte=start, day__lte=end)
+        category = request.query_params.get('category')
+        if category:
+            queryset = queryset.filter(product__category=category)
+
+        if bucket == 'daily':
+            queryset = queryset.annotate(period=F('day'))
+        else:
+            queryset = queryset.annotate(period=self.timeseries_truncs[bucket]('day'))
+        totals = {
+            row['period']: row
+            for row in queryset.values('period').annotate(
+                **{measure: Sum(measure) for measure in ROLLUP_MEASURES}
+            ).order_by()
+        }
+
+        empty = {measure: 0 for measure in ROLLUP_MEASURES}
+        return Response({
+            'bucket': bucket,
+            'start': start,
+            'end': end,
+            'points': [
+                {**empty, **totals.get(period, {}), 'period': period}
+                for period in periods
+            ],
+        })
+
+    @action(detail=False, methods=['get'])
+    def slice(self, request):
+        """
+        Sum the measures grouped by any subset of dimensions.
+        GET /api/rollups/slice/?dimensions=warehouse,day&start=2025-01-01&end=2025-01-31
+        Accepts the same warehouse/product filters as the list.
+        """
+        raw = request.query_params.get('dimensions', '')
+        dimensions = [d.strip() for d in raw.split(',') if d.strip()]
+        unknown = [d for d in dimensions if d not in ROLLUP_DIMENSIONS]
+        if unknown:
+            return Response(
+                {'error': f"Unknown dimensions: {', '.join(unknown)}. Choose from {', '.join(ROLLUP_DIMENSIONS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        start, end, error = self._date_params(request)
+        if error:
+            return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        if start:
+            queryset = queryset.filter(day__gte=start)
+        if end:
+            queryset = queryset.filter(day__lte=end)
+
+        columns = []
+        for dimension in dimensions:
+            columns.append(dimension)
+            columns.extend(self.slice_labels[dimension])
+
+        totals = {measure: Sum(measure) for measure in ROLLUP_MEASURES}
+        if columns:
+            rows = list(queryset.values(*columns).annotate(**totals).order_by(*dimensions))
+        else:
+            rows = [queryset.aggregate(**totals)]
+
+        return Response({'dimensions': dimensions, 'results': rows})
+
+
+# ============ OPERATIONS VIEWSETS ============
+
+class DatabaseHealthViewSet(viewsets.ViewSet):
+    """Connection settings and connection wait times of the serving process, per database"""
+    permission_classes = [IsAdminUser]
+
+    def list(self, request):
+        from django.db import connections
+        from apps.core.backends.postgresql.base import connection_stats
+
+        stats = connection_stats()
+        databases = {}
+        for connection in connections.all():
+            alias = connection.alias
+            pool = getattr(connection, 'pool', None)
+            databases[alias] = {
+                'vendor': connection.vendor,
+                'conn_max_age': connection.settings_dict['CONN_MAX_AGE'],
+                'health_checks': connection.settings_dict['CONN_HEALTH_CHECKS'],
+                'pool': pool.get_stats() if pool is not None else None,
+                **stats.get(alias, {'connections': 0}),
+            }
+        return Response(databases)
@@ -1,60 +1,18 @@
 from django.contrib import admin
 
+from .principal import get_principal
+from .tenancy import TenantQuerySet
+
+
 class OrganizationFilterMixin:
     """
     Mixin to automatically filter querysets by organization.
-    Handles both direct organization fields and warehouse-based filtering.
+    Staff assigned to a warehouse are narrowed to that warehouse.
     """
     
     def get_queryset(self, request):
-        """Filter queryset based on user's organization and warehouse"""
-        qs = super().get_queryset(request)
-        
-        # Superuser sees everything
-        if request.user.is_superuser:
-            return qs
-        
-        # Users without organization see nothing
-        if not hasattr(request.user, 'organization') or not request.user.organization:
-            return qs.none()
-        
-        user_org = request.user.organization
-        user_warehouse = getattr(request.user, 'assigned_warehouse', None)
-        model = qs.model
-        model_name = model.__name__
-        
-        # Strategy 1: Model has organization field directly (Warehouse, Organization)
-        if hasattr(model, 'organization'):
-            return qs.filter(organization=user_org)
-        
-        # Strategy 2: Model has warehouse field (Order, Stock)
-        if hasattr(model, 'warehouse'):
-            if user_warehouse:
-                return qs.filter(warehouse=user_warehouse)
-            return qs.filter(warehouse__organization=user_org)
-        
-        # Strategy 3: OrderItem - filter by order's warehouse
-        if model_name == 'OrderItem':
-            if user_warehouse:
-                return qs.filter(order__warehouse=user_warehouse)
-            return qs.filter(order__warehouse__organization=user_org)
-        
-        # Strategy 4: Customer - filter by orders' warehouse organization
-        # Customers are shown if they have orders in user's organization
-        if model_name == 'Customer':
-            if user_warehouse:
-                # Show customers who have orders at this warehouse
-                return qs.filter(orders__warehouse=user_warehouse).distinct()
-            # Show customers who have orders at any warehouse in organization
-            # return qs.filter(orders__warehouse__organization=user_org).distinct()
-            return qs.filter(organization=user_org)
-        
-        # Strategy 5: Model has created_by field (Product)
-        if hasattr(model, 'created_by'):
-            return qs.filter(created_by__organization=user_org)
-        
-        # Fallback: show all (for shared resources like customers)
-        return qs
+        """Rows of the user's organization, or of their assigned warehouse"""
+        return super().get_queryset(request).for_tenant(get_principal(request), by_warehouse=True)
     
     def save_model(self, request, obj, form, change):
         """Auto-assign organization and audit fields"""
@@ -63,15 +21,17 @@ class OrganizationFilterMixin:
             if hasattr(obj, 'created_by') and not obj.created_by:
                 obj.created_by = request.user
             
-            # Set organization if model has it
-            if hasattr(obj, 'organization') and not obj.organization:
-                if hasattr(request.user, 'organization') and request.user.organization:
-                    obj.organization = request.user.organization
+            principal = get_principal(request)
+            
+            # Set organization if model has it; denormalized copies are
+            # filled from their organization_source on save instead
+            if (hasattr(obj, 'organization_id') and not obj.organization_id
+                    and not getattr(obj, 'organization_source', None)):
+                obj.organization_id = principal.organization_id
             
             # Set warehouse if user has assigned warehouse and model supports it
-            if hasattr(obj, 'warehouse') and not obj.warehouse:
-                if hasattr(request.user, 'assigned_warehouse') and request.user.assigned_warehouse:
-                    obj.warehouse = request.user.assigned_warehouse
+            if hasattr(obj, 'warehouse_id') and not obj.warehouse_id:
+                obj.warehouse_id = principal.assigned_warehouse_id
         else:  # Updating object
             if hasattr(obj, 'updated_by'):
                 obj.updated_by = request.user
@@ -83,71 +43,8 @@ class OrganizationFilterMixin:
         Filter foreign key choices by organization and warehouse.
         CRITICAL: Enforce strict multi-tenancy - users only see their organization's data
         """
-        import logging
-        logger = logging.getLogger(__name__)
-        
-        logger.info(f"formfield_for_foreignkey called: field={db_field.name}, user={request.user.username}, is_superuser={request.user.is_superuser}")
-        
-        # Superuser sees everything
-        if request.user.is_superuser:
-            logger.info(f"  → Superuser: showing all {db_field.name}")
-            return super().formfield_for_foreignkey(db_field, request, **kwargs)
-        
-        # For all other users, apply organization filtering
-        user_org = getattr(request.user, 'organization', None)
-        user_warehouse = getattr(request.user, 'assigned_warehouse', None)
-        
-        logger.info(f"  → Non-superuser: org={user_org}, warehouse={user_warehouse}")
-        
-        if not user_org:
-            logger.warning(f"  → User has NO organization, blocking all {db_field.name}")
-            # User has no organization - show nothing
-            if db_field.name == "warehouse":
-                from apps.inventory.models import Warehouse
-                kwargs["queryset"] = Warehouse.objects.none()
-            elif db_field.name == "customer":
-                from apps.sales.models import Customer
-                kwargs["queryset"] = Customer.objects.none()
-            elif db_field.name == "product":
-                from apps.inventory.models import Product
-                kwargs["queryset"] = Product.objects.none()
-            elif db_field.name == "organization":
-                from apps.accounts.models import Organization
-                kwargs["queryset"] = Organization.objects.none()
-            
-            return super().formfield_for_foreignkey(db_field, request, **kwargs)
-        
-        # Apply organization-based filtering
-        
-        # 1. WAREHOUSES - Show only user's organization warehouses
-        if db_field.name == "warehouse":
-            from apps.inventory.models import Warehouse
-            if user_warehouse:
-                # Staff with assigned warehouse - show ONLY their warehouse
-                logger.info(f"  → Filtering warehouses: showing only {user_warehouse.name}")
-                kwargs["queryset"] = Warehouse.objects.filter(id=user_warehouse.id)
-            else:
-                # Admin/Manager - show all warehouses in THEIR organization
-                logger.info(f"  → Filtering warehouses: showing all from {user_org.name}")
-                kwargs["queryset"] = Warehouse.objects.filter(organization=user_org)
-        
-        # 2. PRODUCTS - Show only user's organization products
-        elif db_field.name == "product":
-            from apps.inventory.models import Product
-            logger.info(f"  → Filtering products: showing only from {user_org.name}")
-            kwargs["queryset"] = Product.objects.filter(created_by__organization=user_org)
-        
-        # 3. CUSTOMERS - Show only user's organization customers
-        elif db_field.name == "customer":
-            from apps.sales.models import Customer
-            logger.info(f"  → Filtering customers: showing only from {user_org.name}")
-            kwargs["queryset"] = Customer.objects.filter(organization=user_org)
-        
-        # 4. ORGANIZATION - Non-superusers should NEVER see organization dropdown
-        elif db_field.name == "organization":
-            from apps.accounts.models import Organization
-            logger.info(f"  → Filtering organization: showing only {user_org.name}")
-            # Show ONLY their organization
-            kwargs["queryset"] = Organization.objects.filter(id=user_org.id)
+        manager = db_field.related_model._default_manager
+        if issubclass(manager._queryset_class, TenantQuerySet):
+            kwargs["queryset"] = manager.for_tenant(get_principal(request), by_warehouse=True)
         
         return super().formfield_for_foreignkey(db_field, request, **kwargs)
@@ -5,3 +5,9 @@ class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.core'
     label = 'core'
+
+    def ready(self):
+        from .signals import connect_change_feed_signals
+        from .tenancy import register_tenant_scopes
+        connect_change_feed_signals()
+        register_tenant_scopes()
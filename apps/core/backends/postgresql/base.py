@@ -0,0 +1,52 @@
+"""
+PostgreSQL backend that records connection setup time.
+
+For a pooled alias this is the wait for a connection from the pool; for
+an unpooled one it is the time to open a new connection. Both are kept
+per process and alias, and acquisitions slower than DB_CONNECT_WARN_MS
+are logged.
+"""
+
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db.backends.postgresql import base
+
+logger = logging.getLogger(__name__)
+
+_stats = {}
+_lock = threading.Lock()
+
+
+def record_connection(alias, seconds):
+    milliseconds = seconds * 1000
+    with _lock:
+        stats = _stats.setdefault(alias, {'connections': 0, 'total_wait_ms': 0.0, 'max_wait_ms': 0.0})
+        stats['connections'] += 1
+        stats['total_wait_ms'] += milliseconds
+        stats['max_wait_ms'] = max(stats['max_wait_ms'], milliseconds)
+    if milliseconds > getattr(settings, 'DB_CONNECT_WARN_MS', 100):
+        logger.warning('Waited %.0f ms for a connection to %s', milliseconds, alias)
+
+
+def connection_stats():
+    """Connection counts and wait times in this process, by alias"""
+    with _lock:
+        return {
+            alias: {
+                **stats,
+                'avg_wait_ms': stats['total_wait_ms'] / stats['connections'],
+            }
+            for alias, stats in _stats.items()
+        }
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def get_new_connection(self, conn_params):
+        started = time.perf_counter()
+        connection = super().get_new_connection(conn_params)
+        record_connection(self.alias, time.perf_counter() - started)
+        return connection
@@ -0,0 +1,24 @@
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from apps.analytics.tasks import backfill_daily_metrics
+
+
+class Command(BaseCommand):
+    help = 'Recompute daily sales metrics for a date range (inclusive)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('start_date', help='First day, YYYY-MM-DD')
+        parser.add_argument('end_date', nargs='?', help='Last day, YYYY-MM-DD (default: today)')
+
+    def handle(self, *args, **options):
+        try:
+            start = date.fromisoformat(options['start_date'])
+            end = date.fromisoformat(options['end_date']) if options['end_date'] else date.today()
+        except ValueError as e:
+            raise CommandError(f'Invalid date: {e}')
+        
+        if end < start:
+            raise CommandError('end_date must not be before start_date')
+        
+        result = backfill_daily_metrics(start.isoformat(), end.isoformat())
+        self.stdout.write(self.style.SUCCESS(result))
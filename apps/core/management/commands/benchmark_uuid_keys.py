@@ -0,0 +1,72 @@
+import time
+import uuid
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from apps.core.ids import uuid7
+
+
+class Command(BaseCommand):
+    help = 'Compare insert throughput and primary-key index size for random (uuid4) and time-ordered (uuid7) ids'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=200000, help='Rows inserted per id kind (default: 200000)')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows per INSERT batch (default: 5000)')
+
+    def handle(self, *args, **options):
+        if connection.vendor not in ('postgresql', 'sqlite'):
+            raise CommandError(f'Index sizes are only measured on PostgreSQL and SQLite, not {connection.vendor}')
+        if options['rows'] < 1 or options['batch_size'] < 1:
+            raise CommandError('--rows and --batch-size must be positive')
+
+        self.stdout.write(f"{options['rows']} rows on {connection.vendor}")
+        for name, generate in (('uuid4', uuid.uuid4), ('uuid7', uuid7)):
+            result = self.run(name, generate, options['rows'], options['batch_size'])
+            self.stdout.write(
+                f"{name}: {result['rows_per_second']:,.0f} rows/s overall, "
+                f"{result['last_batch_rows_per_second']:,.0f} rows/s in the last batch, "
+                f"primary key index {result['index_bytes'] / 1024:,.0f} KiB"
+            )
+
+    def run(self, name, generate, rows, batch_size):
+        table = f'benchmark_{name}_keys'
+        qn = connection.ops.quote_name
+        # Ids are bound in the form the UUIDField stores them
+        to_db = str if connection.vendor == 'postgresql' else (lambda value: value.hex)
+        column = 'uuid' if connection.vendor == 'postgresql' else 'char(32)'
+
+        with connection.cursor() as cursor:
+            cursor.execute(f'DROP TABLE IF EXISTS {qn(table)}')
+            cursor.execute(f'CREATE TABLE {qn(table)} (id {column} PRIMARY KEY, n integer NOT NULL)')
+        try:
+            started = time.perf_counter()
+            batch_seconds = 0
+            for start in range(0, rows, batch_size):
+                batch = [(to_db(generate()), n) for n in range(start, min(start + batch_size, rows))]
+                batch_started = time.perf_counter()
+                with transaction.atomic(), connection.cursor() as cursor:
+                    cursor.executemany(f'INSERT INTO {qn(table)} (id, n) VALUES (%s, %s)', batch)
+                batch_seconds = time.perf_counter() - batch_started
+            elapsed = time.perf_counter() - started
+
+            return {
+                'rows_per_second': rows / elapsed,
+                'last_batch_rows_per_second': len(batch) / batch_seconds,
+                'index_bytes': self.index_bytes(table),
+            }
+        finally:
+            with connection.cursor() as cursor:
+                cursor.execute(f'DROP TABLE {qn(table)}')
+
+    def index_bytes(self, table):
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute(
+                    'SELECT pg_relation_size(conindid) FROM pg_constraint '
+                    'WHERE conrelid = to_regclass(%s) AND contype = %s', [table, 'p']
+                )
+            else:
+                cursor.execute(
+                    'SELECT sum(pgsize) FROM dbstat WHERE name IN '
+                    '(SELECT name FROM sqlite_master WHERE type = %s AND tbl_name = %s)', ['index', table]
+                )
+            return cursor.fetchone()[0] or 0
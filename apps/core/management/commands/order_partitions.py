@@ -0,0 +1,44 @@
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from apps.sales.partitions import (
+    MONTHS_AHEAD, PARTITIONED_TABLES, add_months, archive_partitions, ensure_partitions,
+    is_partitioned, month_start,
+)
+
+
+class Command(BaseCommand):
+    help = 'Create upcoming monthly partitions of orders and order_items, and archive old ones (PostgreSQL)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--months-ahead', type=int, default=MONTHS_AHEAD,
+            help=f'Months past the current one to create (default: {MONTHS_AHEAD})'
+        )
+        parser.add_argument(
+            '--retain-months', type=int,
+            help='Archive partitions for months older than this many months before the current one'
+        )
+        parser.add_argument(
+            '--drop', action='store_true',
+            help='Drop archived partitions instead of moving them to the archive schema'
+        )
+
+    def handle(self, *args, **options):
+        if not any(is_partitioned(table) for table in PARTITIONED_TABLES):
+            self.stdout.write(f'{", ".join(PARTITIONED_TABLES)} are not partitioned; nothing to do')
+            return
+        if options['months_ahead'] < 0:
+            raise CommandError('--months-ahead must not be negative')
+        
+        created = ensure_partitions(options['months_ahead'])
+        self.stdout.write(self.style.SUCCESS(f'Created {len(created)} partitions: {", ".join(created) or "none"}'))
+        
+        if options['retain_months'] is not None:
+            if options['retain_months'] < 1:
+                raise CommandError('--retain-months must be at least 1')
+            before = add_months(month_start(date.today()), -options['retain_months'])
+            archived = archive_partitions(before, drop=options['drop'])
+            action = 'Dropped' if options['drop'] else 'Archived'
+            self.stdout.write(self.style.SUCCESS(
+                f'{action} {len(archived)} partitions before {before:%Y-%m}: {", ".join(archived) or "none"}'
+            ))
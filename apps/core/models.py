@@ -1,11 +1,11 @@
 from django.db import models
 from django.utils import timezone
-import uuid
+from apps.core.ids import uuid7
 
 
 class BaseModel(models.Model):
-    """Abstract base model with UUID and timestamps"""
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    """Abstract base model with time-ordered UUID and timestamps"""
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -32,3 +32,38 @@ class TrackableModel(BaseModel):
     
     class Meta:
         abstract = True
+
+
+class Tombstone(BaseModel):
+    """Record of a hard-deleted row, served to clients by the change feed"""
+    model = models.CharField(max_length=100)  # app_label.modelname
+    object_id = models.UUIDField()
+    organization = models.ForeignKey(
+        "accounts.Organization",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="+"
+    )
+    deleted_at = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        db_table = "tombstones"
+        indexes = [
+            models.Index(fields=['model', 'deleted_at', 'object_id']),
+        ]
+    
+    def __str__(self):
+        return f"{self.model} {self.object_id} deleted {self.deleted_at}"
+
+
+class Checkpoint(BaseModel):
+    """Position a periodic job has processed up to"""
+    name = models.CharField(max_length=100, unique=True)
+    position = models.DateTimeField()
+    
+    class Meta:
+        db_table = "checkpoints"
+    
+    def __str__(self):
+        return f"{self.name} @ {self.position}"
@@ -0,0 +1,54 @@
+"""
+Per-request principal.
+
+The ids and flags that scoping and permission checks need, taken from the
+authenticated user once per request. Comparing these never touches the
+database, unlike following request.user.organization or
+obj.warehouse.organization.
+"""
+
+from dataclasses import dataclass
+from uuid import UUID
+
+
+@dataclass(frozen=True)
+class Principal:
+    user_id: UUID | None
+    organization_id: UUID | None
+    assigned_warehouse_id: UUID | None
+    role: str
+    is_superuser: bool
+    is_staff: bool
+    is_authenticated: bool
+
+    @classmethod
+    def from_user(cls, user):
+        if user is None or not user.is_authenticated:
+            return ANONYMOUS
+        return cls(
+            user_id=user.pk,
+            organization_id=getattr(user, 'organization_id', None),
+            assigned_warehouse_id=getattr(user, 'assigned_warehouse_id', None),
+            role=getattr(user, 'role', ''),
+            is_superuser=user.is_superuser,
+            is_staff=user.is_staff,
+            is_authenticated=True,
+        )
+
+    def has_role(self, *roles):
+        return self.role in roles
+
+
+ANONYMOUS = Principal(
+    user_id=None, organization_id=None, assigned_warehouse_id=None, role='',
+    is_superuser=False, is_staff=False, is_authenticated=False,
+)
+
+
+def get_principal(request):
+    """The request's principal, built from request.user on first use"""
+    principal = getattr(request, 'principal', None)
+    if principal is None or principal.user_id != getattr(request.user, 'pk', None):
+        principal = Principal.from_user(request.user)
+        request.principal = principal
+    return principal
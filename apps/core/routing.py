@@ -0,0 +1,141 @@
+"""
+Read-replica routing.
+
+Writes always go to the default database. Reads go to a replica (one of
+REPLICA_DATABASES, picked at random) only inside a replica_reads() block,
+which API views and Celery tasks enter explicitly, or for every safe
+request when REPLICA_READS_FOR_SAFE_REQUESTS is set.
+
+Reads stay on the primary once the current block or request has written
+(read-your-writes). ReplicaRoutingMiddleware carries that across requests
+for REPLICA_PIN_SECONDS after a write, with a cookie for browser sessions
+and a cache key per user for token clients.
+"""
+
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+PIN_COOKIE = 'db_pin'
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+@dataclass
+class RoutingState:
+    replica: bool = False
+    pinned: bool = False
+    wrote: bool = False
+    user_id: object = None
+
+
+_state = ContextVar('db_routing', default=None)
+
+
+def _pin_key(user_id):
+    return f'db-pin:{user_id}'
+
+
+def read_database():
+    """The alias reads should use right now"""
+    state = _state.get()
+    replicas = settings.REPLICA_DATABASES
+    if state is None or not state.replica or state.pinned or not replicas:
+        return DEFAULT_DB_ALIAS
+    return random.choice(replicas)
+
+
+@contextmanager
+def replica_reads():
+    """
+    Send reads to a replica until the block ends or first writes. Usable
+    as a decorator. A surrounding request's pin carries in, and a write
+    inside the block pins the request.
+    """
+    outer = _state.get()
+    state = RoutingState(replica=True)
+    if outer is not None:
+        state.pinned, state.user_id = outer.pinned, outer.user_id
+    token = _state.set(state)
+    try:
+        yield
+    finally:
+        _state.reset(token)
+        if outer is not None and state.wrote:
+            outer.wrote = outer.pinned = True
+
+
+def use_replica_for_request():
+    """Opt the rest of the current request into replica reads"""
+    state = _state.get()
+    if state is not None:
+        state.replica = True
+
+
+def identify_user(user_id):
+    """Pin the request to the primary if this user wrote recently"""
+    state = _state.get()
+    if state is None or not settings.REPLICA_DATABASES or state.user_id == user_id:
+        return
+    state.user_id = user_id
+    if not state.pinned and cache.get(_pin_key(user_id)):
+        state.pinned = True
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        return read_database()
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = state.pinned = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get their schema from the primary
+        if db in settings.REPLICA_DATABASES:
+            return False
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    """Scope routing state to the request and keep read-your-writes across requests"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        pinned_until = request.COOKIES.get(PIN_COOKIE)
+        try:
+            pinned = pinned_until is not None and float(pinned_until) > time.time()
+        except ValueError:
+            pinned = False
+        state = RoutingState(
+            replica=settings.REPLICA_READS_FOR_SAFE_REQUESTS and request.method in SAFE_METHODS,
+            pinned=pinned,
+        )
+        token = _state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+
+        if state.wrote and settings.REPLICA_DATABASES:
+            seconds = settings.REPLICA_PIN_SECONDS
+            response.set_cookie(
+                PIN_COOKIE, str(time.time() + seconds), max_age=seconds, httponly=True, samesite='Lax'
+            )
+            if state.user_id is not None:
+                cache.set(_pin_key(state.user_id), True, seconds)
+        return response
@@ -0,0 +1,33 @@
+from django.db.models.signals import pre_delete
+from django.utils import timezone
+
+
+# Models served by the change feed
+CHANGE_FEED_MODELS = (
+    'inventory.Product',
+    'inventory.Stock',
+    'sales.Customer',
+    'sales.Order',
+    'sales.OrderItem',
+)
+
+
+def record_tombstone(sender, instance, **kwargs):
+    """
+    Leave a tombstone so change-feed clients learn about hard deletes.
+    Runs on pre_delete, while related rows (and the organization path) still exist.
+    """
+    from apps.core.models import Tombstone
+    from apps.core.tenancy import organization_id_of
+    
+    Tombstone.objects.create(
+        model=sender._meta.label_lower,
+        object_id=instance.pk,
+        organization_id=organization_id_of(instance),
+        deleted_at=timezone.now(),
+    )
+
+
+def connect_change_feed_signals():
+    for label in CHANGE_FEED_MODELS:
+        pre_delete.connect(record_tombstone, sender=label, dispatch_uid=f'tombstone_{label}')
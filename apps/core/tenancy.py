@@ -0,0 +1,136 @@
+"""
+Tenant scoping shared by the API and the admin.
+
+Tenant-owned models use TenantQuerySet (or a manager built from it) and
+are scoped with ``Model.objects.for_tenant(user)``. The lookup from each
+model to its organization, and to its warehouse for staff assigned to
+one, is resolved once when the app registry is ready:
+
+- a ``tenant_scope`` declared on the model wins;
+- otherwise an ``organization`` foreign key, then ``warehouse``, then
+  ``created_by``.
+
+Lookups end in ``_id`` so a local column is compared without a join.
+Models that carry a denormalized ``organization`` name the relation it is
+copied from in ``organization_source``; it is filled in on save, and bulk
+writers call fill_organization() themselves.
+"""
+
+from typing import NamedTuple
+
+from django.apps import apps
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured, ObjectDoesNotExist
+from django.db import models
+from django.db.models.signals import pre_save
+
+
+class TenantScope(NamedTuple):
+    """Lookups from a model to its organization id and warehouse id"""
+    organization: str
+    warehouse: str | None = None
+
+
+_scopes = {}
+
+
+def _has_foreign_key(model, name):
+    try:
+        return model._meta.get_field(name).many_to_one
+    except FieldDoesNotExist:
+        return False
+
+
+def resolve_scope(model):
+    """The model's declared scope, or one inferred from its foreign keys"""
+    declared = getattr(model, 'tenant_scope', None)
+    if declared is not None:
+        return declared
+
+    warehouse = 'warehouse_id' if _has_foreign_key(model, 'warehouse') else None
+    if _has_foreign_key(model, 'organization'):
+        return TenantScope('organization_id', warehouse)
+    if warehouse:
+        return TenantScope('warehouse__organization_id', warehouse)
+    if _has_foreign_key(model, 'created_by'):
+        return TenantScope('created_by__organization_id')
+    return None
+
+
+def get_tenant_scope(model):
+    scope = _scopes.get(model)
+    if scope is None:
+        scope = resolve_scope(model._meta.concrete_model)
+        if scope is None:
+            raise ImproperlyConfigured(f"{model.__name__} has no tenant scope")
+        _scopes[model] = scope
+    return scope
+
+
+def organization_id_of(obj):
+    """
+    Organization id of a model instance, following its scope path. Free
+    for models with a local organization column; otherwise only related
+    objects that are not already cached are fetched.
+    """
+    parts = get_tenant_scope(type(obj)).organization.split('__')
+    try:
+        for part in parts[:-1]:
+            obj = getattr(obj, part)
+            if obj is None:
+                return None
+    except ObjectDoesNotExist:
+        return None
+    return getattr(obj, parts[-1], None)
+
+
+def fill_organization(obj):
+    """Copy the organization from obj's organization_source (e.g. its warehouse) if unset"""
+    source = getattr(obj, 'organization_source', None)
+    if source is None or obj.organization_id is not None:
+        return
+    if getattr(obj, f'{source}_id') is not None:
+        obj.organization_id = getattr(obj, source).organization_id
+
+
+def _fill_organization(sender, instance, raw=False, **kwargs):
+    if not raw:
+        fill_organization(instance)
+
+
+def register_tenant_scopes():
+    """
+    Resolve the scope of every model managed by TenantQuerySet and fill
+    denormalized organizations on save; called from CoreConfig.ready()
+    """
+    for model in apps.get_models():
+        if issubclass(model._default_manager._queryset_class, TenantQuerySet):
+            get_tenant_scope(model)
+        if getattr(model, 'organization_source', None):
+            pre_save.connect(_fill_organization, sender=model, dispatch_uid=f'fill_organization_{model._meta.label}')
+
+
+class TenantQuerySet(models.QuerySet):
+
+    def for_organization(self, organization_id):
+        """Rows belonging to one organization"""
+        return self.filter(**{get_tenant_scope(self.model).organization: organization_id})
+
+    def for_tenant(self, user, by_warehouse=False):
+        """
+        Rows visible to user: all of them for superusers, the user's
+        organization otherwise, none without an organization. With
+        by_warehouse, staff assigned to a warehouse only see that
+        warehouse's rows of models that belong to a warehouse.
+        """
+        if user.is_superuser:
+            return self
+        organization_id = getattr(user, 'organization_id', None)
+        if not organization_id:
+            return self.none()
+
+        warehouse_id = getattr(user, 'assigned_warehouse_id', None)
+        if by_warehouse and warehouse_id:
+            scope = get_tenant_scope(self.model)
+            if scope.warehouse:
+                return self.filter(**{scope.warehouse: warehouse_id})
+        return self.for_organization(organization_id)
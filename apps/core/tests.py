@@ -1,3 +1,247 @@
-from django.test import TestCase
+import time
+import uuid
+from io import StringIO
 
-# Create your tests here.
+from django.contrib import admin as site_admin
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Permission
+from django.core.management import call_command
+from django.db.models import F
+from django.test import RequestFactory, TestCase, override_settings
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import AccessToken
+from apps.accounts.models import Organization
+from apps.analytics.models import SalesMetric, SalesRollup
+from apps.analytics.tasks import backfill_daily_metrics, rebuild_sales_rollups
+from apps.core.ids import uuid7, uuid7_time
+from apps.core.backends.postgresql.base import connection_stats, record_connection
+from apps.core.routing import ReplicaRouter, replica_reads
+from config.database import INSTRUMENTED_POSTGRES_ENGINE, database_config
+from apps.core.tenancy import TenantScope, get_tenant_scope
+from apps.inventory.models import Product, Stock, Warehouse
+from apps.sales.models import Customer, Order, OrderItem
+
+User = get_user_model()
+
+
+class TenantScopeTests(TestCase):
+    """Test the shared tenant-scoping query layer"""
+
+    def setUp(self):
+        self.org = Organization.objects.create(name='Acme', slug='acme')
+        other_org = Organization.objects.create(name='Other', slug='other')
+        self.main = Warehouse.objects.create(name='Main', location='Padova', organization=self.org)
+        self.annex = Warehouse.objects.create(name='Annex', location='Vicenza', organization=self.org)
+        self.foreign = foreign = Warehouse.objects.create(name='Foreign', location='Lyon', organization=other_org)
+
+        self.manager = User.objects.create_user(
+            username='manager', password='pass', email='manager@test.com', organization=self.org
+        )
+        self.clerk = User.objects.create_user(
+            username='clerk', password='pass', email='clerk@test.com',
+            organization=self.org, assigned_warehouse=self.main
+        )
+        outsider = User.objects.create_user(
+            username='outsider', password='pass', email='outsider@test.com', organization=other_org
+        )
+
+        self.product = Product.objects.create(
+            name='Wine', sku='WINE-001', cost_price='10.00', selling_price='20.00', created_by=self.manager
+        )
+        Product.objects.create(
+            name='Beer', sku='BEER-001', cost_price='1.00', selling_price='2.00', created_by=outsider
+        )
+        for warehouse in (self.main, self.annex, foreign):
+            Stock.objects.create(product=self.product, warehouse=warehouse, quantity=5)
+        customer = Customer.objects.create(name='Customer', organization=self.org)
+        for warehouse in (self.main, foreign):
+            order = Order.objects.create(customer=customer, warehouse=warehouse)
+            OrderItem.objects.create(order=order, product=self.product, quantity=1, price='20.00')
+
+    def test_scopes_resolved_from_models(self):
+        self.assertEqual(get_tenant_scope(Product), TenantScope('organization_id'))
+        self.assertEqual(get_tenant_scope(Customer), TenantScope('organization_id'))
+        self.assertEqual(get_tenant_scope(Stock), TenantScope('organization_id', 'warehouse_id'))
+        self.assertEqual(get_tenant_scope(OrderItem), TenantScope('organization_id', 'order__warehouse_id'))
+        self.assertEqual(get_tenant_scope(Warehouse), TenantScope('organization_id', 'id'))
+        self.assertEqual(get_tenant_scope(Organization), TenantScope('id'))
+
+    def test_organization_filled_on_write(self):
+        self.assertEqual(self.product.organization, self.org)
+        self.assertEqual(
+            set(Stock.objects.values_list('warehouse__organization', 'organization').distinct()),
+            {(self.org.id, self.org.id), (self.foreign.organization_id, self.foreign.organization_id)}
+        )
+        self.assertFalse(OrderItem.objects.exclude(organization=F('order__warehouse__organization')).exists())
+        self.assertEqual(Customer.objects.create(name='Walk-in', created_by=self.manager).organization, self.org)
+
+        # Scoping an order item no longer joins through orders and warehouses
+        self.assertNotIn('JOIN', str(OrderItem.objects.for_organization(self.org.id).query))
+
+    def test_for_tenant(self):
+        self.assertEqual(list(Product.objects.for_tenant(self.manager)), [self.product])
+        self.assertEqual(Stock.objects.for_tenant(self.manager).count(), 2)
+        self.assertEqual(OrderItem.objects.for_tenant(self.manager).count(), 1)
+        self.assertEqual(User.objects.for_tenant(self.manager).count(), 2)
+
+        # Warehouse staff are only narrowed when asked, and only on warehouse-owned models
+        self.assertEqual(Stock.objects.for_tenant(self.clerk).count(), 2)
+        self.assertEqual(list(Stock.objects.for_tenant(self.clerk, by_warehouse=True)), [self.main.stocks.get()])
+        self.assertEqual(list(Warehouse.objects.for_tenant(self.clerk, by_warehouse=True)), [self.main])
+        self.assertEqual(Product.objects.for_tenant(self.clerk, by_warehouse=True).count(), 1)
+
+        loner = User.objects.create_user(username='loner', password='pass', email='loner@test.com')
+        self.assertFalse(Product.objects.for_tenant(loner).exists())
+
+    def test_admin_and_api_share_scope(self):
+        self.manager.is_staff = True
+        self.manager.role = 'manager'
+        self.manager.save()
+        self.manager.user_permissions.add(Permission.objects.get(codename='view_warehouse'))
+
+        self.client.force_login(self.manager)
+        response = self.client.get('/admin/inventory/warehouse/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.context['cl'].queryset), {self.main, self.annex})
+
+        response = self.client.get('/api/warehouses/')
+        self.assertEqual({w['name'] for w in response.json()['results']}, {'Main', 'Annex'})
+
+    def test_api_created_customers_stay_visible(self):
+        self.manager.role = 'manager'
+        self.manager.save()
+        self.client.force_login(self.manager)
+        response = self.client.post('/api/customers/', {'name': 'Walk-in'}, content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Customer.objects.get(name='Walk-in').organization, self.org)
+
+        response = self.client.get('/api/customers/')
+        self.assertIn('Walk-in', {c['name'] for c in response.json()['results']})
+
+    def test_admin_create_keeps_denormalized_organization(self):
+        # A superuser of Acme creating stock in another organization's warehouse
+        admin_user = User.objects.create_superuser(
+            username='root', password='pass', email='root@test.com', organization=self.org
+        )
+        request = RequestFactory().post('/admin/inventory/stock/add/')
+        request.user = admin_user
+        beer = Product.objects.get(sku='BEER-001')
+        stock = Stock(product=beer, warehouse=self.foreign, quantity=1)
+        site_admin.site._registry[Stock].save_model(request, stock, None, False)
+        self.assertEqual(stock.organization_id, self.foreign.organization_id)
+
+
+@override_settings(REPLICA_DATABASES=['replica'])
+class ReplicaRoutingTests(TestCase):
+    """Test read-replica routing against a second local database"""
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        self.org = Organization.objects.create(name='Acme', slug='acme')
+
+    def test_reads_in_block_go_to_replica_until_write(self):
+        self.assertTrue(Organization.objects.filter(slug='acme').exists())
+        with replica_reads():
+            self.assertFalse(Organization.objects.filter(slug='acme').exists())
+            Organization.objects.create(name='Other', slug='other')
+            # Read-your-writes
+            self.assertTrue(Organization.objects.filter(slug='acme').exists())
+        self.assertFalse(ReplicaRouter().allow_migrate('replica', 'accounts'))
+
+    def test_writes_pin_client_to_primary(self):
+        SalesMetric.objects.create(date='2026-01-01', metric_type='daily', total_sales='10.00', total_orders=1)
+        manager = User.objects.create_user(
+            username='manager', password='pass', email='manager@test.com', role='manager', organization=self.org
+        )
+        self.client.defaults['HTTP_AUTHORIZATION'] = f'Bearer {AccessToken.for_user(manager)}'
+
+        # Analytics reads opt in to the replica, which is empty here
+        self.assertEqual(self.client.get('/api/metrics/').json()['count'], 0)
+
+        response = self.client.post('/api/warehouses/', {'name': 'Main', 'location': 'Padova'})
+        self.assertEqual(response.status_code, 201)
+        self.assertIn('db_pin', response.cookies)
+        self.assertEqual(self.client.get('/api/metrics/').json()['count'], 1)
+
+        # Token clients without cookies are pinned by user
+        self.client.cookies.clear()
+        self.assertEqual(self.client.get('/api/metrics/').json()['count'], 1)
+
+    def test_reconciliation_reads_primary(self):
+        warehouse = Warehouse.objects.create(name='Main', location='Padova', organization=self.org)
+        product = Product.objects.create(name='Wine', sku='WINE-001', cost_price='10.00', selling_price='20.00')
+        customer = Customer.objects.create(name='Customer', organization=self.org)
+        order = Order.objects.create(customer=customer, warehouse=warehouse, status='confirmed')
+        OrderItem.objects.create(order=order, product=product, quantity=3, price='20.00')
+        today = timezone.localdate(order.created_at).isoformat()
+
+        # The replica is empty here, so anything read from it would be lost
+        rebuild_sales_rollups(today, today)
+        backfill_daily_metrics(today, today)
+        self.assertEqual(SalesRollup.objects.get().quantity, 3)
+        self.assertEqual(SalesMetric.objects.get(metric_type='daily').total_orders, 1)
+
+
+class DatabaseConfigTests(TestCase):
+    """Test connection reuse, pooling settings and connection metrics"""
+
+    postgres = {'ENGINE': 'django.db.backends.postgresql', 'NAME': 'erp', 'OPTIONS': {}}
+
+    def test_persistent_connections(self):
+        config = database_config(dict(self.postgres), environ={})
+        self.assertEqual(config['ENGINE'], INSTRUMENTED_POSTGRES_ENGINE)
+        self.assertEqual((config['CONN_MAX_AGE'], config['CONN_HEALTH_CHECKS']), (60, True))
+        self.assertNotIn('pool', config['OPTIONS'])
+
+        config = database_config({'ENGINE': 'django.db.backends.sqlite3'}, environ={'DB_CONN_MAX_AGE': '0'})
+        self.assertEqual((config['ENGINE'], config['CONN_MAX_AGE']), ('django.db.backends.sqlite3', 0))
+
+    def test_pooled_connections(self):
+        config = database_config(dict(self.postgres, OPTIONS={}), environ={'DB_POOL_SIZE': '8'})
+        self.assertEqual(config['OPTIONS']['pool']['max_size'], 8)
+        self.assertEqual(config['CONN_MAX_AGE'], 0)
+
+    def test_connection_metrics(self):
+        record_connection('metrics-test', 0.004)
+        with self.assertLogs('apps.core.backends.postgresql.base', 'WARNING'):
+            record_connection('metrics-test', 0.5)
+        stats = connection_stats()['metrics-test']
+        self.assertEqual(stats['connections'], 2)
+        self.assertAlmostEqual(stats['max_wait_ms'], 500)
+        self.assertAlmostEqual(stats['avg_wait_ms'], 252)
+
+        admin = User.objects.create_superuser(username='root', password='pass', email='root@test.com')
+        self.client.force_login(admin)
+        response = self.client.get('/api/health/database/')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()['default']['health_checks'])
+
+
+class TimeOrderedIdTests(TestCase):
+    """Test uuid7 primary keys"""
+
+    def test_uuid7_layout(self):
+        before = time.time()
+        value = uuid7()
+        self.assertEqual(value.version, 7)
+        self.assertEqual(value.variant, uuid.RFC_4122)
+        self.assertAlmostEqual(uuid7_time(value), before, delta=1)
+
+    def test_uuid7_strictly_increasing(self):
+        values = [uuid7() for _ in range(10000)]
+        self.assertEqual(values, sorted(values))
+        self.assertEqual(len(set(values)), len(values))
+
+    def test_models_use_time_ordered_ids(self):
+        org = Organization.objects.create(name='Acme', slug='acme')
+        first = Warehouse.objects.create(name='Main', location='Padova', organization=org)
+        second = Warehouse.objects.create(name='Annex', location='Vicenza', organization=org)
+        self.assertEqual(first.pk.version, 7)
+        self.assertLess(first.pk, second.pk)
+        self.assertEqual(list(Warehouse.objects.order_by('id')), [first, second])
+
+    def test_benchmark_command(self):
+        out = StringIO()
+        call_command('benchmark_uuid_keys', '--rows', '2000', '--batch-size', '500', stdout=out)
+        self.assertIn('uuid4:', out.getvalue())
+        self.assertIn('uuid7:', out.getvalue())
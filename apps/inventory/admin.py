@@ -121,7 +121,8 @@ from django.contrib import admin
 from django.urls import path
 from django.utils.html import format_html
 from apps.core.admin import OrganizationFilterMixin
-from .models import Warehouse, Product, Stock
+from .models import Warehouse, Product, Stock, StockAlert
+from .alerts import acknowledge_alerts
 
 
 # @admin.register(Warehouse)
@@ -248,22 +249,6 @@ class ProductAdmin(OrganizationFilterMixin, admin.ModelAdmin):
         
         return fieldsets
 
-    def get_queryset(self, request):
-        """
-        Products are organization-wide, not warehouse-specific
-        """
-        qs = super().get_queryset(request)
-        
-        # Superuser sees all
-        if request.user.is_superuser:
-            return qs
-        
-        # All users in organization see all organization products
-        if hasattr(request.user, 'organization') and request.user.organization:
-            return qs.filter(created_by__organization=request.user.organization)
-        
-        return qs.none()
-    
     def get_urls(self):
         """Add bulk upload URL"""
         urls = super().get_urls()
@@ -318,12 +303,13 @@ class StockAdmin(OrganizationFilterMixin, admin.ModelAdmin):
         'warehouse_name', 
         'quantity_display', 
         'reorder_level',
+        'recommended_reorder_level',
         'stock_status_badge',
         'last_updated'
     ]
     list_filter = ['warehouse', 'product__category', StockLevelFilter]
     search_fields = ['product__name', 'product__sku', 'warehouse__name']
-    readonly_fields = ['stock_status_badge', 'last_updated']
+    readonly_fields = ['stock_status_badge', 'last_updated', 'safety_stock', 'recommended_reorder_level']
     
     # IMPORTANT: Allow filtering by warehouse
     autocomplete_fields = ['product']
@@ -332,32 +318,15 @@ class StockAdmin(OrganizationFilterMixin, admin.ModelAdmin):
         ('Stock Information', {
             'fields': ('product', 'warehouse', 'quantity', 'reorder_level')
         }),
+        ('Replenishment', {
+            'fields': ('lead_time_days', 'safety_stock', 'recommended_reorder_level')
+        }),
         ('Status', {
             'fields': ('stock_status_badge', 'last_updated'),
             'classes': ('collapse',)
         }),
     )
     
-    def get_queryset(self, request):
-        """
-        Override to ensure warehouse staff see their warehouse's stock
-        """
-        qs = super().get_queryset(request)
-        
-        # Superuser sees all
-        if request.user.is_superuser:
-            return qs
-        
-        # User with assigned warehouse - see only that warehouse's stock
-        if hasattr(request.user, 'assigned_warehouse') and request.user.assigned_warehouse:
-            return qs.filter(warehouse=request.user.assigned_warehouse)
-        
-        # User with organization but no warehouse - see all org's stock
-        if hasattr(request.user, 'organization') and request.user.organization:
-            return qs.filter(warehouse__organization=request.user.organization)
-        
-        return qs.none()
-    
     def product_name(self, obj):
         return obj.product.name
     product_name.short_description = 'Product'
@@ -419,13 +388,13 @@ class StockAdmin(OrganizationFilterMixin, admin.ModelAdmin):
     
     def bulk_increase_stock(self, request, queryset):
         """Increase stock by 10 units"""
-        updated = queryset.update(quantity=F('quantity') + 10)
+        updated = queryset.adjust(10, request.user)
         self.message_user(request, f'{updated} stock records increased by 10 units.')
     bulk_increase_stock.short_description = 'Increase stock by 10 units'
     
     def bulk_decrease_stock(self, request, queryset):
         """Decrease stock by 10 units"""
-        updated = queryset.filter(quantity__gte=10).update(quantity=F('quantity') - 10)
+        updated = queryset.adjust(-10, request.user)
         self.message_user(request, f'{updated} stock records decreased by 10 units.')
     bulk_decrease_stock.short_description = 'Decrease stock by 10 units'
     
@@ -435,6 +404,28 @@ class StockAdmin(OrganizationFilterMixin, admin.ModelAdmin):
         self.message_user(request, f'{count} items marked for reorder.')
     mark_for_reorder.short_description = 'Mark for reorder'
 
+
+@admin.register(StockAlert)
+class StockAlertAdmin(OrganizationFilterMixin, admin.ModelAdmin):
+    list_display = ['stock', 'warehouse', 'status', 'quantity', 'reorder_level', 'opened_at', 'resolved_at']
+    list_filter = ['status', 'warehouse']
+    search_fields = ['stock__product__name', 'stock__product__sku', 'warehouse__name']
+    list_select_related = ['stock__product', 'stock__warehouse', 'warehouse']
+    readonly_fields = [
+        'stock', 'warehouse', 'organization', 'status', 'quantity', 'reorder_level',
+        'opened_at', 'acknowledged_at', 'acknowledged_by', 'resolved_at'
+    ]
+    actions = ['acknowledge']
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def acknowledge(self, request, queryset):
+        """Acknowledge open alerts so they stop showing as new"""
+        updated = acknowledge_alerts(queryset, request.user)
+        self.message_user(request, f'{updated} alerts acknowledged.')
+    acknowledge.short_description = 'Acknowledge selected alerts'
+
 # @admin.register(Stock)
 # class StockAdmin(OrganizationFilterMixin, admin.ModelAdmin):
 #     list_display = [
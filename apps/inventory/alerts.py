@@ -0,0 +1,173 @@
+# apps/inventory/alerts.py
+"""
+Stateful low-stock alerting.
+
+Each stock row has at most one StockAlert whose status moves
+open -> acknowledged -> resolved (and back to open if stock drops again).
+A run only looks at stock rows changed since the previous run, and only
+status transitions are notified, batched into one digest per
+organization and warehouse.
+"""
+
+import logging
+from collections import defaultdict
+from datetime import timedelta
+
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from apps.core.models import Checkpoint
+from .models import Stock, StockAlert, Warehouse
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_NAME = 'low_stock_alerts'
+
+# Re-read rows changed just before the previous run's cutoff, in case their
+# transaction committed after it; evaluation is idempotent
+CHECKPOINT_LAG = timedelta(seconds=5)
+
+CHUNK_SIZE = 2000
+
+STOCK_FIELDS = ('id', 'quantity', 'reorder_level', 'warehouse_id', 'warehouse__organization_id')
+
+
+def _changed_stock(checkpoint):
+    if checkpoint is None:
+        # First run: only low rows can open alerts, read via the partial index
+        return Stock.objects.filter(quantity__lte=F('reorder_level'))
+    return Stock.objects.filter(updated_at__gte=checkpoint.position - CHECKPOINT_LAG)
+
+
+def _evaluate_chunk(rows, now):
+    """Apply transitions for one chunk of stock rows; returns (opened, resolved) alerts"""
+    alerts = {alert.stock_id: alert for alert in StockAlert.objects.filter(stock_id__in=[r[0] for r in rows])}
+    created, updated, opened, resolved = [], [], [], []
+
+    for stock_id, quantity, reorder_level, warehouse_id, organization_id in rows:
+        alert = alerts.get(stock_id)
+        low = quantity <= reorder_level
+
+        if low and alert is None:
+            created.append(StockAlert(
+                stock_id=stock_id, warehouse_id=warehouse_id, organization_id=organization_id,
+                status='open', quantity=quantity, reorder_level=reorder_level, opened_at=now,
+            ))
+            opened.append(created[-1])
+            continue
+
+        if low and alert.status == 'resolved':
+            alert.status = 'open'
+            alert.opened_at = now
+            alert.acknowledged_at = alert.acknowledged_by = alert.resolved_at = None
+            opened.append(alert)
+        elif not low and alert is not None and alert.status != 'resolved':
+            alert.status = 'resolved'
+            alert.resolved_at = now
+            resolved.append(alert)
+        else:
+            continue
+
+        alert.quantity = quantity
+        alert.reorder_level = reorder_level
+        alert.warehouse_id = warehouse_id
+        alert.organization_id = organization_id
+        # bulk_update() does not apply auto_now
+        alert.updated_at = now
+        updated.append(alert)
+
+    if created:
+        StockAlert.objects.bulk_create(created)
+    if updated:
+        StockAlert.objects.bulk_update(updated, [
+            'status', 'quantity', 'reorder_level', 'warehouse', 'organization', 'opened_at',
+            'acknowledged_at', 'acknowledged_by', 'resolved_at', 'updated_at',
+        ])
+    return opened, resolved
+
+
+def send_digests(opened, resolved):
+    """
+    One digest per (organization, warehouse) with every transition in it,
+    mailed to the organization's contact email. Returns the number of digests.
+    """
+    from apps.accounts.models import Organization
+
+    digests = defaultdict(lambda: {'opened': [], 'resolved': []})
+    for kind, alerts in (('opened', opened), ('resolved', resolved)):
+        for alert in alerts:
+            digests[(alert.organization_id, alert.warehouse_id)][kind].append(alert.stock_id)
+    if not digests:
+        return 0
+
+    organizations = Organization.objects.in_bulk({org_id for org_id, _ in digests if org_id})
+    warehouses = Warehouse.objects.in_bulk({warehouse_id for _, warehouse_id in digests})
+    labels = dict(
+        Stock.objects.filter(id__in=[a.stock_id for a in opened + resolved])
+        .values_list('id', 'product__sku')
+    )
+
+    messages = []
+    for (organization_id, warehouse_id), digest in digests.items():
+        warehouse = warehouses.get(warehouse_id)
+        organization = organizations.get(organization_id)
+        logger.info(
+            "Stock alerts for %s: %d opened, %d resolved",
+            warehouse, len(digest['opened']), len(digest['resolved'])
+        )
+        if not organization or not organization.contact_email:
+            continue
+
+        lines = [f"Low stock at {warehouse.name if warehouse else 'unknown warehouse'}", ""]
+        if digest['opened']:
+            lines.append("Now low:")
+            lines.extend(f"  - {labels.get(stock_id, stock_id)}" for stock_id in digest['opened'])
+        if digest['resolved']:
+            lines.append("Back in stock:")
+            lines.extend(f"  - {labels.get(stock_id, stock_id)}" for stock_id in digest['resolved'])
+        messages.append(EmailMessage(
+            subject=f"Stock alerts: {len(digest['opened'])} low, {len(digest['resolved'])} resolved",
+            body="\n".join(lines),
+            to=[organization.contact_email],
+        ))
+
+    if messages:
+        get_connection(fail_silently=True).send_messages(messages)
+    return len(digests)
+
+
+def acknowledge_alerts(queryset, user):
+    """Acknowledge the open alerts in queryset; returns the number changed"""
+    now = timezone.now()
+    return queryset.filter(status='open').update(
+        status='acknowledged', acknowledged_at=now, acknowledged_by=user, updated_at=now
+    )
+
+
+def evaluate_stock_alerts():
+    """
+    Evaluate stock rows changed since the last run, record transitions and
+    send digests. Returns (opened, resolved, digests) counts.
+    """
+    now = timezone.now()
+    checkpoint = Checkpoint.objects.filter(name=CHECKPOINT_NAME).first()
+
+    rows = list(_changed_stock(checkpoint).values_list(*STOCK_FIELDS).order_by())
+
+    opened, resolved = [], []
+    for i in range(0, len(rows), CHUNK_SIZE):
+        with transaction.atomic():
+            chunk_opened, chunk_resolved = _evaluate_chunk(rows[i:i + CHUNK_SIZE], now)
+        opened += chunk_opened
+        resolved += chunk_resolved
+
+    # A run that fails part-way leaves the checkpoint alone and is simply repeated
+    if checkpoint is None:
+        Checkpoint.objects.create(name=CHECKPOINT_NAME, position=now)
+    else:
+        Checkpoint.objects.filter(pk=checkpoint.pk).update(position=now, updated_at=now)
+
+    digests = send_digests(opened, resolved)
+    return len(opened), len(resolved), digests
@@ -0,0 +1,200 @@
+# apps/inventory/importers.py
+"""
+Dry-run validation for the CSV bulk importers.
+
+The file is read once into columns and every check runs over whole columns,
+with database lookups done once per batch of distinct keys instead of once
+per row. Nothing is written; the result is the full list of errors.
+"""
+
+import csv
+import io
+from decimal import Decimal, InvalidOperation
+
+from django.http import HttpResponse
+
+from .models import Product, Warehouse
+
+# Keep IN (...) lists under the SQLite host-parameter limit
+LOOKUP_BATCH_SIZE = 5000
+
+PRODUCT_COLUMNS = ['name', 'sku', 'category', 'cost_price', 'selling_price', 'description']
+STOCK_COLUMNS = ['sku', 'warehouse', 'quantity', 'reorder_level']
+
+# Largest value that fits DecimalField(max_digits=10, decimal_places=2)
+MAX_PRICE = Decimal('99999999.99')
+
+
+def read_csv_columns(csv_file, columns):
+    """
+    Read an uploaded CSV into {column: [stripped values]}.
+    Missing columns come back as empty strings so checks stay columnar.
+    """
+    decoded_file = csv_file.read().decode('utf-8')
+    reader = csv.DictReader(io.StringIO(decoded_file))
+    rows = [[(row.get(col) or '').strip() for col in columns] for row in reader]
+
+    if not rows:
+        return {col: [] for col in columns}, 0
+
+    return {col: list(values) for col, values in zip(columns, zip(*rows))}, len(rows)
+
+
+def _error(index, column, value, message):
+    # Row numbers match the spreadsheet: header is row 1
+    return {'row': index + 2, 'column': column, 'value': value, 'error': message}
+
+
+def _parse_decimals(values, column, errors, default='0'):
+    parsed = []
+    for i, raw in enumerate(values):
+        try:
+            value = Decimal(raw or default)
+            if not value.is_finite():
+                raise InvalidOperation
+        except InvalidOperation:
+            errors.append(_error(i, column, raw, 'Invalid price format'))
+            parsed.append(None)
+            continue
+
+        if abs(value) > MAX_PRICE or value.as_tuple().exponent < -2:
+            errors.append(_error(i, column, raw, 'Price must have at most 8 digits and 2 decimal places'))
+            parsed.append(None)
+            continue
+
+        parsed.append(value)
+    return parsed
+
+
+def _parse_ints(values, column, errors, default):
+    parsed = []
+    for i, raw in enumerate(values):
+        try:
+            parsed.append(int(raw or default))
+        except ValueError:
+            errors.append(_error(i, column, raw, 'Invalid quantity format'))
+            parsed.append(None)
+    return parsed
+
+
+def _check_required(columns, required, errors):
+    for column in required:
+        for i, value in enumerate(columns[column]):
+            if not value:
+                errors.append(_error(i, column, value, f'Missing {column}'))
+
+
+def _check_max_length(columns, model, names, errors):
+    for column in names:
+        max_length = model._meta.get_field(column).max_length
+        for i, value in enumerate(columns[column]):
+            if len(value) > max_length:
+                errors.append(_error(i, column, value, f'Longer than {max_length} characters'))
+
+
+def _check_duplicates(keys, column, values, errors, label):
+    first_seen = {}
+    for i, key in enumerate(keys):
+        if key is None:
+            continue
+        if key in first_seen:
+            errors.append(_error(i, column, values[i], f'Duplicate {label} (first seen on row {first_seen[key] + 2})'))
+        else:
+            first_seen[key] = i
+
+
+def _existing_skus(skus):
+    """Return the subset of skus that exist, one query per batch"""
+    skus = sorted(skus)
+    found = set()
+    for start in range(0, len(skus), LOOKUP_BATCH_SIZE):
+        batch = skus[start:start + LOOKUP_BATCH_SIZE]
+        found.update(Product.objects.filter(sku__in=batch).values_list('sku', flat=True))
+    return found
+
+
+def _resolve_warehouses(names):
+    """
+    Match each distinct warehouse name the way the importer does
+    (case-insensitive partial match) against a single warehouse query.
+    Returns {name: match count}.
+    """
+    all_names = [n.lower() for n in Warehouse.objects.values_list('name', flat=True)]
+    return {
+        name: sum(1 for candidate in all_names if name.lower() in candidate)
+        for name in names
+    }
+
+
+def validate_product_rows(columns):
+    """Run every product import check over the parsed columns"""
+    errors = []
+
+    _check_required(columns, ['name', 'sku'], errors)
+    _check_max_length(columns, Product, ['name', 'sku', 'category'], errors)
+
+    cost = _parse_decimals(columns['cost_price'], 'cost_price', errors)
+    selling = _parse_decimals(columns['selling_price'], 'selling_price', errors)
+
+    # Same rules as Product.clean
+    for i, (sku, cost_price, selling_price) in enumerate(zip(columns['sku'], cost, selling)):
+        if sku and len(sku) < 2:
+            errors.append(_error(i, 'sku', sku, 'SKU must be at least 2 characters'))
+        if cost_price is not None and cost_price < 0:
+            errors.append(_error(i, 'cost_price', columns['cost_price'][i], 'Cost price cannot be negative'))
+        if selling_price is not None and selling_price < 0:
+            errors.append(_error(i, 'selling_price', columns['selling_price'][i], 'Selling price cannot be negative'))
+        if cost_price and selling_price and selling_price < cost_price:
+            errors.append(_error(
+                i, 'selling_price', columns['selling_price'][i],
+                'Selling price should not be less than cost price'
+            ))
+
+    skus = columns['sku']
+    _check_duplicates([sku or None for sku in skus], 'sku', skus, errors, 'SKU')
+
+    errors.sort(key=lambda e: e['row'])
+    return errors
+
+
+def validate_stock_rows(columns):
+    """Run every stock import check over the parsed columns"""
+    errors = []
+
+    _check_required(columns, ['sku', 'warehouse'], errors)
+    _parse_ints(columns['quantity'], 'quantity', errors, default='0')
+    _parse_ints(columns['reorder_level'], 'reorder_level', errors, default='10')
+
+    skus = columns['sku']
+    warehouses = columns['warehouse']
+
+    existing = _existing_skus({sku for sku in skus if sku})
+    for i, sku in enumerate(skus):
+        if sku and sku not in existing:
+            errors.append(_error(i, 'sku', sku, f'Product with SKU {sku} not found'))
+
+    matches = _resolve_warehouses({name for name in warehouses if name})
+    for i, name in enumerate(warehouses):
+        if not name:
+            continue
+        if matches[name] == 0:
+            errors.append(_error(i, 'warehouse', name, f'Warehouse {name} not found'))
+        elif matches[name] > 1:
+            errors.append(_error(i, 'warehouse', name, f'Warehouse {name} matches {matches[name]} warehouses'))
+
+    pairs = [(sku, name.lower()) if sku and name else None for sku, name in zip(skus, warehouses)]
+    _check_duplicates(pairs, 'sku', skus, errors, 'SKU and warehouse')
+
+    errors.sort(key=lambda e: e['row'])
+    return errors
+
+
+def error_report_response(errors, basename):
+    """Return all validation errors as a downloadable CSV"""
+    response = HttpResponse(content_type='text/csv')
+    response['Content-Disposition'] = f'attachment; filename="{basename}_import_errors.csv"'
+
+    writer = csv.DictWriter(response, fieldnames=['row', 'column', 'value', 'error'])
+    writer.writeheader()
+    writer.writerows(errors)
+    return response
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.8
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0004_stockalert'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='stock',
+            name='lead_time_days',
+            field=models.PositiveSmallIntegerField(blank=True, help_text='Replenishment lead time; defaults to REORDER_LEAD_TIME_DAYS', null=True),
+        ),
+        migrations.AddField(
+            model_name='stock',
+            name='recommended_reorder_level',
+            field=models.PositiveIntegerField(blank=True, help_text='Reorder point recommended from recent demand', null=True),
+        ),
+        migrations.AddField(
+            model_name='stock',
+            name='safety_stock',
+            field=models.PositiveIntegerField(blank=True, help_text='Recommended safety stock', null=True),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.8
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_organization(apps, schema_editor):
+    User = apps.get_model('accounts', 'User')
+    Warehouse = apps.get_model('inventory', 'Warehouse')
+    Product = apps.get_model('inventory', 'Product')
+    Stock = apps.get_model('inventory', 'Stock')
+
+    Product.objects.filter(organization__isnull=True, created_by__isnull=False).update(
+        organization=Subquery(User.objects.filter(pk=OuterRef('created_by')).values('organization')[:1])
+    )
+    Stock.objects.filter(organization__isnull=True).update(
+        organization=Subquery(Warehouse.objects.filter(pk=OuterRef('warehouse')).values('organization')[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_user_assigned_warehouse'),
+        ('inventory', '0005_stock_reorder_recommendations'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='organization',
+            field=models.ForeignKey(blank=True, help_text="Copied from the creating user's organization", null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='accounts.organization'),
+        ),
+        migrations.AddField(
+            model_name='stock',
+            name='organization',
+            field=models.ForeignKey(blank=True, help_text='Copied from the warehouse', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='accounts.organization'),
+        ),
+        migrations.RunPython(backfill_organization, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['organization', 'sku'], name='products_organiz_bbcc44_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['organization', 'created_at'], name='products_organiz_d506c9_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='stock',
+            index=models.Index(fields=['organization', 'created_at'], name='stocks_organiz_056642_idx'),
+        ),
+    ]
@@ -1,5 +1,5 @@
 from django.db import models
-from apps.core.models import TrackableModel
+from apps.core.models import BaseModel, TrackableModel
 
 
 # class Warehouse(TrackableModel):
@@ -72,6 +72,7 @@ from apps.core.models import TrackableModel
 
 from django.db import models
 from apps.core.models import TrackableModel
+from apps.core.tenancy import TenantQuerySet, TenantScope
 
 class Warehouse(TrackableModel):
     """Warehouse/storage location"""
@@ -87,6 +88,9 @@ class Warehouse(TrackableModel):
         help_text="Organization that owns this warehouse"
     )
     
+    objects = TenantQuerySet.as_manager()
+    tenant_scope = TenantScope('organization_id', 'id')
+    
     class Meta:
         db_table = "warehouses"
         ordering = ['name']
@@ -110,6 +114,17 @@ class Product(TrackableModel):
     selling_price = models.DecimalField(max_digits=10, decimal_places=2)
     description = models.TextField(null=True, blank=True)
     is_active = models.BooleanField(default=True)
+    organization = models.ForeignKey(
+        'accounts.Organization',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='+',
+        help_text="Copied from the creating user's organization"
+    )
+    
+    objects = TenantQuerySet.as_manager()
+    organization_source = 'created_by'
     
     def clean(self):
         """Validate product data"""
@@ -135,18 +150,55 @@ class Product(TrackableModel):
             models.Index(fields=['sku']),
             models.Index(fields=['category', 'is_active']),
             models.Index(fields=['created_by']),
+            models.Index(fields=['updated_at', 'id']),
+            models.Index(fields=['organization', 'sku']),
+            models.Index(fields=['organization', 'created_at']),
         ]
         
     def __str__(self):
         return f"{self.name} ({self.sku})"
 
 
+class StockQuerySet(TenantQuerySet):
+    
+    def adjust(self, delta, user=None):
+        """
+        Add delta to quantity in a single conditional UPDATE.
+        Rows that would go negative are left untouched.
+        Returns the number of rows changed.
+        """
+        from django.utils import timezone
+        
+        updates = {'quantity': models.F('quantity') + delta, 'updated_at': timezone.now()}
+        if user is not None:
+            updates['updated_by'] = user
+        return self.filter(quantity__gte=-delta).update(**updates)
+
+
 class Stock(TrackableModel):
     """Stock levels per warehouse"""
     product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="stocks")
     warehouse = models.ForeignKey(Warehouse, on_delete=models.CASCADE, related_name="stocks")
     quantity = models.IntegerField(default=0)
     reorder_level = models.IntegerField(default=10)
+    lead_time_days = models.PositiveSmallIntegerField(
+        null=True, blank=True, help_text="Replenishment lead time; defaults to REORDER_LEAD_TIME_DAYS"
+    )
+    safety_stock = models.PositiveIntegerField(null=True, blank=True, help_text="Recommended safety stock")
+    recommended_reorder_level = models.PositiveIntegerField(
+        null=True, blank=True, help_text="Reorder point recommended from recent demand"
+    )
+    organization = models.ForeignKey(
+        'accounts.Organization',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='+',
+        help_text="Copied from the warehouse"
+    )
+    
+    objects = StockQuerySet.as_manager()
+    organization_source = 'warehouse'
     
     class Meta:
         db_table = "stocks"
@@ -154,6 +206,14 @@ class Stock(TrackableModel):
         indexes = [
             models.Index(fields=['warehouse', 'product']),
             models.Index(fields=['quantity']),
+            models.Index(fields=['updated_at', 'id']),
+            models.Index(fields=['organization', 'created_at']),
+            # Partial index: only rows at or below their reorder level
+            models.Index(
+                fields=['warehouse'],
+                condition=models.Q(quantity__lte=models.F('reorder_level')),
+                name='stocks_low_stock_idx',
+            ),
         ]
         
     def __str__(self):
@@ -168,3 +228,47 @@ class Stock(TrackableModel):
             return "low_stock"
         else:
             return "in_stock"
+
+
+class StockAlert(BaseModel):
+    """Low-stock alert state for one stock row"""
+    STATUS_CHOICES = [
+        ('open', 'Open'),
+        ('acknowledged', 'Acknowledged'),
+        ('resolved', 'Resolved'),
+    ]
+    
+    stock = models.OneToOneField(Stock, on_delete=models.CASCADE, related_name="alert")
+    warehouse = models.ForeignKey(Warehouse, on_delete=models.CASCADE, related_name="stock_alerts")
+    organization = models.ForeignKey(
+        'accounts.Organization',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='open')
+    quantity = models.IntegerField(help_text="Quantity when the status last changed")
+    reorder_level = models.IntegerField()
+    opened_at = models.DateTimeField()
+    acknowledged_at = models.DateTimeField(null=True, blank=True)
+    acknowledged_by = models.ForeignKey(
+        "accounts.User",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+"
+    )
+    resolved_at = models.DateTimeField(null=True, blank=True)
+    
+    objects = TenantQuerySet.as_manager()
+    
+    class Meta:
+        db_table = "stock_alerts"
+        ordering = ['-opened_at']
+        indexes = [
+            models.Index(fields=['organization', 'status']),
+        ]
+    
+    def __str__(self):
+        return f"{self.stock_id} {self.status}"
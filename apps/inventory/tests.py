@@ -1,3 +1,145 @@
+from datetime import timedelta
 from django.test import TestCase
+from django.core import mail
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from apps.accounts.models import Organization
+from apps.inventory.alerts import acknowledge_alerts, evaluate_stock_alerts
+from apps.inventory.models import Product, Stock, StockAlert, Warehouse
+from apps.inventory.importers import (
+    PRODUCT_COLUMNS, STOCK_COLUMNS, read_csv_columns,
+    validate_product_rows, validate_stock_rows
+)
 
-# Create your tests here.
+User = get_user_model()
+
+
+def _csv(content):
+    return SimpleUploadedFile('upload.csv', content.encode('utf-8'), content_type='text/csv')
+
+
+class ProductImportValidationTests(TestCase):
+    """Test dry-run validation of product CSVs"""
+
+    def test_reports_every_error(self):
+        """All bad rows are reported, not just the first few"""
+        columns, count = read_csv_columns(_csv(
+            "name,sku,category,cost_price,selling_price,description\n"
+            "Good,GOOD-1,Wine,10.00,20.00,\n"
+            ",NONAME,Wine,10.00,20.00,\n"
+            "Bad price,BAD-1,Wine,abc,20.00,\n"
+            "Negative,NEG-1,Wine,-1,20.00,\n"
+            "Cheap,CHEAP-1,Wine,30.00,20.00,\n"
+            "Dup,GOOD-1,Wine,10.00,20.00,\n"
+        ), PRODUCT_COLUMNS)
+        errors = validate_product_rows(columns)
+
+        self.assertEqual(count, 6)
+        self.assertEqual([e['row'] for e in errors], [3, 4, 5, 6, 7])
+        self.assertIn('Duplicate SKU', errors[-1]['error'])
+
+    def test_valid_file(self):
+        columns, _ = read_csv_columns(_csv(
+            "name,sku,category,cost_price,selling_price\n"
+            "Good,GOOD-1,Wine,10.00,20.00\n"
+        ), PRODUCT_COLUMNS)
+        self.assertEqual(validate_product_rows(columns), [])
+
+    def test_dry_run_view_writes_nothing(self):
+        admin = User.objects.create_superuser(
+            username='admin', password='adminpass', email='admin@test.com'
+        )
+        self.client.force_login(admin)
+
+        response = self.client.post('/admin/inventory/product/bulk-upload/', {
+            'csv_file': _csv("name,sku,cost_price,selling_price\nWine,W,abc,20\n"),
+            'dry_run': '1',
+        })
+
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertIn(b'Invalid price format', response.content)
+        self.assertFalse(Product.objects.exists())
+
+
+class StockImportValidationTests(TestCase):
+    """Test dry-run validation of stock CSVs"""
+
+    def setUp(self):
+        Warehouse.objects.create(name='Padova Central', location='Padova')
+        Warehouse.objects.create(name='Vicenza North', location='Vicenza')
+        Warehouse.objects.create(name='Vicenza South', location='Vicenza')
+        Product.objects.create(
+            name='Wine', sku='WINE-001', category='Wine',
+            cost_price='10.00', selling_price='20.00'
+        )
+
+    def test_resolves_products_and_warehouses(self):
+        columns, _ = read_csv_columns(_csv(
+            "sku,warehouse,quantity,reorder_level\n"
+            "WINE-001,padova,5,1\n"
+            "MISSING,Padova,5,1\n"
+            "WINE-001,Rome,5,1\n"
+            "WINE-001,Vicenza,5,1\n"
+            "WINE-001,Padova,x,1\n"
+        ), STOCK_COLUMNS)
+
+        with self.assertNumQueries(2):
+            errors = validate_stock_rows(columns)
+
+        messages = {e['row']: e['error'] for e in errors}
+        self.assertNotIn(2, messages)
+        self.assertIn('not found', messages[3])
+        self.assertIn('Rome not found', messages[4])
+        self.assertIn('matches 2 warehouses', messages[5])
+        self.assertIn('Invalid quantity', [e['error'] for e in errors if e['row'] == 6][0])
+
+
+class StockAlertTests(TestCase):
+    """Test stateful low-stock alerting"""
+    
+    def setUp(self):
+        self.organization = Organization.objects.create(
+            name='Acme', slug='acme', contact_email='ops@acme.test'
+        )
+        self.warehouse = Warehouse.objects.create(
+            name='Main', location='Padova', organization=self.organization
+        )
+        self.low = Stock.objects.create(
+            product=Product.objects.create(name='Wine', sku='WINE-001', cost_price='1', selling_price='2'),
+            warehouse=self.warehouse, quantity=5, reorder_level=10
+        )
+        self.ok = Stock.objects.create(
+            product=Product.objects.create(name='Beer', sku='BEER-001', cost_price='1', selling_price='2'),
+            warehouse=self.warehouse, quantity=50, reorder_level=10
+        )
+    
+    def test_only_transitions_are_notified(self):
+        self.assertEqual(evaluate_stock_alerts(), (1, 0, 1))
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn('WINE-001', mail.outbox[0].body)
+        
+        # Still low: no new alert, no new mail
+        self.assertEqual(evaluate_stock_alerts(), (0, 0, 0))
+        self.assertEqual(len(mail.outbox), 1)
+        
+        acknowledge_alerts(StockAlert.objects.all(), None)
+        self.low.quantity = 20
+        self.low.save()
+        self.ok.quantity = 3
+        self.ok.save()
+        
+        self.assertEqual(evaluate_stock_alerts(), (1, 1, 1))
+        self.assertEqual(len(mail.outbox), 2)
+        resolved = StockAlert.objects.get(stock=self.low)
+        self.assertEqual(resolved.status, 'resolved')
+        self.assertEqual(resolved.updated_at, resolved.resolved_at)
+        self.assertEqual(StockAlert.objects.get(stock=self.ok).status, 'open')
+    
+    def test_unchanged_stock_is_not_read(self):
+        evaluate_stock_alerts()
+        Stock.objects.update(updated_at=timezone.now() - timedelta(hours=1))
+        
+        # Checkpoint, changed stock (none), checkpoint update
+        with self.assertNumQueries(3):
+            self.assertEqual(evaluate_stock_alerts(), (0, 0, 0))
@@ -6,11 +6,31 @@ from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib import messages
 from django.db import transaction
 from .models import Product, Warehouse, Stock
+from .importers import (
+    PRODUCT_COLUMNS, STOCK_COLUMNS, read_csv_columns,
+    validate_product_rows, validate_stock_rows, error_report_response
+)
 import csv
 import io
 from decimal import Decimal
 
 
+def _dry_run(request, csv_file, columns, validate, basename, changelist):
+    """Validate an upload without writing; errors come back as a CSV download"""
+    try:
+        data, row_count = read_csv_columns(csv_file, columns)
+        errors = validate(data)
+    except Exception as e:
+        messages.error(request, f'Error processing CSV: {str(e)}')
+        return redirect(changelist)
+    
+    if errors:
+        return error_report_response(errors, basename)
+    
+    messages.success(request, f'✅ Dry run passed: {row_count} rows validated, no errors found. Nothing was saved.')
+    return redirect(changelist)
+
+
 @staff_member_required
 def bulk_upload_products(request):
     """Bulk upload products via CSV"""
@@ -26,6 +46,13 @@ def bulk_upload_products(request):
             messages.error(request, 'File must be a CSV file (.csv extension)')
             return redirect('admin:inventory_product_changelist')
         
+        # Dry run - validate the whole file, write nothing
+        if request.POST.get('dry_run'):
+            return _dry_run(
+                request, csv_file, PRODUCT_COLUMNS, validate_product_rows,
+                'products', 'admin:inventory_product_changelist'
+            )
+        
         try:
             # Read CSV file
             decoded_file = csv_file.read().decode('utf-8')
@@ -118,6 +145,12 @@ def bulk_upload_stock(request):
             messages.error(request, 'File must be a CSV file (.csv extension)')
             return redirect('admin:inventory_stock_changelist')
         
+        if request.POST.get('dry_run'):
+            return _dry_run(
+                request, csv_file, STOCK_COLUMNS, validate_stock_rows,
+                'stock', 'admin:inventory_stock_changelist'
+            )
+        
         try:
             decoded_file = csv_file.read().decode('utf-8')
             io_string = io.StringIO(decoded_file)
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.8
+
+from django.db import migrations
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_organization(apps, schema_editor):
+    """Customers are now scoped on their own organization, not their creator's"""
+    Customer = apps.get_model('sales', 'Customer')
+    User = apps.get_model('accounts', 'User')
+    Customer.objects.filter(organization__isnull=True, created_by__isnull=False).update(
+        organization=Subquery(User.objects.filter(pk=OuterRef('created_by_id')).values('organization_id')[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_user_assigned_warehouse'),
+        ('sales', '0002_updated_at_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_organization, migrations.RunPython.noop),
+    ]
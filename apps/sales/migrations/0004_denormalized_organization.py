@@ -0,0 +1,62 @@
+# Generated by Django 5.2.8
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_organization(apps, schema_editor):
+    User = apps.get_model('accounts', 'User')
+    Warehouse = apps.get_model('inventory', 'Warehouse')
+    Customer = apps.get_model('sales', 'Customer')
+    Order = apps.get_model('sales', 'Order')
+    OrderItem = apps.get_model('sales', 'OrderItem')
+
+    Customer.objects.filter(organization__isnull=True, created_by__isnull=False).update(
+        organization=Subquery(User.objects.filter(pk=OuterRef('created_by')).values('organization')[:1])
+    )
+    Order.objects.filter(organization__isnull=True, warehouse__isnull=False).update(
+        organization=Subquery(Warehouse.objects.filter(pk=OuterRef('warehouse')).values('organization')[:1])
+    )
+    OrderItem.objects.filter(organization__isnull=True).update(
+        organization=Subquery(Order.objects.filter(pk=OuterRef('order')).values('organization')[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_user_assigned_warehouse'),
+        ('inventory', '0006_denormalized_organization'),
+        ('sales', '0003_customer_organization'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='organization',
+            field=models.ForeignKey(blank=True, help_text='Copied from the warehouse', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='accounts.organization'),
+        ),
+        migrations.AddField(
+            model_name='orderitem',
+            name='organization',
+            field=models.ForeignKey(blank=True, help_text='Copied from the order', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='accounts.organization'),
+        ),
+        migrations.RunPython(backfill_organization, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='customer',
+            index=models.Index(fields=['organization', 'created_at'], name='customers_organiz_a8236f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['organization', 'created_at'], name='orders_organiz_dd3b72_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['organization', 'status'], name='orders_organiz_85459e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='orderitem',
+            index=models.Index(fields=['organization', 'created_at'], name='order_items_organiz_cb0a8c_idx'),
+        ),
+    ]
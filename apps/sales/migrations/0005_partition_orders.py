@@ -0,0 +1,33 @@
+# Generated by Django 5.2.8
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from apps.sales.partitions import PARTITIONED_TABLES, partition_table, unpartition_table
+
+
+def partition_tables(apps, schema_editor):
+    for table in PARTITIONED_TABLES:
+        partition_table(table, connection=schema_editor.connection)
+
+
+def unpartition_tables(apps, schema_editor):
+    for table in PARTITIONED_TABLES:
+        unpartition_table(table, connection=schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sales', '0004_denormalized_organization'),
+    ]
+
+    operations = [
+        # A partitioned orders table has no unique constraint on id alone
+        migrations.AlterField(
+            model_name='orderitem',
+            name='order',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='items', to='sales.order'),
+        ),
+        migrations.RunPython(partition_tables, unpartition_tables),
+    ]
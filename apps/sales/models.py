@@ -1,9 +1,11 @@
 from django.db import models, transaction
 from django.core.exceptions import ValidationError
+from django.utils import timezone
 from apps.core.models import BaseModel
 from apps.inventory.models import Product, Warehouse, Stock
 import logging
 from apps.core.models import TrackableModel 
+from apps.core.tenancy import TenantQuerySet, TenantScope
 
 logger = logging.getLogger(__name__)
 
@@ -21,10 +23,16 @@ class Customer(TrackableModel):
         related_name='customers',
         help_text="Organization that owns this customer")
     
+    objects = TenantQuerySet.as_manager()
+    organization_source = 'created_by'
     
     class Meta:
         db_table = 'customers'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['updated_at', 'id']),
+            models.Index(fields=['organization', 'created_at']),
+        ]
     
     def __str__(self):
         return self.name
@@ -58,10 +66,26 @@ class Order(TrackableModel):
     )
     notes = models.TextField(blank=True, null=True)
     is_locked = models.BooleanField(default=False, null=True, blank=True)
+    organization = models.ForeignKey(
+        'accounts.Organization',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='+',
+        help_text="Copied from the warehouse"
+    )
+    
+    objects = TenantQuerySet.as_manager()
+    organization_source = 'warehouse'
     
     class Meta:
         db_table = 'orders'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['updated_at', 'id']),
+            models.Index(fields=['organization', 'created_at']),
+            models.Index(fields=['organization', 'status']),
+        ]
     
     def __str__(self):
         return f"Order #{str(self.id)[:8]} - {self.customer.name if self.customer else 'No Customer'}"
@@ -72,7 +96,7 @@ class Order(TrackableModel):
         total = sum(item.subtotal for item in self.items.all())
         if self.total != total:
             self.total = total
-            Order.objects.filter(pk=self.pk).update(total=total)
+            Order.objects.filter(pk=self.pk).update(total=total, updated_at=timezone.now())
     
     def clean(self):
         """
@@ -290,14 +314,31 @@ class Order(TrackableModel):
 
 
 class OrderItem(TrackableModel):
-    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='items')
+    # No database constraint: orders may be partitioned (see apps.sales.partitions)
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='items', db_constraint=False)
     product = models.ForeignKey(Product, on_delete=models.CASCADE)
     quantity = models.IntegerField()
     price = models.DecimalField(max_digits=10, decimal_places=2)
     subtotal = models.DecimalField(max_digits=10, decimal_places=2)
+    organization = models.ForeignKey(
+        'accounts.Organization',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='+',
+        help_text="Copied from the order"
+    )
+    
+    objects = TenantQuerySet.as_manager()
+    organization_source = 'order'
+    tenant_scope = TenantScope('organization_id', 'order__warehouse_id')
     
     class Meta:
         db_table = 'order_items'
+        indexes = [
+            models.Index(fields=['updated_at', 'id']),
+            models.Index(fields=['organization', 'created_at']),
+        ]
     
     def __str__(self):
         return f"{self.product.name} x {self.quantity}"
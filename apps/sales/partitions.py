@@ -0,0 +1,209 @@
+# apps/sales/partitions.py
+"""
+Monthly range partitions for orders and order_items on PostgreSQL.
+
+Both tables are partitioned by created_at into one partition per calendar
+month (orders_p2026_01 holds January 2026) plus a default partition that
+catches rows outside the created months. A query bounded on created_at
+only scans the partitions its range overlaps.
+
+The primary key becomes (id, created_at), as PostgreSQL requires the
+partition key in every unique constraint, so order_items.order_id is kept
+without a database foreign key; deletes still cascade through the ORM.
+
+On other backends the tables stay plain and every function here is a
+no-op, so tests on SQLite run against ordinary tables.
+"""
+
+import re
+from datetime import date, datetime, timezone
+
+from django.db import connection as default_connection, transaction
+
+PARTITIONED_TABLES = ('orders', 'order_items')
+MONTHS_AHEAD = 3
+ARCHIVE_SCHEMA = 'archive'
+
+_partition_suffix = re.compile(r'_p(\d{4})_(\d{2})$')
+
+
+def month_start(day):
+    return date(day.year, day.month, 1)
+
+
+def add_months(month, months):
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table, month):
+    return f'{table}_p{month:%Y_%m}'
+
+
+def _bound(month):
+    return datetime(month.year, month.month, 1, tzinfo=timezone.utc).isoformat()
+
+
+def is_partitioned(table, connection=default_connection):
+    if connection.vendor != 'postgresql':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s)', [table]
+        )
+        return cursor.fetchone() is not None
+
+
+def list_partitions(table, connection=default_connection):
+    """Months with a partition of table, oldest first"""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT child.relname FROM pg_inherits '
+            'JOIN pg_class child ON child.oid = pg_inherits.inhrelid '
+            'WHERE pg_inherits.inhparent = to_regclass(%s)', [table]
+        )
+        names = [row[0] for row in cursor.fetchall()]
+    months = []
+    for name in names:
+        match = _partition_suffix.search(name)
+        if match:
+            months.append(date(int(match[1]), int(match[2]), 1))
+    return sorted(months)
+
+
+def create_partition(table, month, connection=default_connection):
+    """
+    Create the partition of table for month. Rows for that month already
+    in the default partition are moved into it first, since PostgreSQL
+    refuses to attach a range the default partition holds rows for.
+    Returns False if it already exists.
+    """
+    name = partition_name(table, month)
+    start, end = _bound(month), _bound(add_months(month, 1))
+    qn = connection.ops.quote_name
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        cursor.execute('SELECT to_regclass(%s)', [name])
+        if cursor.fetchone()[0] is not None:
+            return False
+        cursor.execute(
+            f'CREATE TABLE {qn(name)} (LIKE {qn(table)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'
+        )
+        cursor.execute(
+            f'WITH moved AS (DELETE FROM {qn(table + "_default")} '
+            f'WHERE created_at >= %s AND created_at < %s RETURNING *) '
+            f'INSERT INTO {qn(name)} SELECT * FROM moved',
+            [start, end]
+        )
+        cursor.execute(
+            f'ALTER TABLE {qn(table)} ATTACH PARTITION {qn(name)} FOR VALUES FROM (%s) TO (%s)',
+            [start, end]
+        )
+    return True
+
+
+def ensure_partitions(months_ahead=MONTHS_AHEAD, today=None, connection=default_connection):
+    """
+    Create partitions from the current month through months_ahead months
+    ahead for every partitioned table. Returns the names created.
+    """
+    this_month = month_start(today or date.today())
+    created = []
+    for table in PARTITIONED_TABLES:
+        if not is_partitioned(table, connection):
+            continue
+        for offset in range(months_ahead + 1):
+            month = add_months(this_month, offset)
+            if create_partition(table, month, connection):
+                created.append(partition_name(table, month))
+    return created
+
+
+def archive_partitions(before, drop=False, connection=default_connection):
+    """
+    Detach the monthly partitions that end on or before the month of
+    before, moving them into the archive schema (or dropping them). The
+    rest of the table is untouched: no rows are scanned or deleted.
+    Returns the names archived.
+    """
+    cutoff = month_start(before)
+    qn = connection.ops.quote_name
+    archived = []
+    for table in PARTITIONED_TABLES:
+        if not is_partitioned(table, connection):
+            continue
+        for month in list_partitions(table, connection):
+            if add_months(month, 1) > cutoff:
+                break
+            name = partition_name(table, month)
+            with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+                cursor.execute(f'ALTER TABLE {qn(table)} DETACH PARTITION {qn(name)}')
+                if drop:
+                    cursor.execute(f'DROP TABLE {qn(name)}')
+                else:
+                    cursor.execute(f'CREATE SCHEMA IF NOT EXISTS {qn(ARCHIVE_SCHEMA)}')
+                    cursor.execute(f'ALTER TABLE {qn(name)} SET SCHEMA {qn(ARCHIVE_SCHEMA)}')
+            archived.append(name)
+    return archived
+
+
+def _rebuild(table, partitioned, months_ahead, connection):
+    qn = connection.ops.quote_name
+    legacy = f'{table}_rebuild'
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT indexdef FROM pg_indexes WHERE tablename = %s AND indexname NOT IN '
+            '(SELECT conname FROM pg_constraint WHERE conrelid = to_regclass(%s) AND contype = %s)',
+            [table, table, 'p']
+        )
+        # Indexes of a partitioned parent are listed as ON ONLY
+        indexes = [row[0].replace(' ON ONLY ', ' ON ') for row in cursor.fetchall()]
+        cursor.execute(
+            'SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint '
+            'WHERE conrelid = to_regclass(%s) AND contype = %s',
+            [table, 'f']
+        )
+        foreign_keys = cursor.fetchall()
+        cursor.execute(f'SELECT min(created_at) FROM {qn(table)}')
+        oldest = cursor.fetchone()[0]
+
+        cursor.execute(f'ALTER TABLE {qn(table)} RENAME TO {qn(legacy)}')
+        like = f'CREATE TABLE {qn(table)} (LIKE {qn(legacy)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)'
+        if partitioned:
+            cursor.execute(f'{like} PARTITION BY RANGE (created_at)')
+            cursor.execute(f'CREATE TABLE {qn(table + "_default")} PARTITION OF {qn(table)} DEFAULT')
+        else:
+            cursor.execute(like)
+
+    if partitioned:
+        month = month_start(oldest.date() if oldest else date.today())
+        last = add_months(month_start(date.today()), months_ahead)
+        while month <= last:
+            create_partition(table, month, connection)
+            month = add_months(month, 1)
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'INSERT INTO {qn(table)} SELECT * FROM {qn(legacy)}')
+        # Dropping a partitioned table drops its partitions
+        cursor.execute(f'DROP TABLE {qn(legacy)}')
+        primary_key = 'id, created_at' if partitioned else 'id'
+        cursor.execute(f'ALTER TABLE {qn(table)} ADD PRIMARY KEY ({primary_key})')
+        for definition in indexes:
+            cursor.execute(definition)
+        for name, definition in foreign_keys:
+            cursor.execute(f'ALTER TABLE {qn(table)} ADD CONSTRAINT {qn(name)} {definition}')
+
+
+def partition_table(table, months_ahead=MONTHS_AHEAD, connection=default_connection):
+    """
+    Convert a plain table into a monthly partitioned one: partitions from
+    its oldest row through months_ahead months ahead, its rows copied over,
+    then its indexes and foreign keys recreated on the new parent.
+    """
+    if connection.vendor == 'postgresql' and not is_partitioned(table, connection):
+        _rebuild(table, True, months_ahead, connection)
+
+
+def unpartition_table(table, connection=default_connection):
+    """Convert a partitioned table back into a plain one"""
+    if is_partitioned(table, connection):
+        _rebuild(table, False, 0, connection)
@@ -0,0 +1,9 @@
+from celery import shared_task
+from apps.sales.partitions import ensure_partitions
+
+
+@shared_task
+def ensure_order_partitions():
+    """Keep the next months' partitions of orders and order_items in place (PostgreSQL only)"""
+    created = ensure_partitions()
+    return f"Created {len(created)} order partitions"
@@ -1,3 +1,55 @@
+from datetime import date, datetime, timezone
+from io import StringIO
+from unittest import skipUnless
+
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from apps.sales.models import Order
+from apps.sales.partitions import (
+    add_months, archive_partitions, ensure_partitions, is_partitioned, list_partitions,
+    month_start, partition_name,
+)
+
+
+class PartitionTests(TestCase):
+    """Test monthly partitioning of orders and order items"""
+
+    def test_month_arithmetic(self):
+        self.assertEqual(month_start(date(2026, 10, 19)), date(2026, 10, 1))
+        self.assertEqual(add_months(date(2026, 11, 1), 2), date(2027, 1, 1))
+        self.assertEqual(add_months(date(2026, 1, 1), -1), date(2025, 12, 1))
+        self.assertEqual(partition_name('orders', date(2026, 1, 1)), 'orders_p2026_01')
+
+    @skipUnless(connection.vendor != 'postgresql', 'plain tables only')
+    def test_plain_tables_are_left_alone(self):
+        self.assertFalse(is_partitioned('orders'))
+        self.assertEqual(ensure_partitions(), [])
+        self.assertEqual(archive_partitions(date.today()), [])
+
+        out = StringIO()
+        call_command('order_partitions', '--retain-months', '12', stdout=out)
+        self.assertIn('not partitioned', out.getvalue())
+
+    @skipUnless(connection.vendor == 'postgresql', 'PostgreSQL partitioning')
+    def test_partitions_created_pruned_and_archived(self):
+        self.assertTrue(is_partitioned('orders'))
+        ensure_partitions(months_ahead=2, today=date(2020, 1, 15))
+        self.assertTrue({date(2020, 1, 1), date(2020, 3, 1)} <= set(list_partitions('orders')))
+
+        order = Order.objects.create()
+        Order.objects.filter(pk=order.pk).update(created_at=datetime(2020, 2, 10, tzinfo=timezone.utc))
+
+        # A month-bounded query scans one partition
+        queryset = Order.objects.filter(
+            created_at__gte=datetime(2020, 2, 1, tzinfo=timezone.utc),
+            created_at__lt=datetime(2020, 3, 1, tzinfo=timezone.utc),
+        )
+        self.assertEqual(queryset.count(), 1)
+        plan = queryset.explain()
+        self.assertIn('orders_p2020_02', plan)
+        self.assertNotIn('orders_p2020_01', plan)
 
-# Create your tests here.
+        self.assertIn('orders_p2020_01', archive_partitions(date(2020, 2, 1), drop=True))
+        self.assertNotIn(date(2020, 1, 1), list_partitions('orders'))
+        self.assertTrue(Order.objects.filter(pk=order.pk).exists())
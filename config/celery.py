@@ -1,5 +1,6 @@
 import os
 from celery import Celery
+from celery.signals import task_postrun, task_prerun
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.local')
 
@@ -8,6 +9,17 @@ app.config_from_object('django.conf:settings', namespace='CELERY')
 app.autodiscover_tasks()
 
 
+@task_prerun.connect
+@task_postrun.connect
+def recycle_connections(**kwargs):
+    """
+    Workers get no request signals, so recycle connections around each
+    task: broken or expired ones are closed, pooled ones returned.
+    """
+    from django.db import close_old_connections
+    close_old_connections()
+
+
 @app.task(bind=True)
 def debug_task(self):
     print(f'Request: {self.request!r}')
@@ -0,0 +1,45 @@
+"""
+Connection settings shared by every settings module.
+
+Connections persist for DB_CONN_MAX_AGE seconds (per web request thread,
+and per Celery task via the hooks in config/celery.py) and are checked
+before reuse, so a connection the server dropped is replaced instead of
+failing the request.
+
+With DB_POOL_SIZE set, PostgreSQL connections come from a psycopg_pool
+pool of that size instead; the pool
+checks connections on checkout and recycles them after
+DB_POOL_MAX_LIFETIME seconds. PostgreSQL aliases use the instrumented
+backend in apps.core.backends.postgresql, which records how long each
+connection took to open or to get from the pool.
+"""
+
+import os
+
+POSTGRES_ENGINE = 'django.db.backends.postgresql'
+INSTRUMENTED_POSTGRES_ENGINE = 'apps.core.backends.postgresql'
+
+
+def database_config(settings_dict, conn_max_age=60, environ=os.environ):
+    """Apply connection reuse, health checks and pooling to a DATABASES entry"""
+    settings_dict['CONN_MAX_AGE'] = int(environ.get('DB_CONN_MAX_AGE', conn_max_age))
+    settings_dict['CONN_HEALTH_CHECKS'] = True
+    if settings_dict.get('ENGINE') != POSTGRES_ENGINE:
+        return settings_dict
+
+    settings_dict['ENGINE'] = INSTRUMENTED_POSTGRES_ENGINE
+    pool_size = int(environ.get('DB_POOL_SIZE', 0))
+    if pool_size:
+        from psycopg_pool import ConnectionPool
+
+        settings_dict.setdefault('OPTIONS', {})['pool'] = {
+            'min_size': min(int(environ.get('DB_POOL_MIN_SIZE', 2)), pool_size),
+            'max_size': pool_size,
+            'timeout': float(environ.get('DB_POOL_TIMEOUT', 10)),
+            'max_lifetime': float(environ.get('DB_POOL_MAX_LIFETIME', 1800)),
+            'max_idle': float(environ.get('DB_POOL_MAX_IDLE', 300)),
+            'check': ConnectionPool.check_connection,
+        }
+        # Pooled connections are returned after each request instead
+        settings_dict['CONN_MAX_AGE'] = 0
+    return settings_dict
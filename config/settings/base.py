@@ -13,6 +13,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 from pathlib import Path
 import sys
 import os
+from celery.schedules import crontab
 
 # Build paths
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
@@ -53,6 +54,7 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'apps.core.routing.ReplicaRoutingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -87,12 +89,28 @@ WSGI_APPLICATION = 'config.wsgi.application'
 import dj_database_url
 import os
 
+from config.database import database_config
+
 DATABASES = {
-    "default": dj_database_url.config(
+    "default": database_config(dj_database_url.config(
         default=os.environ.get("DATABASE_URL")
-    )
+    ))
 }
 
+# Read replicas, comma-separated URLs; see apps.core.routing
+REPLICA_DATABASES = []
+for i, url in enumerate(filter(None, os.environ.get('REPLICA_DATABASE_URLS', '').split(',')), 1):
+    DATABASES[f'replica_{i}'] = database_config(dj_database_url.parse(url.strip()))
+    REPLICA_DATABASES.append(f'replica_{i}')
+DATABASE_ROUTERS = ['apps.core.routing.ReplicaRouter']
+# Send every GET/HEAD/OPTIONS request's reads to a replica, not only the
+# views and tasks that opt in
+REPLICA_READS_FOR_SAFE_REQUESTS = os.environ.get('REPLICA_READS_FOR_SAFE_REQUESTS', 'False') == 'True'
+# Seconds reads stay on the primary for a client after it writes
+REPLICA_PIN_SECONDS = int(os.environ.get('REPLICA_PIN_SECONDS', 10))
+# Log connection acquisitions slower than this (apps.core.backends.postgresql)
+DB_CONNECT_WARN_MS = int(os.environ.get('DB_CONNECT_WARN_MS', 100))
+
 
 # Custom User Model
 AUTH_USER_MODEL = 'accounts.User'
@@ -122,8 +140,8 @@ REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
-        'rest_framework.authentication.SessionAuthentication',
+        'apps.api.authentication.PrincipalJWTAuthentication',
+        'apps.api.authentication.PrincipalSessionAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -135,7 +153,7 @@ REST_FRAMEWORK = {
     ],
     'DEFAULT_THROTTLE_CLASSES': [
         'rest_framework.throttling.AnonRateThrottle',
-        'rest_framework.throttling.UserRateThrottle',
+        'apps.api.throttling.OrganizationRateThrottle',
     ],
     'DEFAULT_THROTTLE_RATES': {
         'anon': '100/hour',
@@ -166,6 +184,69 @@ CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
+# Processes used to shard large forecast batches (default: CPU count)
+FORECAST_WORKERS = int(os.environ.get('FORECAST_WORKERS', 0)) or None
+# Reorder point optimizer: default lead time, target service level, and
+# whether the weekly run overwrites Stock.reorder_level
+REORDER_LEAD_TIME_DAYS = int(os.environ.get('REORDER_LEAD_TIME_DAYS', 7))
+REORDER_SERVICE_LEVEL = float(os.environ.get('REORDER_SERVICE_LEVEL', 0.95))
+REORDER_AUTO_APPLY = os.environ.get('REORDER_AUTO_APPLY', 'False') == 'True'
+
+# Shared cache; Redis when REDIS_CACHE_URL is set, per-process memory otherwise
+if os.environ.get('REDIS_CACHE_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['REDIS_CACHE_URL'],
+        }
+    }
+
+# Seconds a user or organization snapshot (apps.accounts.snapshots) stays
+# in the shared cache and in each process. Without REDIS_CACHE_URL there is
+# no shared cache and snapshots only live for SNAPSHOT_LOCAL_TIMEOUT.
+SNAPSHOT_TIMEOUT = int(os.environ.get('SNAPSHOT_TIMEOUT', 300))
+SNAPSHOT_LOCAL_TIMEOUT = int(os.environ.get('SNAPSHOT_LOCAL_TIMEOUT', 5))
+
+# Token buckets per organization and endpoint class, sized by subscription
+# status. Buckets live in Redis when THROTTLE_REDIS_URL is set.
+THROTTLE_REDIS_URL = os.environ.get('THROTTLE_REDIS_URL')
+ORGANIZATION_THROTTLE_RATES = {
+    'trial': {'read': '300/min', 'write': '60/min', 'bulk': '5/min'},
+    'active': {'read': '3000/min', 'write': '600/min', 'bulk': '60/min'},
+    'suspended': {'read': '60/min', 'write': '10/min', 'bulk': '1/min'},
+    'cancelled': {'read': '60/min', 'write': '10/min', 'bulk': '1/min'},
+}
+
+CELERY_BEAT_SCHEDULE = {
+    'rebuild-sales-rollups': {
+        'task': 'apps.analytics.tasks.rebuild_sales_rollups',
+        'schedule': crontab(hour=2, minute=0),
+    },
+    'generate-sales-predictions': {
+        'task': 'apps.analytics.tasks.generate_sales_predictions',
+        'schedule': crontab(hour=3, minute=0),
+    },
+    'check-low-stock-alerts': {
+        'task': 'apps.analytics.tasks.check_low_stock_alerts',
+        'schedule': crontab(minute=0),
+    },
+    'backtest-predictions': {
+        'task': 'apps.analytics.tasks.backtest_predictions',
+        'schedule': crontab(hour=2, minute=30),
+    },
+    'classify-products': {
+        'task': 'apps.analytics.tasks.classify_products',
+        'schedule': crontab(hour=4, minute=0, day_of_week=1),
+    },
+    'optimize-reorder-levels': {
+        'task': 'apps.analytics.tasks.optimize_reorder_levels',
+        'schedule': crontab(hour=4, minute=30, day_of_week=1),
+    },
+    'ensure-order-partitions': {
+        'task': 'apps.sales.tasks.ensure_order_partitions',
+        'schedule': crontab(hour=1, minute=0),
+    },
+}
 
 # Logging Configuration
 # Logging Configuration
@@ -2,3 +2,10 @@ from .base import *
 
 DEBUG = True
 ALLOWED_HOSTS = ['localhost', '127.0.0.1']
+
+# Second local database standing in for a read replica. Routing only uses
+# it when listed in REPLICA_DATABASES, as the router tests do.
+DATABASES['replica'] = {
+    'ENGINE': 'django.db.backends.sqlite3',
+    'NAME': BASE_DIR / 'replica.sqlite3',
+}